@@ -1,6 +1,7 @@
 # backend/api/admin.py
 from django.contrib import admin
 from django.utils.html import format_html
+from .images import article_image_path, build_renditions, smallest_rendition_url
 from .models import Region, Source, Topic, Article, UserPost
 
 @admin.register(Region)
@@ -24,10 +25,14 @@ class ArticleAdmin(admin.ModelAdmin):
     list_filter = ('source', 'region', 'topics', 'published_date')
     search_fields = ('title', 'summary')
     filter_horizontal = ('topics',)
-    readonly_fields = ('created_at', 'display_large_image')
+    readonly_fields = ('created_at', 'display_large_image', 'canonical')
     date_hierarchy = 'published_date'
+    list_select_related = ('source', 'region')
     
     def display_image(self, obj):
+        thumbnail = smallest_rendition_url(obj.renditions)
+        if thumbnail:
+            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;" />', thumbnail)
         if obj.image:
             return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;" />', obj.image.url)
         elif obj.image_url:
@@ -42,6 +47,13 @@ class ArticleAdmin(admin.ModelAdmin):
             return format_html('<img src="{}" width="300" style="max-height: 300px; object-fit: contain;" />', obj.image_url)
         return "No image"
     display_large_image.short_description = 'Article Image'
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if {'image', 'image_url'} & set(form.changed_data):
+            path = article_image_path(obj)
+            obj.renditions = build_renditions(path) if path else None
+            obj.save(update_fields=['renditions'])
     
     fieldsets = (
         (None, {
@@ -54,7 +66,7 @@ class ArticleAdmin(admin.ModelAdmin):
             'fields': ('region', 'topics')
         }),
         ('Metadata', {
-            'fields': ('created_at',)
+            'fields': ('created_at', 'canonical')
         }),
     )
 
@@ -3,3 +3,15 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Register the cache invalidation receivers
+        from . import signals  # noqa: F401
+        from django.db.backends.signals import connection_created
+        # The SQLITE_PRAGMAS on every new SQLite connection; connected
+        # first so the pragmas are not counted as request queries
+        from .db import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='api-sqlite-pragmas')
+        # Count and time every request's SQL, on whichever thread it runs
+        from .instrumentation import install_query_recorder
+        connection_created.connect(install_query_recorder, dispatch_uid='api-instrumentation')
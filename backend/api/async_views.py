@@ -0,0 +1,169 @@
+# backend/api/async_views.py
+from abc import ABCMeta, abstractmethod
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from .cache import cache_key, get_cached_response, response_validators, set_validators, store_response
+from .db import reading_from_replica
+from .filters import ArticleFilter, filter_min_score, order_feed
+from .instrumentation import timer
+from .models import Region, Source, Topic, Article, UserPost
+from .pagination import AsyncPageNumberPagination, KeysetPagination
+from .search import FullTextSearchFilter
+from .serializers import FlatArticleSerializer, RegionSerializer, TopicSerializer, UserPostSerializer
+
+
+@sync_to_async(thread_sensitive=False)
+def cache_lookup(key, models):
+    """Return the validators of a request at the current data versions, and its cached response if any."""
+    validators = response_validators(key, models)
+    return validators, get_cached_response(validators[0])
+
+
+cache_store = sync_to_async(store_response, thread_sensitive=False)
+
+
+class AsyncReadOnlyView(View, metaclass=ABCMeta):
+    """
+    Base of the async read endpoints mounted under /api/async/.
+
+    The handlers are coroutines, so under ASGI they run on the event loop
+    instead of occupying a worker thread per request. Responses are cached
+    and validated exactly like VersionedCacheMixin does for the viewsets: a
+    cache hit or a 304 is answered without touching the database, and only
+    a miss reads the database, through the async ORM.
+    The JSON bodies match the corresponding /api/ endpoints.
+    """
+    http_method_names = ['get', 'head', 'options']
+    queryset = None
+    cache_models = None
+    renderer = JSONRenderer()
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model,)
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_serializer_context(self):
+        return {'request': self.request, 'view': self}
+
+    async def get(self, request, *args, **kwargs):
+        # Set inside the coroutine so the ORM's sync_to_async calls inherit it
+        with reading_from_replica():
+            return await self.respond(request, *args, **kwargs)
+
+    async def respond(self, request, *args, **kwargs):
+        # Filter backends and paginators expect DRF's request wrapper
+        self.request = Request(request)
+
+        # The cache backends are synchronous (versions are files), so they are
+        # read in a worker thread, in one hop, rather than blocking the loop
+        key = cache_key(request, self.renderer.media_type)
+        (digest, etag, last_modified), response = await cache_lookup(key, self.get_cache_models())
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+
+        if response is None:
+            try:
+                data = await self.get_data(*args, **kwargs)
+            except Http404:
+                return self.error_response(NotFound())
+            except APIException as exc:
+                return self.error_response(exc)
+            with timer('serialize'):
+                response = HttpResponse(self.renderer.render(data), content_type=self.renderer.media_type)
+            await cache_store(digest, response.content, response['Content-Type'])
+        return set_validators(response, etag, last_modified)
+
+    def error_response(self, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return HttpResponse(self.renderer.render(data), content_type=self.renderer.media_type, status=exc.status_code)
+
+    @abstractmethod
+    async def get_data(self, *args, **kwargs):
+        """Return the data of the response body for the URL's arguments."""
+
+
+class AsyncListView(AsyncReadOnlyView):
+    serializer_class = None
+    filter_backends = ()
+    pagination_class = AsyncPageNumberPagination
+
+    def filter_queryset(self, queryset):
+        # Building the filtered queryset is lazy, so the sync backends are fine here
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def get_rows(self, queryset):
+        return queryset
+
+    async def serialize(self, rows):
+        # Plain ModelSerializers without relations never query the database
+        return self.serializer_class(rows, many=True, context=self.get_serializer_context()).data
+
+    async def get_data(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.pagination_class()
+        rows = await paginator.apaginate_queryset(self.get_rows(queryset), self.request, view=self)
+        return paginator.get_paginated_data(await self.serialize(rows))
+
+
+class ArticleListView(AsyncListView):
+    queryset = Article.objects.order_by('-published_date', '-id')
+    cache_models = (Article, Source, Region, Topic)
+    pagination_class = KeysetPagination
+    ordering = ('-published_date', '-id')
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
+    filterset_class = ArticleFilter
+    search_fields = ['title', 'summary']
+
+    def get_queryset(self):
+        return filter_min_score(super().get_queryset(), self.request.query_params.get('min_score', None))
+
+    def get_rows(self, queryset):
+        # ?ordering=best as in ArticleViewSet; an unknown ordering is a 400
+        queryset, ordering = order_feed(queryset, self.request.query_params)
+        if ordering:
+            self.ordering = ordering
+        self.serializer = FlatArticleSerializer(context=self.get_serializer_context())
+        return self.serializer.get_values(queryset)
+
+    async def serialize(self, rows):
+        return await self.serializer.ato_representation(rows)
+
+
+class ArticleDetailView(AsyncReadOnlyView):
+    queryset = Article.objects.all()
+    cache_models = (Article, Source, Region, Topic)
+
+    async def get_data(self, pk):
+        serializer = FlatArticleSerializer(context=self.get_serializer_context())
+        row = await serializer.get_values(self.get_queryset().filter(pk=pk)).afirst()
+        if row is None:
+            raise Http404
+        return (await serializer.ato_representation([row]))[0]
+
+
+class RegionListView(AsyncListView):
+    queryset = Region.objects.order_by('id')
+    serializer_class = RegionSerializer
+
+
+class TopicListView(AsyncListView):
+    queryset = Topic.objects.order_by('id')
+    serializer_class = TopicSerializer
+
+
+class UserPostListView(AsyncListView):
+    queryset = UserPost.objects.order_by('-date', '-id')
+    serializer_class = UserPostSerializer
+    pagination_class = KeysetPagination
+    ordering = ('-date', '-id')
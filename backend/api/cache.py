@@ -0,0 +1,180 @@
+# backend/api/cache.py
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from .instrumentation import timer
+
+VERSION_KEY_PREFIX = 'data-version:'
+RESPONSE_KEY_PREFIX = 'api-response:'
+
+_deferred = threading.local()
+
+
+def response_cache():
+    return caches[getattr(settings, 'API_RESPONSE_CACHE', 'default')]
+
+
+def version_cache():
+    # Versions must be shared by every process that can write (web workers and
+    # management commands), so they live in their own, typically file-based, cache
+    return caches[getattr(settings, 'API_VERSION_CACHE', 'default')]
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def get_versions(models):
+    """
+    Return {label: version} for the given models.
+
+    A version is the time of the model's last data change, so it doubles as
+    its Last-Modified value. Models that were never bumped start at "now".
+    """
+    labels = [model_label(model) for model in models]
+    keys = [VERSION_KEY_PREFIX + label for label in labels]
+    found = version_cache().get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        for key in missing:
+            version_cache().add(key, now, timeout=None)
+        found.update(version_cache().get_many(missing))
+    return {label: found[key] for label, key in zip(labels, keys)}
+
+
+def bump_versions(*models):
+    """
+    Mark the data of the given models as changed, invalidating cached
+    responses. Inside a transaction the bump waits for the commit, so a
+    request made in between cannot cache the old data under the new versions.
+    """
+    if getattr(_deferred, 'models', None) is not None:
+        _deferred.models.update(models)
+        return
+    if not models:
+        return
+    transaction.on_commit(lambda: _bump(models))
+
+
+def _bump(models):
+    # Entries keyed on the old versions can never be hit again; they age out
+    # of the response cache, which is not cleared so other entries survive
+    cache = version_cache()
+    now = time.time()
+    for model in set(models):
+        key = VERSION_KEY_PREFIX + model_label(model)
+        # Stay strictly increasing even if the clock has not moved since the last bump
+        previous = cache.get(key, 0)
+        cache.set(key, max(now, previous + 1e-6), timeout=None)
+
+
+@contextmanager
+def deferred_version_bumps():
+    """Collect bumps made inside the block (e.g. by signals during an import) and apply them once at the end."""
+    outer = getattr(_deferred, 'models', None)
+    if outer is not None:
+        yield
+        return
+    _deferred.models = set()
+    try:
+        yield
+    finally:
+        models, _deferred.models = _deferred.models, None
+        bump_versions(*models)
+
+
+def cache_key(request, media_type):
+    """Normalized cache key of a GET request: host, path, sorted query string and media type."""
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    return f'{request.get_host()}{request.path}?{query}|{media_type}'
+
+
+def response_validators(key, models):
+    """Return (digest, etag, last_modified) for a cache key at the current data versions of models."""
+    versions = get_versions(models)
+    fingerprint = f'{key}|{sorted(versions.items())}'
+    digest = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+    return digest, f'"{digest}"', int(max(versions.values()))
+
+
+def get_cached_response(digest):
+    cached = response_cache().get(RESPONSE_KEY_PREFIX + digest)
+    if cached is None:
+        return None
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+def store_response(digest, content, content_type):
+    response_cache().set(
+        RESPONSE_KEY_PREFIX + digest, (content, content_type),
+        getattr(settings, 'API_CACHE_TIMEOUT', 3600),
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class VersionedCacheMixin:
+    """
+    Cache rendered list/retrieve responses of a read-only viewset.
+
+    Keys combine the normalized URL, the negotiated media type and the data
+    versions of ``cache_models`` (the queryset model by default). Responses
+    carry a strong ETag and Last-Modified derived from the same versions, so
+    a conditional request that still matches is answered with 304 before any
+    database work is done.
+    """
+    cache_models = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model,)
+
+    def get_cache_key(self, request):
+        return cache_key(request, request.accepted_media_type)
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        # The browsable API embeds per-user state (CSRF token, login), so only
+        # the JSON representation is shared between clients
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        digest, etag, last_modified = response_validators(self.get_cache_key(request), self.get_cache_models())
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+
+        response = get_cached_response(digest)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            self._pending_cache_digest = digest
+        return set_validators(response, etag, last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        digest = getattr(self, '_pending_cache_digest', None)
+        if digest and response.status_code == 200:
+            with timer('serialize'):
+                response.render()
+            store_response(digest, response.content, response['Content-Type'])
+        return response
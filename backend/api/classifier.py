@@ -0,0 +1,115 @@
+# backend/api/classifier.py
+import json
+from collections import deque
+from django.conf import settings
+
+# Keyword stems mapped to the topic they indicate. Matching is substring based,
+# so a stem like 'forskning' also tags 'forskningen' and 'cancerforskning'.
+DEFAULT_TOPIC_KEYWORDS = {
+    'teater': 'Kultur',
+    'idrott': 'Sport',
+    'sport': 'Sport',
+    'medicin': 'Hälsa',
+    'forskning': 'Forskning',
+    'ekonomi': 'Ekonomi',
+    'hälsa': 'Hälsa',
+    'kärlek': 'Relationer',
+    'djur': 'Djur',
+    'miljö': 'Miljö',
+    'utbildning': 'Utbildning',
+    'arbetsmarknad': 'Arbetsmarknad',
+    'skola': 'Utbildning'
+}
+
+DEFAULT_TOPIC = 'Positiva nyheter'
+
+
+class TopicClassifier:
+    """
+    Multi-pattern keyword matcher built on an Aho-Corasick automaton.
+
+    All keywords are compiled into one trie with failure links, so a text is
+    classified in a single pass whose cost depends on the text length and not
+    on how many keywords the taxonomy has. Topics are returned in the order
+    they first appear in the keyword table.
+    """
+
+    def __init__(self, keywords, default_topic=DEFAULT_TOPIC):
+        self.default_topic = default_topic
+        self.topics = list(dict.fromkeys(keywords.values()))
+        topic_index = {name: i for i, name in enumerate(self.topics)}
+
+        # goto[state] maps a character to the next state
+        self.goto = [{}]
+        outputs = [set()]
+        for keyword, topic in keywords.items():
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(topic_index[topic])
+
+        # Breadth-first pass to set failure links and merge outputs along them
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                outputs[next_state] |= outputs[self.fail[next_state]]
+        self.outputs = [frozenset(out) for out in outputs]
+
+    @classmethod
+    def from_file(cls, path, default_topic=DEFAULT_TOPIC):
+        """Build a classifier from a JSON object mapping keywords to topic names."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), default_topic=default_topic)
+
+    def classify(self, text):
+        """Return the names of the topics whose keywords occur in text."""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+                if len(found) == len(self.topics):
+                    break
+        return [self.topics[i] for i in sorted(found)]
+
+    def classify_many(self, texts):
+        """Classify a batch of texts, returning one list of topic names per text."""
+        return [self.classify(text) for text in texts]
+
+
+_default_classifier = None
+
+
+def get_classifier(taxonomy=None):
+    """
+    Return a classifier for the given taxonomy file, or the shared default one.
+
+    The default table comes from ``settings.TOPIC_KEYWORDS`` when it is set and
+    falls back to DEFAULT_TOPIC_KEYWORDS otherwise.
+    """
+    global _default_classifier
+    if taxonomy:
+        return TopicClassifier.from_file(taxonomy)
+    if _default_classifier is None:
+        _default_classifier = TopicClassifier(getattr(settings, 'TOPIC_KEYWORDS', DEFAULT_TOPIC_KEYWORDS))
+    return _default_classifier
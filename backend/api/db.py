@@ -0,0 +1,72 @@
+# backend/api/db.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Alias the current API request reads from; unset outside API reads, so
+# importers and admin both read and write through the primary and always
+# see their own uncommitted rows.
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def read_database():
+    """The alias API reads are served from: API_READ_DATABASE if configured, else the primary."""
+    alias = getattr(settings, 'API_READ_DATABASE', None)
+    return alias if alias in connections.databases else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def reading_from_replica():
+    token = _read_alias.set(read_database())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads made inside reading_from_replica() to the read alias and every
+    write to the primary, whichever alias the instance was loaded from.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReadReplicaMixin:
+    """Serve a read-only viewset's queries from the read alias."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with reading_from_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        # Pinned as well, for querysets evaluated after dispatch returns
+        # (streamed exports)
+        return super().get_queryset().using(read_database())
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    connection_created receiver: apply SQLITE_PRAGMAS and make the read alias
+    read-only. WAL mode is stored in the database file by migration 0010.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if connection.alias != DEFAULT_DB_ALIAS and connection.alias == read_database():
+            cursor.execute('PRAGMA query_only = ON')
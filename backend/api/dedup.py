@@ -0,0 +1,163 @@
+# backend/api/dedup.py
+import re
+import zlib
+from collections import Counter
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from .models import Article, ArticleBand
+
+NUM_PERM = 32  # MinHash signature length
+BANDS = 8  # LSH bands of NUM_PERM // BANDS values each
+ROWS = NUM_PERM // BANDS
+SHINGLE = 2  # Words per shingle
+PRIME = 4294967291  # Largest prime below 2 ** 32, so signature values fit in 32 bits
+MAX_CANDIDATES = 50  # Candidates compared per article, those sharing the most bands first
+
+# Fixed, so fingerprints stay comparable across processes and releases
+_rng = np.random.default_rng(20250312)
+_A = _rng.integers(1, 2 ** 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 32, NUM_PERM, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 2 ** 63, (BANDS, ROWS), dtype=np.uint64) | np.uint64(1)
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def duplicate_similarity():
+    """Estimated Jaccard similarity of word shingles above which two stories are the same story."""
+    return getattr(settings, 'API_DUPLICATE_SIMILARITY', 0.5)
+
+
+def article_text(title, summary):
+    return f'{title} {summary}'
+
+
+def minhash_many(texts):
+    """
+    Return the MinHash signatures of the texts' word shingles as an
+    (n, NUM_PERM) uint32 array, and a mask of the texts that had any words.
+    """
+    hashes = []
+    lengths = []
+    for text in texts:
+        tokens = TOKEN_RE.findall(text.lower())
+        shingles = {
+            zlib.crc32(' '.join(tokens[i:i + SHINGLE]).encode('utf-8'))
+            for i in range(max(1, len(tokens) - SHINGLE + 1))
+        } if tokens else ()
+        hashes.extend(shingles)
+        lengths.append(len(shingles))
+
+    lengths = np.array(lengths, dtype=np.int64)
+    signatures = np.zeros((len(lengths), NUM_PERM), dtype=np.uint32)
+    valid = lengths > 0
+    if hashes:
+        # (a * x + b) mod p for every shingle and permutation, then the
+        # minimum of each text's rows; a, b and x are below 2 ** 32, so the
+        # products fit in 64 bits
+        permuted = (np.array(hashes, dtype=np.uint64)[:, None] * _A + _B) % np.uint64(PRIME)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        signatures[valid] = np.minimum.reduceat(permuted, starts[valid], axis=0)
+    return signatures, valid
+
+
+def band_keys(signatures):
+    """One signed 64-bit key per band and signature, (n, BANDS); equal bands give equal keys."""
+    bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, ROWS)
+    with np.errstate(over='ignore'):
+        keys = (bands * _BAND_MIX).sum(axis=2, dtype=np.uint64) + np.arange(BANDS, dtype=np.uint64)
+        keys ^= keys >> np.uint64(29)
+    return keys.view(np.int64)
+
+
+def to_bytes(signature):
+    return signature.astype('<u4').tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+def delete_bands(article_ids):
+    # Plain DELETEs: the catch-all cache signal receivers would otherwise make
+    # Django fetch every row before deleting it
+    table = ArticleBand._meta.db_table
+    article_ids = list(article_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(article_ids), 500):
+            chunk = article_ids[start:start + 500]
+            cursor.execute(f'DELETE FROM {table} WHERE article_id IN ({", ".join(["%s"] * len(chunk))})', chunk)
+
+
+def link_near_duplicates(article_ids, texts, new=None):
+    """
+    Fingerprint saved articles and group the new ones under a canonical story.
+
+    Every article's MinHash signature is stored, and canonical articles
+    also store their LSH band keys, so finding candidates is one indexed
+    lookup of the chunk's keys however large the table is, and copies of a
+    story add nothing to the lookup table. Candidates are confirmed by the
+    share of equal signature values (an estimate of their shingle Jaccard
+    similarity); a new article whose best match, earlier in the table or
+    earlier in this chunk, reaches API_DUPLICATE_SIMILARITY becomes a
+    duplicate of it. Changed articles (new=False) get fresh fingerprints
+    and keep their cluster.
+
+    Returns {article id: canonical id} for the articles that were linked.
+    """
+    article_ids = list(article_ids)
+    new = [True] * len(article_ids) if new is None else list(new)
+    signatures, valid = minhash_many(texts)
+    keys = band_keys(signatures)
+    threshold = duplicate_similarity()
+
+    # Canonical articles sharing a band with the chunk
+    candidates = {}
+    stored = {}
+    wanted = set(keys[valid].ravel().tolist())
+    rows = (
+        ArticleBand.objects.filter(key__in=wanted).exclude(article_id__in=article_ids)
+        .values_list('key', 'article_id', 'article__minhash')
+    ) if wanted else ()
+    for key, article_id, minhash in rows:
+        candidates.setdefault(key, []).append(article_id)
+        stored[article_id] = from_bytes(minhash)
+
+    # Changed articles keep their cluster
+    changed = {article_id for article_id, is_new in zip(article_ids, new) if not is_new}
+    links = dict(
+        Article.objects.filter(pk__in=list(changed), canonical__isnull=False).values_list('pk', 'canonical_id')
+    ) if changed else {}
+
+    for row, (article_id, is_new) in enumerate(zip(article_ids, new)):
+        if not valid[row] or not is_new:
+            continue
+        # Articles sharing more bands are likelier to be similar
+        hits = Counter(match for key in keys[row].tolist() for match in candidates.get(key, ()))
+        if hits:
+            matches = sorted(hits, key=lambda match: (-hits[match], match))[:MAX_CANDIDATES]
+            similarities = (np.array([stored[match] for match in matches]) == signatures[row]).mean(axis=1)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                links[article_id] = matches[best]
+                continue
+        # A new story: later articles in the chunk can match it
+        stored[article_id] = signatures[row]
+        for key in keys[row].tolist():
+            candidates.setdefault(key, []).append(article_id)
+
+    # Prepared statements run once per row: much cheaper than bulk_update's
+    # CASE expressions and model instances for this many small rows
+    delete_bands(article_ids)
+    with connection.cursor() as cursor:
+        cursor.executemany(f'UPDATE {Article._meta.db_table} SET minhash = %s, canonical_id = %s WHERE id = %s', [
+            (to_bytes(signatures[row]) if valid[row] else None, links.get(article_id), article_id)
+            for row, article_id in enumerate(article_ids)
+        ])
+        quote = connection.ops.quote_name
+        cursor.executemany(f'INSERT INTO {quote(ArticleBand._meta.db_table)} ({quote("key")}, article_id) VALUES (%s, %s)', [
+            (key, article_id)
+            for row, article_id in enumerate(article_ids) if valid[row] and article_id not in links
+            for key in keys[row].tolist()
+        ])
+    return {article_id: canonical_id for article_id, canonical_id in links.items() if article_id not in changed}
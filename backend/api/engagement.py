@@ -0,0 +1,180 @@
+# backend/api/engagement.py
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connection, transaction
+from .cache import bump_versions
+from .models import UserPost
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('likes', 'comments', 'shares')
+SHARDS = 16
+
+
+def flush_interval():
+    return getattr(settings, 'API_ENGAGEMENT_FLUSH_SECONDS', 5)
+
+
+class EngagementBuffer:
+    """
+    Write-behind buffer of UserPost likes, comments and shares.
+
+    Increments are added to one of SHARDS dicts, picked by post id and each
+    behind its own lock, so concurrent requests seldom wait for each other
+    and never for the database. A background thread flushes every
+    API_ENGAGEMENT_FLUSH_SECONDS: it swaps each shard for an empty one and
+    writes the collected deltas in one transaction, one ``col = col + delta``
+    UPDATE per post, so clicks no longer queue for SQLite's write lock one
+    UPDATE at a time. Deltas that fail to write are put back.
+
+    Each process has its own buffer: counts() adds this process's unflushed
+    deltas to the stored counts, other processes' show up once they flush.
+    Each flush bumps the UserPost version, so /api/posts/ pages lag the
+    increments by at most one flush interval.
+
+    Deltas live only in memory until they are flushed: a clean shutdown
+    writes them, a killed process (SIGKILL, OOM) loses them.
+    """
+
+    def __init__(self, shards=SHARDS, interval=None):
+        # Seconds between background flushes, API_ENGAGEMENT_FLUSH_SECONDS unless given
+        self.interval = interval
+        self.pending = [{} for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        # Deltas being written, still counted by readers until they commit
+        self.flushing = {}
+        self.flush_lock = threading.Lock()
+        # Odd while a flush is between swapping the shards out and committing
+        self.sequence = 0
+        self.thread = None
+        self.start_lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def add(self, post_id, likes=0, comments=0, shares=0):
+        shard = post_id % len(self.locks)
+        with self.locks[shard]:
+            counts = self.pending[shard].get(post_id)
+            if counts is None:
+                self.pending[shard][post_id] = [likes, comments, shares]
+            else:
+                counts[0] += likes
+                counts[1] += comments
+                counts[2] += shares
+        if self.thread is None:
+            self.start()
+
+    def unflushed(self, post_ids):
+        """{post id: [likes, comments, shares]} not yet in the database, for the given posts."""
+        deltas = {}
+        for post_id in post_ids:
+            shard = post_id % len(self.locks)
+            with self.locks[shard]:
+                counts = self.pending[shard].get(post_id)
+                counts = list(counts) if counts else None
+            flushing = self.flushing.get(post_id)
+            if flushing:
+                counts = [a + b for a, b in zip(counts or (0, 0, 0), flushing)]
+            if counts:
+                deltas[post_id] = counts
+        return deltas
+
+    def counts(self, post_ids):
+        """
+        Return {post id: {'likes': n, 'comments': n, 'shares': n}} for the
+        posts that exist, stored counts plus unflushed deltas.
+        """
+        post_ids = list(post_ids)
+        # Lock-free unless a flush commits in the middle of the read, which
+        # could count its deltas twice or not at all
+        sequence = self.sequence
+        result = self._read_counts(post_ids)
+        if sequence % 2 or sequence != self.sequence:
+            with self.flush_lock:
+                result = self._read_counts(post_ids)
+        return result
+
+    def _read_counts(self, post_ids):
+        # The primary holds every flushed delta, a replica may lag behind it
+        rows = UserPost.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=post_ids).values_list('id', *FIELDS)
+        deltas = self.unflushed(post_ids)
+        return {
+            row[0]: {field: value + delta for field, value, delta in zip(FIELDS, row[1:], deltas.get(row[0], (0, 0, 0)))}
+            for row in rows
+        }
+
+    def flush(self):
+        """
+        Write every buffered delta to the database and invalidate cached
+        posts; returns the number of posts updated.
+        """
+        with self.flush_lock:
+            batch = {}
+            self.sequence += 1
+            try:
+                for shard, lock in enumerate(self.locks):
+                    with lock:
+                        pending, self.pending[shard] = self.pending[shard], {}
+                    # Shards hold disjoint post ids
+                    batch.update(pending)
+                self.flushing = batch
+                if batch:
+                    self.write(batch)
+            except Exception:
+                for post_id, counts in batch.items():
+                    self.add(post_id, *counts)
+                raise
+            finally:
+                self.flushing = {}
+                self.sequence += 1
+
+        if batch:
+            bump_versions(UserPost)
+        return len(batch)
+
+    def write(self, batch):
+        # A prepared UPDATE run once per post, the SQL an F() update compiles
+        # to, without building a queryset for each
+        quote = connection.ops.quote_name
+        assignments = ', '.join(f'{quote(field)} = {quote(field)} + %s' for field in FIELDS)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f'UPDATE {quote(UserPost._meta.db_table)} SET {assignments} WHERE id = %s',
+                    [(*counts, post_id) for post_id, counts in batch.items()],
+                )
+
+    def start(self):
+        """Start the background flusher, once per buffer."""
+        with self.start_lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name='engagement-flush', daemon=True)
+            self.thread.start()
+            atexit.register(self.stop)
+
+    def run(self):
+        while not self.stopped.wait(self.interval or flush_interval()):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing engagement counts failed; they will be retried')
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        """Stop the background flusher and write what is left."""
+        self.stopped.set()
+        self.flush()
+
+
+buffer = EngagementBuffer()
+
+
+def record_engagement(post_id, likes=0, comments=0, shares=0):
+    buffer.add(post_id, likes, comments, shares)
+
+
+def engagement_counts(post_ids):
+    return buffer.counts(post_ids)
@@ -0,0 +1,110 @@
+# backend/api/export.py
+import csv
+import io
+import json
+from itertools import islice
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from .serializers import FlatArticleSerializer
+
+# Rows per chunk; each chunk costs one topics query. Kept under SQLite's
+# default limit of 999 bound parameters for the article_id IN (...) lookup
+EXPORT_CHUNK_SIZE = 500
+# The first chunk is small so the first bytes go out right away
+FIRST_CHUNK_SIZE = 50
+
+CSV_HEADER = (
+    'id', 'title', 'summary', 'source', 'published_date', 'positivity_score',
+    'topics', 'region', 'image', 'image_url', 'url', 'created_at',
+)
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Content negotiation target for the streamed export formats.
+
+    Successful exports are streamed directly; the renderer only encodes the
+    error responses (bad filters, invalid dates) as JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, cls=JSONEncoder, ensure_ascii=False).encode('utf-8')
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+def iter_article_chunks(queryset, context=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield lists of article representations for an Article queryset.
+
+    Rows come from a single values() query read with iterator(), so the
+    database cursor is consumed chunk by chunk and nothing is cached on the
+    queryset. The topics of each chunk are fetched in one query, so memory
+    stays bounded by the chunk size whatever the size of the result.
+    """
+    serializer = FlatArticleSerializer(context=context)
+    rows = serializer.get_values(queryset).iterator(chunk_size=chunk_size)
+    size = min(FIRST_CHUNK_SIZE, chunk_size)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield serializer.to_representation(chunk)
+        size = chunk_size
+
+
+def ndjson_lines(chunks):
+    for articles in chunks:
+        yield ''.join(
+            json.dumps(article, cls=JSONEncoder, ensure_ascii=False) + '\n' for article in articles
+        ).encode('utf-8')
+
+
+def csv_lines(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(CSV_HEADER)
+    yield flush()
+    for articles in chunks:
+        writer.writerows(
+            (
+                article['id'], article['title'], article['summary'], article['source']['name'],
+                article['published_date'], article['positivity_score'],
+                '; '.join(topic['name'] for topic in article['topics']),
+                article['region']['name'], article['image'] or '', article['image_url'] or '',
+                article['url'], article['created_at'],
+            )
+            for article in articles
+        )
+        yield flush()
+
+
+def export_response(queryset, export_format, context=None):
+    """Stream every article of queryset as NDJSON or CSV."""
+    chunks = iter_article_chunks(queryset, context)
+    if export_format == CSVRenderer.format:
+        stream, renderer = csv_lines(chunks), CSVRenderer
+    else:
+        stream, renderer = ndjson_lines(chunks), NDJSONRenderer
+    response = StreamingHttpResponse(stream, content_type=f'{renderer.media_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="articles.{renderer.format}"'
+    return response
@@ -0,0 +1,73 @@
+# backend/api/facets.py
+from django.db.models import Count, Q
+from .models import Article
+
+# (min, max) positivity ranges, matching the score badges in the UI
+POSITIVITY_BUCKETS = ((0.9, None), (0.8, 0.9), (0.7, 0.8), (None, 0.7))
+
+# Query parameter that each facet ignores, so its counts show what choosing
+# another option would return with every other filter still applied
+FACET_PARAMS = {
+    'regions': 'region__name',
+    'topics': 'topics__name',
+    'sources': 'source__name',
+    'positivity': 'min_score',
+}
+
+
+def bucket_filter(low, high):
+    condition = Q()
+    if low is not None:
+        condition &= Q(positivity_score__gte=low)
+    if high is not None:
+        condition &= Q(positivity_score__lt=high)
+    return condition
+
+
+def article_facets(filtered_without, min_score=None):
+    """
+    Count articles per region, topic, source and positivity bucket.
+
+    filtered_without(param) must return the filtered article queryset with
+    the given query parameter left out. Each facet is one grouped aggregate
+    over the matching ids (a subquery, so search ranking and ordering never
+    reach the GROUP BY), four queries in total. The overall count comes from
+    the positivity query, which already sees every filter but min_score.
+    Options without matching articles are left out.
+    """
+    def matching(facet):
+        return filtered_without(FACET_PARAMS[facet]).order_by().values('pk')
+
+    regions = (
+        Article.objects.filter(pk__in=matching('regions'))
+        .values('region_id', 'region__name').annotate(count=Count('id'))
+        .order_by('-count', 'region__name')
+    )
+    # The through table is unique per (article, topic), so no DISTINCT is needed
+    topics = (
+        Article.topics.through.objects.filter(article_id__in=matching('topics'))
+        .values('topic_id', 'topic__name').annotate(count=Count('article_id'))
+        .order_by('-count', 'topic__name')
+    )
+    sources = (
+        Article.objects.filter(pk__in=matching('sources'))
+        .values('source_id', 'source__name').annotate(count=Count('id'))
+        .order_by('-count', 'source__name')
+    )
+
+    total = Q() if min_score is None else Q(positivity_score__gte=min_score)
+    counts = Article.objects.filter(pk__in=matching('positivity')).aggregate(
+        count=Count('id', filter=total),
+        **{f'bucket{i}': Count('id', filter=bucket_filter(low, high)) for i, (low, high) in enumerate(POSITIVITY_BUCKETS)},
+    )
+
+    return {
+        'count': counts['count'],
+        'regions': [{'id': row['region_id'], 'name': row['region__name'], 'count': row['count']} for row in regions],
+        'topics': [{'id': row['topic_id'], 'name': row['topic__name'], 'count': row['count']} for row in topics],
+        'sources': [{'id': row['source_id'], 'name': row['source__name'], 'count': row['count']} for row in sources],
+        'positivity': [
+            {'min': low, 'max': high, 'count': counts[f'bucket{i}']}
+            for i, (low, high) in enumerate(POSITIVITY_BUCKETS)
+        ],
+    }
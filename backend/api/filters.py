@@ -0,0 +1,55 @@
+# backend/api/filters.py
+import django_filters
+from rest_framework.exceptions import ValidationError
+from .models import Article
+from .ranking import BEST_ORDERING, ranked_feed
+
+
+class ArticleFilter(django_filters.FilterSet):
+    # Accept dates or datetimes; the range is half-open so consecutive
+    # exports (?published_after=2025-03-01&published_before=2025-04-01) never overlap
+    published_after = django_filters.DateTimeFilter(field_name='published_date', lookup_expr='gte')
+    published_before = django_filters.DateTimeFilter(field_name='published_date', lookup_expr='lt')
+    # ?collapse=true keeps one article per story: near-duplicates (api.dedup)
+    # are left out in favour of the first copy that arrived
+    collapse = django_filters.BooleanFilter(method='filter_collapse')
+
+    class Meta:
+        model = Article
+        fields = ['region__name', 'topics__name', 'source__name']
+
+    def filter_collapse(self, queryset, name, value):
+        return queryset.filter(canonical__isnull=True) if value else queryset
+
+
+def parse_min_score(min_score):
+    """Return ?min_score= as a float, or None when it is missing or not a number."""
+    if min_score is None:
+        return None
+    try:
+        return float(min_score)
+    except ValueError:
+        return None
+
+
+def filter_min_score(queryset, min_score):
+    """Apply the ?min_score= filter; values that are not numbers are ignored."""
+    min_score = parse_min_score(min_score)
+    if min_score is not None:
+        queryset = queryset.filter(positivity_score__gte=min_score)
+    return queryset
+
+
+def order_feed(queryset, params):
+    """
+    Apply ?ordering=: newest first (latest, the default) or best, the
+    precomputed ranking of positivity decayed by age (api.ranking) within
+    the ?region__name= or else ?topics__name= given. Returns the queryset
+    and the keyset ordering to paginate it by, or None for the default.
+    """
+    ordering = params.get('ordering') or 'latest'
+    if ordering not in ('latest', 'best'):
+        raise ValidationError({'ordering': 'Must be "latest" or "best".'})
+    if ordering == 'best':
+        return ranked_feed(queryset, region=params.get('region__name'), topic=params.get('topics__name')), BEST_ORDERING
+    return queryset, None
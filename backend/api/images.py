@@ -0,0 +1,231 @@
+# backend/api/images.py
+import hashlib
+import io
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Widths of the generated renditions; larger ones are skipped for smaller originals
+RENDITION_WIDTHS = (64, 320, 640, 1280)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+RENDITION_DIR = 'article_pictures/renditions'
+
+
+def content_hash(f):
+    """Return the sha256 hex digest of a binary file object, read in blocks."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: f.read(1024 * 1024), b''):
+        digest.update(block)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def _encode(image, width, fmt):
+    pil_format, options = RENDITION_FORMATS[fmt]
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.Resampling.LANCZOS) if width != image.width else image
+    if pil_format == 'JPEG' and resized.mode != 'RGB':
+        # JPEG has no alpha channel, so flatten onto white
+        background = Image.new('RGB', resized.size, (255, 255, 255))
+        rgba = resized.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        resized = background
+    out = io.BytesIO()
+    resized.save(out, pil_format, **options)
+    return out.getvalue()
+
+
+def build_renditions(path, storage=default_storage):
+    """
+    Generate the resized WebP/JPEG renditions of the image at path.
+
+    Names are derived from the hash of the original's content, so identical
+    images (re-imports, the same picture on several stories) map to the same
+    files and are only encoded and stored once. Returns
+    ``{format: {width: storage name}}``, or None if path is not a readable image.
+    """
+    try:
+        with open(path, 'rb') as f:
+            digest = content_hash(f)
+            image = Image.open(f)
+            image.load()
+    except (OSError, Image.DecompressionBombError):
+        return None
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    widths = [width for width in RENDITION_WIDTHS if width < image.width]
+    if image.width <= RENDITION_WIDTHS[-1]:
+        # Never upscale; the original width stands in for the larger sizes
+        widths.append(image.width)
+
+    renditions = {}
+    for fmt in RENDITION_FORMATS:
+        ext = 'jpg' if fmt == 'jpeg' else fmt
+        renditions[fmt] = {}
+        for width in widths:
+            name = f'{RENDITION_DIR}/{digest[:2]}/{digest[:20]}-{width}.{ext}'
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(_encode(image, width, fmt)))
+            renditions[fmt][str(width)] = name
+    return renditions
+
+
+def article_image_path(article):
+    """Return the local file behind an article's image or media image_url, if there is one."""
+    if article.image:
+        try:
+            return article.image.path
+        except NotImplementedError:
+            return None
+    if article.image_url and article.image_url.startswith(settings.MEDIA_URL):
+        relative = article.image_url[len(settings.MEDIA_URL):].split('?', 1)[0]
+        return os.path.join(settings.MEDIA_ROOT, relative)
+    return None
+
+
+def build_srcset(renditions, request=None, storage=default_storage):
+    """Return ``{format: 'url 64w, url 320w, ...'}`` for a stored rendition map."""
+    if not renditions:
+        return None
+    srcset = {}
+    for fmt, names in renditions.items():
+        entries = []
+        for width, name in sorted(names.items(), key=lambda item: int(item[0])):
+            url = storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            entries.append(f'{url} {width}w')
+        srcset[fmt] = ', '.join(entries)
+    return srcset
+
+
+def smallest_rendition_url(renditions, storage=default_storage):
+    if not renditions:
+        return None
+    names = renditions.get('webp') or renditions.get('jpeg')
+    if not names:
+        return None
+    return storage.url(names[min(names, key=int)])
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+INGEST_DIR = 'article_pictures'
+
+
+def _init_worker():
+    # Spawned workers (macOS, Windows) start without Django configured
+    import django
+    django.setup()
+
+
+def inspect_image(path):
+    """Hash and validate one image file; runs in a worker process."""
+    try:
+        with open(path, 'rb') as f:
+            digest = content_hash(f)
+            with Image.open(f) as image:
+                width, height = image.size
+                image.verify()
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        return {'path': path, 'error': str(e) or e.__class__.__name__}
+    return {'path': path, 'sha256': digest, 'width': width, 'height': height}
+
+
+def _place(source, destination, link):
+    """Hard-link (or copy) source to destination unless an identical file is already there."""
+    if os.path.exists(destination):
+        return False
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    temporary = f'{destination}.{os.getpid()}.tmp'
+    if link:
+        try:
+            os.link(source, temporary)
+        except OSError:
+            # Cross-device or unsupported file system
+            shutil.copyfile(source, temporary)
+    else:
+        shutil.copyfile(source, temporary)
+    os.replace(temporary, destination)
+    return True
+
+
+def ingest_images(images_dir, workers=None, link=True, renditions=True, log=None):
+    """
+    Hash, validate, deduplicate and place every image in images_dir.
+
+    Hashing, validation and rendition encoding run in a process pool and the
+    files are linked or copied into MEDIA_ROOT/article_pictures by a thread
+    pool, under content-addressed names so identical files are stored once.
+    Returns a manifest ``{'files': {original name: entry}, 'invalid': {...}}``
+    whose entries hold the media-relative ``name``, ``sha256``, size and
+    ``renditions``; the article import resolves images from it by name.
+    """
+    log = log or (lambda message: None)
+    paths = sorted(
+        os.path.join(images_dir, filename)
+        for filename in os.listdir(images_dir)
+        if filename.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    manifest = {'files': {}, 'invalid': {}}
+    if not paths:
+        return manifest
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        inspected = list(pool.map(inspect_image, paths, chunksize=8))
+
+        unique = {}
+        for info in inspected:
+            filename = os.path.basename(info['path'])
+            if 'error' in info:
+                manifest['invalid'][filename] = info['error']
+                continue
+            ext = os.path.splitext(filename)[1].lower()
+            info['name'] = f'{INGEST_DIR}/{info["sha256"][:20]}{ext}'
+            unique.setdefault(info['sha256'], info)
+            manifest['files'][filename] = info
+        log(f'Found {len(manifest["files"])} valid images ({len(unique)} unique, '
+            f'{len(manifest["invalid"])} invalid) in {images_dir}')
+
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            placed = sum(threads.map(
+                lambda info: _place(info['path'], os.path.join(settings.MEDIA_ROOT, info['name']), link),
+                unique.values(),
+            ))
+        log(f'Placed {placed} new images in {os.path.join(settings.MEDIA_ROOT, INGEST_DIR)}')
+
+        if renditions:
+            sources = [os.path.join(settings.MEDIA_ROOT, info['name']) for info in unique.values()]
+            built = dict(zip(unique, pool.map(build_renditions, sources)))
+            log(f'Built renditions for {len(built)} images')
+        else:
+            built = {}
+
+    for filename, info in manifest['files'].items():
+        manifest['files'][filename] = {
+            'name': info['name'],
+            'sha256': info['sha256'],
+            'width': info['width'],
+            'height': info['height'],
+            'renditions': built.get(info['sha256']),
+        }
+    return manifest
+
+
+def write_manifest(manifest, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def load_manifest(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,124 @@
+# backend/api/ingest.py
+import hashlib
+import json
+from urllib.parse import urlsplit, urlunsplit
+
+READ_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffered character reader that lets raw_decode work on a file in pieces."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        chunk = self.f.read(READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has already been consumed so the buffer stays small
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f'Expected {char!r} at offset {self.pos} of the JSON buffer')
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self.fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_stories(f, key='stories'):
+    """
+    Yield the stories of a newsletter JSON file one at a time.
+
+    Only the top-level object is walked; the ``stories`` array is decoded
+    element by element, so memory use is bounded by the largest story rather
+    than the size of the file. Other top-level keys are decoded and discarded.
+    """
+    reader = _Reader(f)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.peek() == ',':
+                        reader.pos += 1
+                        continue
+                    reader.expect(']')
+                    break
+        else:
+            reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+            continue
+        reader.expect('}')
+        return
+
+
+def normalize_link(link):
+    """
+    Canonical form of a story link for identity purposes, or '' if it does
+    not identify a single story (empty, or just a site's front page).
+    """
+    parts = urlsplit((link or '').strip())
+    path = parts.path.rstrip('/')
+    if not parts.netloc or not (path or parts.query):
+        return ''
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+def story_identity(link, source, title):
+    """
+    Stable identity of a story: its normalized link, so edits and renames map
+    to the same article, falling back to source and title for stories
+    without a usable link. Returned as a sha256 hex digest.
+    """
+    link = normalize_link(link)
+    key = f'url:{link}' if link else f'story:{source}\n{title}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def story_hash(story):
+    """Digest of the imported fields of a story, to skip unchanged stories on re-import."""
+    fields = [story.get(name) or '' for name in ('title', 'content', 'source', 'link', 'image')]
+    return hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode('utf-8')).hexdigest()
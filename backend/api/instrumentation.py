@@ -0,0 +1,260 @@
+# backend/api/instrumentation.py
+import bisect
+import hmac
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the request being handled. A context variable rather than a
+# thread local, so queries run by async views in sync_to_async threads are
+# still attributed to their request.
+_current = ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestMetrics:
+    """Timings and SQL statistics collected while handling one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.timings = {}
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+@contextmanager
+def timer(name):
+    """Add the time spent in the block to the current request's ``name`` timing."""
+    metrics = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.add(name, time.perf_counter() - start)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; counts and times the current request's queries."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+        # Keyed without parameters, so an N+1 loop shows up as one repeated statement
+        metrics.statements[sql] += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver: wrap the new connection's queries with record_query."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics rendered in the Prometheus text format.
+
+    Every server process keeps its own registry, so with several gunicorn
+    workers each scrape sees the worker that answered it.
+    """
+    histograms = {
+        'gladstart_request_duration_seconds': ('Request handling time', DURATION_BUCKETS),
+        'gladstart_request_db_seconds': ('Time spent in SQL queries per request', DURATION_BUCKETS),
+        'gladstart_request_serialize_seconds': ('Time spent rendering response bodies per request', DURATION_BUCKETS),
+        'gladstart_request_queries': ('SQL queries per request', QUERY_BUCKETS),
+        'gladstart_response_size_bytes': ('Response body size', SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.series = {}
+
+    def observe(self, view, method, status, metrics, size):
+        values = {
+            'gladstart_request_duration_seconds': metrics.elapsed,
+            'gladstart_request_db_seconds': metrics.db_time,
+            'gladstart_request_serialize_seconds': metrics.timings.get('serialize', 0.0),
+            'gladstart_request_queries': metrics.queries,
+            'gladstart_response_size_bytes': size,
+        }
+        with self.lock:
+            self.requests[(view, method, str(status))] += 1
+            for name, value in values.items():
+                if value is None:
+                    # Streaming bodies have no size up front
+                    continue
+                key = (name, view)
+                if key not in self.series:
+                    self.series[key] = Histogram(self.histograms[name][1])
+                self.series[key].observe(value)
+
+    def render(self):
+        lines = [
+            '# HELP gladstart_requests_total Requests handled',
+            '# TYPE gladstart_requests_total counter',
+        ]
+        with self.lock:
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(f'gladstart_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+            for name, (description, buckets) in self.histograms.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for (series_name, view), histogram in sorted(self.series.items()):
+                    if series_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{view="{view}"}} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{{view="{view}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Record the resolved view, SQL query count and time, response rendering
+    ("serialize") time and body size of every request.
+
+    Adds a Server-Timing header (API_SERVER_TIMING), logs requests slower
+    than API_SLOW_REQUEST_MS and statements repeated at least
+    API_DUPLICATE_QUERY_THRESHOLD times, and feeds the registry served at
+    /metrics. Works in both sync (WSGI) and async (ASGI) middleware chains;
+    it should come first in MIDDLEWARE so it covers the rest of the chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that step
+        render = response.render
+
+        def timed_render():
+            with timer('serialize'):
+                return render()
+
+        response.render = timed_render
+        return response
+
+    def finish(self, request, response, metrics):
+        if request.path == '/metrics':
+            return response
+
+        view = view_label(request)
+        elapsed = metrics.elapsed
+        size = None if response.streaming else len(response.content)
+        serialize = metrics.timings.get('serialize', 0.0)
+        registry.observe(view, request.method, response.status_code, metrics, size)
+
+        if getattr(settings, 'API_SERVER_TIMING', True):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+                f'serialize;dur={serialize * 1000:.1f}',
+                f'app;dur={max(0.0, elapsed - metrics.db_time - serialize) * 1000:.1f}',
+                f'total;dur={elapsed * 1000:.1f}',
+            ])
+
+        slow_ms = getattr(settings, 'API_SLOW_REQUEST_MS', 500)
+        if slow_ms is not None and elapsed * 1000 >= slow_ms:
+            logger.warning(
+                'Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms, serialize %.1f ms',
+                request.method, request.get_full_path(), view, elapsed * 1000,
+                metrics.queries, metrics.db_time * 1000, serialize * 1000,
+            )
+        threshold = getattr(settings, 'API_DUPLICATE_QUERY_THRESHOLD', 5)
+        if threshold:
+            for sql, count in metrics.statements.most_common():
+                if count < threshold:
+                    break
+                logger.warning('Query repeated %d times in %s %s (%s): %s',
+                               count, request.method, request.path, view, sql[:300])
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of the registry, for scrapers that send
+    ``Authorization: Bearer <API_METRICS_TOKEN>``; absent while no token is set.
+    """
+    token = getattr(settings, 'API_METRICS_TOKEN', None)
+    if not token:
+        raise Http404
+    # The client address cannot be trusted behind a reverse proxy, a secret can
+    given = request.META.get('HTTP_AUTHORIZATION', '')
+    if not hmac.compare_digest(given.encode(), f'Bearer {token}'.encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,184 @@
+# backend/api/management/commands/benchmark_asgi.py
+import asyncio
+import io
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from api.models import Article
+
+ENDPOINTS = {
+    'articles': ('/api/articles/', '/api/async/articles/'),
+    'article': ('/api/articles/{pk}/', '/api/async/articles/{pk}/'),
+    'regions': ('/api/regions/', '/api/async/regions/'),
+    'topics': ('/api/topics/', '/api/async/topics/'),
+    'posts': ('/api/posts/', '/api/async/posts/'),
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the sync viewsets served over WSGI with a fixed thread pool, the same viewsets '
+        'over ASGI and the async endpoints over ASGI, with many concurrent clients that read '
+        'their responses slowly'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', type=str, default=','.join(ENDPOINTS),
+                            help=f'Comma-separated endpoints to run ({", ".join(ENDPOINTS)})')
+        parser.add_argument('--concurrency', type=str, default='20,200',
+                            help='Comma-separated numbers of concurrent clients')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per run')
+        parser.add_argument('--slow_ms', type=float, default=50.0,
+                            help='Time each client takes to read a response body, in milliseconds')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Worker threads of the WSGI server being modelled (gunicorn --threads)')
+        parser.add_argument('--miss', action='store_true',
+                            help='Make every request unique so the response cache never hits')
+        parser.add_argument('--json', type=str, default='', help='Also write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        self.asgi = get_asgi_application()
+        self.wsgi = get_wsgi_application()
+        self.slow = options['slow_ms'] / 1000
+        self.miss = options['miss']
+        pk = Article.objects.order_by('-id').values_list('id', flat=True).first() or 1
+
+        results = []
+        for name in options['endpoints'].split(','):
+            sync_path, async_path = (path.format(pk=pk) for path in ENDPOINTS[name.strip()])
+            for concurrency in (int(value) for value in options['concurrency'].split(',')):
+                runs = (
+                    (f'wsgi {options["threads"]} threads', self.run_wsgi, sync_path, options['threads']),
+                    ('asgi sync view', self.run_asgi, sync_path, None),
+                    ('asgi async view', self.run_asgi, async_path, None),
+                )
+                for label, runner, path, threads in runs:
+                    result = asyncio.run(self.measure(runner, path, concurrency, options['requests'], threads))
+                    result.update({'endpoint': name, 'server': label, 'path': path, 'concurrency': concurrency})
+                    results.append(result)
+                    self.report(result)
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f'Wrote {len(results)} results to {options["json"]}')
+        self.stdout.write(self.style.SUCCESS('Successfully benchmarked ASGI and WSGI serving!'))
+
+    def report(self, result):
+        self.stdout.write(
+            f'{result["endpoint"]:<9} {result["server"]:<18} c={result["concurrency"]:<4} '
+            f'{result["throughput"]:8.1f} req/s  p50 {result["p50_ms"]:7.1f} ms  '
+            f'p95 {result["p95_ms"]:7.1f} ms  p99 {result["p99_ms"]:7.1f} ms  '
+            f'peak threads {result["peak_threads"]:<4} errors {result["errors"]}'
+        )
+
+    async def measure(self, runner, path, concurrency, total, threads):
+        latencies = []
+        errors = 0
+        peak_threads = threading.active_count()
+        counter = iter(range(total))
+        done = asyncio.Event()
+        pool = ThreadPoolExecutor(max_workers=threads) if threads else None
+
+        async def sample_threads():
+            nonlocal peak_threads
+            while not done.is_set():
+                peak_threads = max(peak_threads, threading.active_count())
+                await asyncio.sleep(0.002)
+
+        async def client():
+            nonlocal errors
+            for n in counter:
+                query = f'_={n}' if self.miss else ''
+                start = time.perf_counter()
+                status = await runner(path, query, pool)
+                latencies.append(time.perf_counter() - start)
+                errors += status != 200
+
+        sampler = asyncio.create_task(sample_threads())
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await sampler
+        if pool is not None:
+            pool.shutdown()
+
+        return {
+            'requests': total,
+            'errors': errors,
+            'seconds': round(elapsed, 3),
+            'throughput': round(total / elapsed, 1),
+            'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'peak_threads': peak_threads,
+        }
+
+    async def run_asgi(self, path, query, pool=None):
+        """One request through the ASGI application; the client reads the body slowly."""
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'accept', b'application/json')],
+            'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        finished = asyncio.Event()
+        status = None
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                # The event loop keeps serving other clients while this one reads
+                await asyncio.sleep(self.slow)
+                finished.set()
+
+        await self.asgi(scope, receive, send)
+        return status
+
+    async def run_wsgi(self, path, query, pool):
+        return await asyncio.get_running_loop().run_in_executor(pool, self.wsgi_request, path, query)
+
+    def wsgi_request(self, path, query):
+        """One request through the WSGI application on a worker thread, which stays busy until the client has read the body."""
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'localhost', 'HTTP_ACCEPT': 'application/json', 'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(b''),
+            'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        status = []
+        body = self.wsgi(environ, lambda value, headers, exc_info=None: status.append(value))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        time.sleep(self.slow)
+        return int(status[0].split()[0])
@@ -0,0 +1,163 @@
+# backend/api/management/commands/benchmark_engagement.py
+import multiprocessing
+import random
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.test import Client, override_settings
+from api import engagement
+from api.cache import bump_versions
+from api.engagement import FIELDS, EngagementBuffer
+from api.models import UserPost
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test post engagement counters: concurrent clients add likes, comments and shares '
+        'to a set of posts for a while, then the stored counts are checked against what was sent. '
+        'The posts\' original counts are restored afterwards'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Processes to run the clients in, like web workers each with its own buffer')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent clients per process')
+        parser.add_argument('--seconds', type=float, default=5.0, help='How long the clients run')
+        parser.add_argument('--posts', type=int, default=50, help='Posts the increments are spread over')
+        parser.add_argument('--flush_seconds', type=float, default=0.5, help='Interval of the background flushes')
+        parser.add_argument('--http', action='store_true',
+                            help='POST through /api/posts/{id}/engagement/ instead of calling the buffer directly')
+        parser.add_argument('--naive', action='store_true',
+                            help='For comparison, run one F() UPDATE per increment instead of buffering')
+        parser.add_argument('--keep', action='store_true', help='Keep the added counts')
+
+    def handle(self, *args, **options):
+        post_ids = list(UserPost.objects.order_by('id').values_list('id', flat=True)[:options['posts']])
+        if not post_ids:
+            raise CommandError('There are no user posts; run load_initial_data or generate_synthetic_data first')
+        original = {row[0]: row[1:] for row in UserPost.objects.filter(id__in=post_ids).values_list('id', *FIELDS)}
+        mode = 'the API' if options['http'] else 'one F() UPDATE per increment' if options['naive'] else 'the buffer'
+        processes = max(1, options['processes'])
+        self.stdout.write(f'Adding engagement to {len(post_ids)} posts from {processes} x {options["threads"]} '
+                          f'clients for {options["seconds"]:.0f}s through {mode}')
+
+        start = time.perf_counter()
+        if processes == 1:
+            results = [self.run_clients(options, post_ids, check_reads=True)]
+        else:
+            # Forked children must not share the parent's database connections
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            queue = context.Queue()
+            children = [
+                context.Process(target=lambda: queue.put(self.run_clients(options, post_ids)))
+                for _ in range(processes)
+            ]
+            for child in children:
+                child.start()
+            results = [queue.get() for _ in children]
+            for child in children:
+                child.join()
+        elapsed = time.perf_counter() - start
+
+        sent = {post_id: [0, 0, 0] for post_id in post_ids}
+        problems = []
+        for counts, errors in results:
+            for post_id, added in counts.items():
+                sent[post_id] = [a + b for a, b in zip(sent[post_id], added)]
+            problems.extend(errors)
+        total = sum(sum(counts) for counts in sent.values())
+        self.stdout.write(f'Sent {total} increments in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f}/s), '
+                          f'{len(problems)} failed')
+
+        stored = {row[0]: row[1:] for row in UserPost.objects.filter(id__in=post_ids).values_list('id', *FIELDS)}
+        if any(tuple(a + b for a, b in zip(original[post_id], sent[post_id])) != stored[post_id] for post_id in post_ids):
+            problems.append('Stored counts do not match the increments sent')
+
+        if not options['keep']:
+            with transaction.atomic(), connection.cursor() as cursor:
+                assignments = ', '.join(f'{connection.ops.quote_name(field)} = %s' for field in FIELDS)
+                cursor.executemany(f'UPDATE {UserPost._meta.db_table} SET {assignments} WHERE id = %s',
+                                   [(*counts, post_id) for post_id, counts in original.items()])
+            bump_versions(UserPost)
+
+        for problem in problems[:10]:
+            self.stdout.write(self.style.ERROR(f'  {problem}'))
+        if problems:
+            raise CommandError(f'{len(problems)} problem(s) with the engagement counters')
+        self.stdout.write(self.style.SUCCESS('Every increment was counted!'))
+
+    def run_clients(self, options, post_ids, check_reads=False):
+        """
+        Run the client threads of one process and flush its buffer.
+        Returns ({post id: [likes, comments, shares] sent}, [errors]).
+        """
+        if options['http']:
+            buffer = engagement.buffer
+            buffer.interval = options['flush_seconds']
+        elif not options['naive']:
+            buffer = EngagementBuffer(interval=options['flush_seconds'])
+        else:
+            buffer = None
+        if check_reads and buffer is not None:
+            before = buffer.counts(post_ids)
+
+        sent = {post_id: [0, 0, 0] for post_id in post_ids}
+        errors = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+
+        def client(seed):
+            rng = random.Random(seed)
+            http = Client(HTTP_HOST='localhost')
+            mine = {post_id: [0, 0, 0] for post_id in post_ids}
+            try:
+                while time.perf_counter() < deadline:
+                    post_id = rng.choice(post_ids)
+                    field = rng.randrange(3)
+                    try:
+                        if options['http']:
+                            response = http.post(f'/api/posts/{post_id}/engagement/', {FIELDS[field]: 1},
+                                                 content_type='application/json')
+                            if response.status_code != 200:
+                                raise RuntimeError(f'HTTP {response.status_code}')
+                        elif buffer is None:
+                            UserPost.objects.filter(pk=post_id).update(**{FIELDS[field]: F(FIELDS[field]) + 1})
+                        else:
+                            buffer.add(post_id, *(int(i == field) for i in range(3)))
+                    except Exception as e:
+                        with lock:
+                            errors.append(f'{e.__class__.__name__}: {e}')
+                        continue
+                    mine[post_id][field] += 1
+            finally:
+                with lock:
+                    for post_id, counts in mine.items():
+                        sent[post_id] = [a + b for a, b in zip(sent[post_id], counts)]
+                connections.close_all()
+
+        threads = [threading.Thread(target=client, args=(seed,)) for seed in range(options['threads'])]
+        # Every client posts from the same address, far faster than a person clicks
+        with override_settings(API_ENGAGEMENT_RATE=None):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        if buffer is not None:
+            if check_reads:
+                # Reads include the increments not written yet
+                expected = {
+                    post_id: {field: before[post_id][field] + added for field, added in zip(FIELDS, sent[post_id])}
+                    for post_id in post_ids
+                }
+                if buffer.counts(post_ids) != expected:
+                    errors.append('Counts read before the final flush do not match the increments sent')
+            start = time.perf_counter()
+            written = buffer.flush()
+            self.stdout.write(f'Final flush wrote {written} posts in {(time.perf_counter() - start) * 1000:.1f} ms')
+            buffer.stopped.set()
+        connections.close_all()
+        return sent, errors
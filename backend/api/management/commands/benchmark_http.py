@@ -0,0 +1,275 @@
+# backend/api/management/commands/benchmark_http.py
+import datetime
+import http.client
+import itertools
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import URLPattern
+from django.utils import timezone
+from api.management.commands.benchmark_asgi import percentile
+from api.management.commands.benchmark_queries import filter_combinations
+from api.models import Region, Article
+from api.urls import async_urlpatterns, router
+
+# Extra parameters per extra action, so a run measures a realistic request;
+# an unfiltered export of the whole corpus is a bulk download, not a page load
+ACTION_PARAMS = {
+    'export': lambda region: {'region__name': region, 'min_score': 0.95, 'format': 'ndjson',
+                              'published_after': (timezone.now() - datetime.timedelta(days=7)).isoformat()},
+}
+# Actions that are also run with every article filter combination
+FILTERED = {'article-list', 'article-facets', 'async-article-list'}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test every API route over real HTTP with concurrent keep-alive clients and report '
+        'p50/p95/p99 latency and throughput per endpoint and filter combination'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base_url', type=str, default='',
+                            help='Benchmark a running server (e.g. http://127.0.0.1:8000) instead of starting one')
+        parser.add_argument('--server', choices=('gunicorn', 'runserver'), default='gunicorn',
+                            help='Server to start when no --base_url is given')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+        parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+        parser.add_argument('--endpoints', type=str, default='',
+                            help='Only run targets whose name contains one of these comma-separated strings')
+        parser.add_argument('--concurrency', type=str, default='1,16', help='Comma-separated numbers of concurrent clients')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per target, mode and concurrency')
+        parser.add_argument('--modes', type=str, default='warm,cold',
+                            help='warm repeats the same URL (response cache hits); cold makes every URL unique')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+        parser.add_argument('--output', type=str, default='', help='Write machine-readable results to this JSON file')
+        parser.add_argument('--compare', type=str, default='', help='Print the change against an earlier --output file')
+
+    def handle(self, *args, **options):
+        self.timeout = options['timeout']
+        targets = self.get_targets()
+        if options['endpoints']:
+            wanted = [value.strip() for value in options['endpoints'].split(',') if value.strip()]
+            targets = [target for target in targets if any(value in target['name'] for value in wanted)]
+        if not targets:
+            raise CommandError('No targets match --endpoints')
+
+        server = None
+        base_url = options['base_url']
+        if not base_url:
+            server, base_url = self.start_server(options)
+        self.netloc = urlsplit(base_url).netloc
+        try:
+            results = self.run(targets, options)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        data = {'meta': self.get_meta(base_url, options), 'results': results}
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            self.stdout.write(f'Wrote {len(results)} results to {options["output"]}')
+        if options['compare']:
+            self.compare(options['compare'], results)
+        self.stdout.write(self.style.SUCCESS('Successfully benchmarked the API over HTTP!'))
+
+    def get_targets(self):
+        """Every router route (list, detail, extra actions), the async routes and the article filter combinations."""
+        region = Region.objects.values_list('name', flat=True).first() or 'National'
+        latest = Article.objects.order_by('-id').values_list('id', flat=True).first() or 1
+        combinations = filter_combinations()
+
+        targets = []
+        for prefix, viewset, basename in router.registry:
+            targets.append({'name': f'{basename}-list', 'path': f'/api/{prefix}/', 'params': {}})
+            queryset = getattr(viewset, 'queryset', None)
+            if queryset is not None:
+                pk = latest if queryset.model is Article else queryset.order_by('pk').values_list('pk', flat=True).first()
+                if pk is not None:
+                    targets.append({'name': f'{basename}-detail', 'path': f'/api/{prefix}/{pk}/', 'params': {}})
+            for extra in viewset.get_extra_actions():
+                if extra.detail:
+                    continue
+                params = ACTION_PARAMS[extra.url_path](region) if extra.url_path in ACTION_PARAMS else {}
+                targets.append({'name': f'{basename}-{extra.url_path}', 'path': f'/api/{prefix}/{extra.url_path}/', 'params': params})
+
+        for pattern in async_urlpatterns:
+            if isinstance(pattern, URLPattern):
+                route = str(pattern.pattern).replace('<int:pk>', str(latest))
+                targets.append({'name': pattern.name, 'path': f'/api/async/{route}', 'params': {}})
+
+        expanded = []
+        for target in targets:
+            expanded.append(target)
+            if target['name'] in FILTERED:
+                # The unfiltered request is already in the list
+                expanded.extend(dict(target, params=dict(target['params'], **params)) for params in combinations if params)
+        return expanded
+
+    def start_server(self, options):
+        port = free_port()
+        if options['server'] == 'gunicorn':
+            # Deployed configuration; runserver leaves Nagle's algorithm on,
+            # which adds ~40 ms delayed-ACK stalls to small keep-alive responses
+            command = [sys.executable, '-m', 'gunicorn', 'gladstart.wsgi:application',
+                       '--bind', f'127.0.0.1:{port}', '--workers', str(options['workers']),
+                       '--threads', str(options['threads']), '--chdir', str(settings.BASE_DIR)]
+        else:
+            command = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+                       'runserver', '--noreload', f'127.0.0.1:{port}']
+        server = subprocess.Popen(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=os.environ.copy(),
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'{options["server"]} exited during startup')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                self.stdout.write(f'Started {options["server"]} on 127.0.0.1:{port}')
+                return server, f'http://127.0.0.1:{port}'
+            except OSError:
+                time.sleep(0.1)
+        server.terminate()
+        raise CommandError(f'{options["server"]} did not start within 30 seconds')
+
+    def run(self, targets, options):
+        results = []
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        # Unique across invocations too, for servers that outlive one run
+        run_ids = itertools.count(int(time.time() * 1000))
+        for target in targets:
+            query = urlencode(target['params'])
+            label = f'{target["name"]}?{query}' if query else target['name']
+            for mode in modes:
+                for concurrency in (int(value) for value in options['concurrency'].split(',')):
+                    if mode == 'warm':
+                        # Fill the response cache before timing
+                        self.fetch(http.client.HTTPConnection(self.netloc, timeout=self.timeout), target['path'], query)
+                    result = self.measure(target['path'], query, mode, next(run_ids), concurrency, options['requests'])
+                    result.update({'name': target['name'], 'path': target['path'], 'params': target['params'],
+                                   'label': label, 'mode': mode, 'concurrency': concurrency})
+                    results.append(result)
+                    self.report(result)
+        return results
+
+    def fetch(self, conn, path, query):
+        """Send one GET on a keep-alive connection; returns (status, body size)."""
+        # Any media type: JSON is negotiated by default and ?format= picks export formats
+        conn.request('GET', f'{path}?{query}' if query else path, headers={'Accept': '*/*'})
+        response = conn.getresponse()
+        return response.status, len(response.read())
+
+    def measure(self, path, query, mode, run_id, concurrency, total):
+        latencies = []
+        statuses = {}
+        sizes = []
+        counter = iter(range(total))
+        lock = threading.Lock()
+
+        def client():
+            conn = http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+            try:
+                for n in counter:
+                    request_query = query
+                    if mode == 'cold':
+                        # A parameter no view reads, so the response cache always misses
+                        request_query = '&'.join(filter(None, [query, f'_={run_id}-{n}']))
+                    start = time.perf_counter()
+                    try:
+                        status, size = self.fetch(conn, path, request_query)
+                    except (OSError, http.client.HTTPException):
+                        conn.close()
+                        conn = http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+                        status, size = 'error', 0
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed)
+                        sizes.append(size)
+                        statuses[status] = statuses.get(status, 0) + 1
+            finally:
+                conn.close()
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        return {
+            'requests': total,
+            'errors': sum(count for status, count in statuses.items() if status != 200),
+            'statuses': {str(status): count for status, count in statuses.items()},
+            'seconds': round(elapsed, 3),
+            'throughput': round(total / elapsed, 1),
+            'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'max_ms': round(max(latencies) * 1000, 2),
+            'mean_bytes': round(statistics.mean(sizes)),
+        }
+
+    def report(self, result):
+        style = self.style.WARNING if result['errors'] else str
+        self.stdout.write(style(
+            f'{result["label"][:60]:<60} {result["mode"]:<4} c={result["concurrency"]:<3} '
+            f'{result["throughput"]:8.1f} req/s  p50 {result["p50_ms"]:7.1f} ms  '
+            f'p95 {result["p95_ms"]:7.1f} ms  p99 {result["p99_ms"]:7.1f} ms  errors {result["errors"]}'
+        ))
+
+    def get_meta(self, base_url, options):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True,
+                                    text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'commit': commit,
+            'base_url': base_url,
+            'server': 'external' if options['base_url'] else options['server'],
+            'database': connection.vendor,
+            'articles': Article.objects.count(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'options': {key: options[key] for key in ('concurrency', 'requests', 'modes', 'endpoints', 'workers', 'threads')},
+        }
+
+    def compare(self, path, results):
+        with open(path, 'r', encoding='utf-8') as f:
+            previous = {
+                (result['label'], result['mode'], result['concurrency']): result
+                for result in json.load(f)['results']
+            }
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Change against {path}'))
+        for result in results:
+            old = previous.get((result['label'], result['mode'], result['concurrency']))
+            if old is None:
+                continue
+            changes = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput'):
+                change = (result[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+                changes.append(f'{key} {old[key]:.1f} -> {result[key]:.1f} ({change:+.0f}%)')
+            self.stdout.write(f'{result["label"][:60]:<60} {result["mode"]:<4} c={result["concurrency"]:<3} ' + '  '.join(changes))
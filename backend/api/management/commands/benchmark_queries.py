@@ -0,0 +1,135 @@
+# backend/api/management/commands/benchmark_queries.py
+import random
+import time
+import datetime
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from api.models import Region, Source, Topic, Article
+from api.views import ArticleViewSet
+
+
+def filter_combinations():
+    """The ArticleViewSet filter combinations worth benchmarking, using names present in the database."""
+    region = Region.objects.values_list('name', flat=True).first() or 'National'
+    topic = Topic.objects.values_list('name', flat=True).first() or 'Sport'
+    source = Source.objects.values_list('name', flat=True).first() or 'svt.se'
+    return [
+        {},
+        {'region__name': region},
+        {'topics__name': topic},
+        {'source__name': source},
+        {'min_score': 0.9},
+        {'region__name': region, 'min_score': 0.9},
+        {'region__name': region, 'topics__name': topic},
+        {'region__name': region, 'source__name': source},
+        {'region__name': region, 'topics__name': topic, 'source__name': source, 'min_score': 0.8},
+        {'search': 'forskning'},
+    ]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Print EXPLAIN QUERY PLAN and timings for every ArticleViewSet filter combination'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--synthetic', type=int, default=0,
+                            help='Insert this many synthetic articles first (rolled back afterwards)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['synthetic']:
+                    self.populate(options['synthetic'])
+                self.run(max(1, options['repeat']))
+                # Never keep the synthetic rows
+                raise Rollback
+        except Rollback:
+            pass
+
+    def populate(self, count):
+        self.stdout.write(f'Inserting {count} synthetic articles...')
+        regions = list(Region.objects.all()) or [Region.objects.create(name='National', positivity=0.8)]
+        sources = list(Source.objects.all()) or [Source.objects.create(name='svt.se')]
+        topics = list(Topic.objects.all()) or [Topic.objects.create(name='Positiva nyheter')]
+        through = Article.topics.through
+        now = timezone.now()
+        start = time.perf_counter()
+        for offset in range(0, count, 5000):
+            articles = Article.objects.bulk_create([
+                Article(
+                    title=f'Synthetic article {offset + i}',
+                    summary='Syntetisk sammanfattning för prestandatest.',
+                    source=random.choice(sources),
+                    region=random.choice(regions),
+                    published_date=now - datetime.timedelta(minutes=random.randint(0, 525600)),
+                    positivity_score=round(random.uniform(0.5, 1.0), 2),
+                    url='https://example.com/',
+                )
+                for i in range(min(5000, count - offset))
+            ])
+            through.objects.bulk_create([
+                through(article_id=article.pk, topic_id=topic.pk)
+                for article in articles
+                for topic in random.sample(topics, min(2, len(topics)))
+            ], ignore_conflicts=True)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(f'Inserted in {time.perf_counter() - start:.1f}s')
+
+    def build_queryset(self, params):
+        """Run params through the real ArticleViewSet filter pipeline."""
+        view = ArticleViewSet()
+        view.request = Request(APIRequestFactory().get('/api/articles/', params))
+        view.format_kwarg = None
+        view.action = 'list'
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        ordering = paginator.get_ordering(queryset, view)
+        return queryset.order_by(*ordering)[:paginator.page_size + 1]
+
+    def run(self, repeat):
+        total = Article.objects.count()
+        self.stdout.write(f'Benchmarking against {total} articles ({connection.vendor})')
+        full_scans = 0
+
+        for params in filter_combinations():
+            queryset = self.build_queryset(params)
+            sql, sql_params = queryset.query.sql_with_params()
+            label = '&'.join(f'{key}={value}' for key, value in params.items()) or '(no filters)'
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}', sql_params)
+                    for row in cursor.fetchall():
+                        detail = row[-1]
+                        # A bare SCAN of the article table reads every row
+                        if detail.startswith('SCAN api_article') and 'INDEX' not in detail \
+                                and not detail.startswith('SCAN api_article_fts'):
+                            full_scans += 1
+                            self.stdout.write(self.style.WARNING(f'  {detail}'))
+                        else:
+                            self.stdout.write(f'  {detail}')
+
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.values_list('id', flat=True))
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'  median {timings[len(timings) // 2]:.2f} ms, '
+                f'max {timings[-1]:.2f} ms over {repeat} runs'
+            )
+
+        if full_scans:
+            self.stdout.write(self.style.WARNING(f'{full_scans} full table scan(s) found'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full table scans!'))
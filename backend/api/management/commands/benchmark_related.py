@@ -0,0 +1,101 @@
+# backend/api/management/commands/benchmark_related.py
+import resource
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from api.related import FEATURES, RelatedIndex, iter_article_rows, related_count
+
+SYLLABLES = ['ba', 'ke', 'lo', 'mi', 'nu', 'ra', 'se', 'ti', 'vo', 'gå', 'hä', 'fö', 'sk', 'st', 'an', 'er']
+
+
+def peak_memory_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure build time, search time and memory of the related-articles index on a synthetic '
+        'corpus of the given size (or on the articles in the database); nothing is written'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=1000000, help='Size of the synthetic corpus')
+        parser.add_argument('--vocabulary', type=int, default=100000, help='Distinct words in the synthetic corpus')
+        parser.add_argument('--words', type=int, default=60, help='Words per synthetic title and summary')
+        parser.add_argument('--batch_size', type=int, default=1000, help='Articles searched per sparse product')
+        parser.add_argument('--search', type=int, default=None,
+                            help='Only search the neighbours of this many articles and extrapolate')
+        parser.add_argument('--from_db', action='store_true', help='Index the articles in the database instead')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rss_start = peak_memory_mb()
+        rows = iter_article_rows() if options['from_db'] else self.synthetic_rows(options)
+
+        start = time.perf_counter()
+        index = RelatedIndex.build(rows)
+        build_seconds = time.perf_counter() - start
+        rss_build = peak_memory_mb()
+        n = len(index)
+        matrix = index.matrix
+        index_mb = (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+                    + index.ids.nbytes + index.df.nbytes) / 2 ** 20
+        self.stdout.write(
+            f'Built the index of {n} articles in {build_seconds:.1f}s ({n / max(build_seconds, 1e-9):.0f}/s): '
+            f'{matrix.nnz / max(n, 1):.1f} terms per article, {index_mb:.0f} MB'
+        )
+
+        start = time.perf_counter()
+        inverted_bytes = index.inverted.data.nbytes + index.inverted.indices.nbytes + index.inverted.indptr.nbytes
+        self.stdout.write(f'Inverted the index in {time.perf_counter() - start:.1f}s ({inverted_bytes / 2 ** 20:.0f} MB)')
+
+        searched = min(n, options['search'] or n)
+        batch_size = max(1, options['batch_size'])
+        k = related_count()
+        found = 0
+        start = time.perf_counter()
+        for offset in range(0, searched, batch_size):
+            stop = min(offset + batch_size, searched)
+            for _, neighbours in index.neighbours(index.ids[offset:stop], matrix[offset:stop], k):
+                found += len(neighbours)
+        search_seconds = time.perf_counter() - start
+        line = (f'Searched the top {k} neighbours of {searched} articles in {search_seconds:.1f}s '
+                f'({searched / max(search_seconds, 1e-9):.0f}/s, {found / max(searched, 1):.1f} found per article)')
+        if searched < n:
+            line += f'; all {n} would take about {search_seconds * n / searched:.0f}s'
+        self.stdout.write(line)
+
+        self.stdout.write(
+            f'Peak memory: {rss_build:.0f} MB after building, {peak_memory_mb():.0f} MB after searching '
+            f'({rss_start:.0f} MB at start, feature space {FEATURES})'
+        )
+        self.stdout.write(self.style.SUCCESS('Related-articles benchmark complete!'))
+
+    def synthetic_rows(self, options):
+        """
+        Yield (id, title, summary) rows of random text. Words follow a Zipf
+        distribution, and a quarter of each text comes from one of many small
+        "story" vocabularies, so articles have real neighbours to find.
+        """
+        rng = np.random.default_rng(options['seed'])
+        vocabulary = options['vocabulary']
+        words = [
+            ''.join(SYLLABLES[(i >> shift) & 15] for shift in range(0, 16, 4)) + SYLLABLES[i % 7]
+            for i in range(vocabulary)
+        ]
+        weights = 1.0 / np.arange(1, vocabulary + 1) ** 1.1
+        weights /= weights.sum()
+        stories = rng.integers(vocabulary // 10, vocabulary, size=(max(1, options['articles'] // 20), 20))
+
+        length = options['words']
+        topical = length // 4
+        chunk = 10000
+        for offset in range(0, options['articles'], chunk):
+            size = min(chunk, options['articles'] - offset)
+            common = rng.choice(vocabulary, size=(size, length - topical), p=weights)
+            story = stories[rng.integers(0, len(stories), size=size)]
+            picks = np.take_along_axis(story, rng.integers(0, story.shape[1], size=(size, topical)), axis=1)
+            for i, row in enumerate(np.concatenate([picks, common], axis=1).tolist()):
+                text = [words[w] for w in row]
+                yield offset + i + 1, ' '.join(text[:8]), ' '.join(text[8:])
@@ -0,0 +1,19 @@
+# backend/api/management/commands/build_related_index.py
+import time
+from django.core.management.base import BaseCommand
+from api.related import index_path, rebuild_related_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the related-articles index from every article and store each article\'s nearest neighbours'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch_size', type=int, default=1000,
+                            help='Number of articles whose neighbours are searched and written per transaction')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        index = rebuild_related_index(max(1, options['batch_size']), log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully indexed {len(index)} articles in {time.perf_counter() - start:.1f}s ({index_path()})!'
+        ))
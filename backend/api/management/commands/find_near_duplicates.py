@@ -0,0 +1,54 @@
+# backend/api/management/commands/find_near_duplicates.py
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from api.cache import bump_versions
+from api.dedup import link_near_duplicates
+from api.models import Article, ArticleBand
+
+
+class Command(BaseCommand):
+    help = 'Fingerprint articles that have no MinHash signature yet and group near-duplicate stories'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk_size', type=int, default=2000,
+                            help='Number of articles fingerprinted and written per transaction')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Drop every fingerprint and cluster first and regroup the whole table')
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        if options['rebuild']:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {ArticleBand._meta.db_table}')
+                cursor.execute(f'UPDATE {Article._meta.db_table} SET minhash = NULL, canonical_id = NULL')
+
+        start = time.perf_counter()
+        last_id = 0
+        fingerprinted = 0
+        linked = 0
+        while True:
+            # Oldest first, so every cluster's canonical article is its first copy
+            rows = list(
+                Article.objects.filter(id__gt=last_id, minhash__isnull=True)
+                .order_by('id')
+                .values_list('id', 'title', 'summary')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            with transaction.atomic():
+                links = link_near_duplicates(
+                    [pk for pk, _, _ in rows], [f'{title} {summary}' for _, title, summary in rows],
+                )
+            fingerprinted += len(rows)
+            linked += len(links)
+            self.stdout.write(f'Fingerprinted {fingerprinted} articles ({linked} near-duplicates)')
+
+        if linked or options['rebuild']:
+            bump_versions(Article)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully fingerprinted {fingerprinted} articles in {elapsed:.1f}s '
+            f'({fingerprinted / max(elapsed, 1e-9):.0f}/s, {linked} near-duplicates)!'
+        ))
@@ -0,0 +1,55 @@
+# backend/api/management/commands/generate_renditions.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from api.cache import bump_versions
+from api.images import article_image_path, build_renditions
+from api.models import Article
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG renditions for article images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Rebuild renditions for articles that already have them')
+        parser.add_argument('--chunk_size', type=int, default=500,
+                            help='Number of articles updated per transaction')
+
+    def handle(self, *args, **options):
+        queryset = Article.objects.exclude(Q(image='') | Q(image__isnull=True), image_url__isnull=True)
+        if not options['force']:
+            queryset = queryset.filter(renditions__isnull=True)
+
+        chunk_size = max(1, options['chunk_size'])
+        built = {}
+        last_id = 0
+        updated = 0
+        while True:
+            articles = list(queryset.filter(id__gt=last_id).order_by('id')[:chunk_size])
+            if not articles:
+                break
+            last_id = articles[-1].pk
+
+            changed = []
+            for article in articles:
+                path = article_image_path(article)
+                if not path:
+                    continue
+                # Stories sharing a picture only pay for it once
+                if path not in built:
+                    built[path] = build_renditions(path)
+                if built[path] != article.renditions:
+                    article.renditions = built[path]
+                    changed.append(article)
+
+            with transaction.atomic():
+                Article.objects.bulk_update(changed, ['renditions'])
+            updated += len(changed)
+            if changed:
+                bump_versions(Article)
+            self.stdout.write(f'Processed {updated} articles')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully generated renditions for {updated} articles from {len(built)} images!'
+        ))
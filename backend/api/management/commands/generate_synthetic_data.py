@@ -0,0 +1,166 @@
+# backend/api/management/commands/generate_synthetic_data.py
+import datetime
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from api.cache import bump_versions
+from api.classifier import DEFAULT_TOPIC_KEYWORDS, get_classifier
+from api.ingest import story_identity
+from api.models import Region, Source, Topic, Article, UserPost
+from api.ranking import rebuild_ranks
+from api.stats import reconcile_region_stats
+
+# Relative share of articles per region, roughly following population
+REGION_WEIGHTS = {
+    'National': 30, 'Stockholm': 22, 'Västra Götaland': 14, 'Skåne': 11, 'Uppsala': 5,
+    'Uppland': 3, 'Småland': 3, 'Halland': 3, 'Närke': 2, 'Dalarna': 2,
+    'Norrbotten': 2, 'Kronoberg': 1.5, 'Blekinge': 1.5,
+}
+
+SOURCES = [
+    'SVT Nyheter', 'Dagens Nyheter', 'Svenska Dagbladet', 'Sveriges Radio', 'Aftonbladet',
+    'Expressen', 'Göteborgs-Posten', 'Sydsvenskan', 'Dagens Industri', 'Breakit',
+    'Computer Sweden', 'Upsala Nya Tidning', 'Norrbottens-Kuriren', 'Smålandsposten',
+]
+
+SUBJECTS = [
+    'Forskare', 'Elever', 'En lokal förening', 'Volontärer', 'Ett startupbolag', 'Kommunen',
+    'Pensionärer', 'Ett fotbollslag', 'Sjukhuspersonal', 'En bonde', 'Studenter', 'Konstnärer',
+]
+ACHIEVEMENTS = [
+    'har tagit fram en ny metod inom {keyword}',
+    'satsar stort på {keyword} för framtiden',
+    'prisas för sitt arbete med {keyword}',
+    'visar att {keyword} gör skillnad i vardagen',
+    'samlar hela bygden kring {keyword}',
+]
+CLOSINGS = [
+    'Initiativet sprids nu till fler orter.',
+    'Resultaten överträffade alla förväntningar.',
+    'Fler vill nu följa deras exempel.',
+    'Arbetet har väckt internationell uppmärksamhet.',
+    'Nästa steg är redan planerat.',
+]
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic corpus of articles and user posts at a configurable scale with bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=100000, help='Number of articles to create')
+        parser.add_argument('--posts', type=int, default=1000, help='Number of user posts to create')
+        parser.add_argument('--days', type=int, default=365, help='Spread publication dates over this many days')
+        parser.add_argument('--chunk_size', type=int, default=5000, help='Rows written per transaction')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for a reproducible corpus')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.classifier = get_classifier()
+        self.now = timezone.now()
+        self.days = max(1, options['days'])
+        chunk_size = max(1, options['chunk_size'])
+
+        start = time.perf_counter()
+        regions = self.ensure_named(Region, REGION_WEIGHTS, positivity=0.0)
+        sources = self.ensure_named(Source, SOURCES)
+        topics = self.ensure_named(Topic, list(dict.fromkeys(DEFAULT_TOPIC_KEYWORDS.values())) + [self.classifier.default_topic])
+        self.region_choices = [regions[name] for name in REGION_WEIGHTS]
+        self.region_weights = list(REGION_WEIGHTS.values())
+        # Zipf-like source popularity: the first sources publish most
+        self.source_choices = [sources[name] for name in SOURCES]
+        self.source_weights = [1 / (rank + 1) for rank in range(len(SOURCES))]
+        self.topics = topics
+        self.offset = Article.objects.count()
+
+        created = 0
+        while created < options['articles']:
+            count = min(chunk_size, options['articles'] - created)
+            self.write_articles(created, count)
+            created += count
+            self.stdout.write(f'Created {created} articles ({time.perf_counter() - start:.1f}s)')
+
+        for offset in range(0, options['posts'], chunk_size):
+            UserPost.objects.bulk_create([self.build_post() for _ in range(min(chunk_size, options['posts'] - offset))])
+        self.stdout.write(f'Created {options["posts"]} user posts')
+
+        # Bulk inserts bypass signals, so derive the region statistics and
+        # rankings and invalidate cached responses once at the end
+        reconcile_region_stats()
+        rebuild_ranks()
+        bump_versions(Region, Source, Topic, Article, UserPost)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully generated {created} articles and {options["posts"]} posts '
+            f'in {time.perf_counter() - start:.1f}s!'
+        ))
+
+    def ensure_named(self, model, names, **defaults):
+        """Return {name: obj} for names, inserting the missing ones in bulk."""
+        existing = {obj.name: obj for obj in model.objects.filter(name__in=list(names))}
+        missing = [name for name in names if name not in existing]
+        if missing:
+            model.objects.bulk_create([model(name=name, **defaults) for name in missing])
+            existing.update({obj.name: obj for obj in model.objects.filter(name__in=missing)})
+        return existing
+
+    def random_date(self):
+        # Recent days are busier: exponential decay over the configured span
+        age = min(self.random.expovariate(3 / self.days), self.days)
+        return self.now - datetime.timedelta(days=age, seconds=self.random.randint(0, 86399))
+
+    def build_summary(self):
+        keywords = self.random.sample(list(DEFAULT_TOPIC_KEYWORDS), self.random.choice((0, 1, 1, 1, 2, 2, 3)))
+        sentences = [
+            f'{self.random.choice(SUBJECTS)} {self.random.choice(ACHIEVEMENTS).format(keyword=keyword)}.'
+            for keyword in keywords
+        ] or [f'{self.random.choice(SUBJECTS)} sprider glädje i sin vardag.']
+        sentences.append(self.random.choice(CLOSINGS))
+        return ' '.join(sentences)
+
+    def write_articles(self, start, count):
+        summaries = [self.build_summary() for _ in range(count)]
+        matches = self.classifier.classify_many(summaries)
+        default = [self.classifier.default_topic]
+
+        articles = []
+        for i, summary in enumerate(summaries):
+            number = self.offset + start + i + 1
+            title = f'{summary.split(".")[0][:180]} #{number}'
+            source = self.random.choices(self.source_choices, self.source_weights)[0]
+            url = f'https://example.com/synthetic/{number}'
+            articles.append(Article(
+                title=title,
+                summary=summary,
+                source=source,
+                published_date=self.random_date(),
+                positivity_score=round(min(1.0, max(0.5, self.random.betavariate(9, 2))), 2),
+                region=self.random.choices(self.region_choices, self.region_weights)[0],
+                image_url='/placeholder.svg?height=400&width=600',
+                url=url,
+                external_id=story_identity(url, source.name, title),
+            ))
+
+        through = Article.topics.through
+        with transaction.atomic():
+            Article.objects.bulk_create(articles)
+            through.objects.bulk_create([
+                through(article_id=article.pk, topic_id=self.topics[name].pk)
+                for article, names in zip(articles, matches)
+                for name in (names or default)
+            ])
+
+    def build_post(self):
+        return UserPost(
+            username=f'user{self.random.randint(1, 5000)}',
+            date=self.random_date(),
+            title=f'{self.random.choice(SUBJECTS)} {self.random.choice(ACHIEVEMENTS).format(keyword="glädje")}',
+            content=self.random.choice(CLOSINGS),
+            likes=int(self.random.paretovariate(1.5)) - 1,
+            comments=int(self.random.paretovariate(2.0)) - 1,
+            shares=int(self.random.paretovariate(2.5)) - 1,
+        )
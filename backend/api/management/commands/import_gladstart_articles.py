@@ -2,12 +2,42 @@
 import os
 import json
 import datetime
+from collections import Counter
 from django.core.management.base import BaseCommand
 from django.core.files.base import ContentFile
 from django.conf import settings
+from django.db import transaction
 from django.utils.text import slugify
 from django.utils import timezone
+from api.cache import bump_versions, deferred_version_bumps
+from api.classifier import get_classifier
+from api.dedup import link_near_duplicates
+from api.images import ingest_images, load_manifest, write_manifest
+from api.ingest import iter_stories, story_hash, story_identity
 from api.models import Region, Source, Topic, Article, UserPost
+from api.ranking import refresh_article_ranks
+from api.related import rebuild_related_index, update_related_index
+from api.sentiment import article_text, get_scorer
+from api.stats import adjust_region_stats
+
+PLACEHOLDER_IMAGE_URL = '/placeholder.svg?height=400&width=600'
+
+DEFAULT_REGIONS = [
+    {'name': 'National', 'positivity': 0.83, 'articles_count': 0},
+    {'name': 'Stockholm', 'positivity': 0.82, 'articles_count': 0},
+    {'name': 'Uppsala', 'positivity': 0.85, 'articles_count': 0}
+]
+
+# Fields a re-import overwrites when a story has changed; the region and
+# publication date assigned on first import are kept
+UPSERT_FIELDS = ['title', 'summary', 'source', 'url', 'content_hash', 'positivity_score']
+# Overwritten as well when an image was found for the story, so a re-import
+# without --images_dir keeps the images of earlier imports
+IMAGE_FIELDS = ['image_url', 'renditions']
+
+# Imports that write more articles than this rebuild the related-articles
+# index at the end instead of updating it, so their ids are not all kept
+RELATED_UPDATE_LIMIT = 100000
 
 class Command(BaseCommand):
     help = 'Import GLADSTART articles from a JSON file'
@@ -15,6 +45,20 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('json_file', type=str, help='Path to the JSON file containing articles')
         parser.add_argument('--images_dir', type=str, help='Directory containing article images', default='')
+        parser.add_argument('--manifest', type=str, default='',
+                            help='Image manifest written by ingest_images (or where to write the one built from --images_dir)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes used to ingest --images_dir (defaults to the CPU count)')
+        parser.add_argument('--copy', action='store_true',
+                            help='Copy ingested images into MEDIA_ROOT instead of hard-linking them')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Stream stories from the file and write them in chunked bulk transactions')
+        parser.add_argument('--chunk_size', type=int, default=1000,
+                            help='Number of stories written per transaction in --bulk mode')
+        parser.add_argument('--taxonomy', type=str, default='',
+                            help='JSON file mapping keywords to topic names (defaults to the built-in table)')
+        parser.add_argument('--lexicon', type=str, default='',
+                            help='JSON file mapping words to sentiment valences (defaults to the built-in lexicon)')
 
     def handle(self, *args, **options):
         json_file = options['json_file']
@@ -24,40 +68,101 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'JSON file does not exist: {json_file}'))
             return
 
+        self.classifier = get_classifier(options['taxonomy'])
+        self.scorer = get_scorer(options['lexicon'])
+        # Ids of the articles created or changed by this import, None once
+        # there are too many to update the related-articles index with
+        self.written = []
+
+        # Map of original image file name to its ingested media entry
+        available_images = self.get_images(images_dir, options)
+
+        if options['bulk']:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                self.import_articles_bulk(iter_stories(f), available_images, max(1, options['chunk_size']))
+            self.update_related()
+            return
+
         # Load the JSON data
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
-        # Get list of available images
-        available_images = {}
-        if images_dir and os.path.exists(images_dir):
-            for filename in os.listdir(images_dir):
-                if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                    available_images[filename] = os.path.join(images_dir, filename)
-            self.stdout.write(f'Found {len(available_images)} images in {images_dir}')
+        # Process the newsletter data, invalidating cached API responses once at the end
+        with deferred_version_bumps():
+            self.import_articles(data, available_images)
+        self.update_related()
 
-        # Process the newsletter data
-        self.import_articles(data, available_images)
+    def track_written(self, article_ids):
+        if self.written is None:
+            return
+        self.written.extend(article_ids)
+        if len(self.written) > RELATED_UPDATE_LIMIT:
+            self.written = None
 
-    def import_articles(self, data, available_images):
-        self.stdout.write('Importing articles...')
+    def update_related(self):
+        """Index the new and changed articles and refresh the related articles they affect."""
+        if self.written is None:
+            index = rebuild_related_index(log=self.stdout.write)
+            self.stdout.write(f'Rebuilt the related-articles index ({len(index)} articles)')
+        elif self.written:
+            index = update_related_index(self.written, log=self.stdout.write)
+            self.stdout.write(f'Updated the related-articles index ({len(index)} articles)')
 
+    def get_regions(self):
         # Get regions or create default region
         regions = list(Region.objects.all())
         if not regions:
             # Create default regions if none exist
-            default_regions = [
-                {'name': 'National', 'positivity': 0.83, 'articles_count': 0},
-                {'name': 'Stockholm', 'positivity': 0.82, 'articles_count': 0},
-                {'name': 'Uppsala', 'positivity': 0.85, 'articles_count': 0}
-            ]
-            for region_data in default_regions:
+            for region_data in DEFAULT_REGIONS:
                 region = Region.objects.create(**region_data)
                 regions.append(region)
                 self.stdout.write(f'Created default region: {region.name}')
-        
-        # Default region (National)
-        default_region = next((r for r in regions if r.name == 'National'), regions[0])
+        return regions
+
+    def get_images(self, images_dir, options):
+        """
+        Load the image manifest, or build it by ingesting images_dir: files
+        are hashed, validated, deduplicated and linked into MEDIA_ROOT with
+        their renditions in a process pool before any article is written.
+        """
+        manifest_path = options['manifest']
+        if manifest_path and not images_dir:
+            manifest = load_manifest(manifest_path)
+            self.stdout.write(f'Loaded {len(manifest["files"])} images from {manifest_path}')
+        elif images_dir and os.path.exists(images_dir):
+            manifest = ingest_images(images_dir, workers=options['workers'], link=not options['copy'],
+                                     log=self.stdout.write)
+            if manifest_path:
+                write_manifest(manifest, manifest_path)
+        else:
+            return {}
+        for filename, error in manifest['invalid'].items():
+            self.stdout.write(self.style.WARNING(f'Skipped unreadable image {filename}: {error}'))
+        return manifest['files']
+
+    def select_image(self, i, story, available_images, image_files):
+        # Try to match the image from the article data
+        specified_image = story.get('image', '')
+
+        # If we have matching image, use it
+        if specified_image and specified_image in available_images:
+            return available_images[specified_image]
+        # Otherwise, use any available image based on index
+        if i < len(image_files):
+            return image_files[i]
+        return None
+
+    def image_fields(self, entry):
+        """Return the image_url and renditions of an article using a manifest entry."""
+        if entry is None:
+            return PLACEHOLDER_IMAGE_URL, None
+        return settings.MEDIA_URL + entry['name'], entry['renditions']
+
+    def import_articles(self, data, available_images):
+        self.stdout.write('Importing articles...')
+
+        regions = self.get_regions()
+        image_files = list(available_images.values())
 
         # Process each story in the newsletter
         for i, story in enumerate(data.get('stories', [])):
@@ -67,96 +172,231 @@ class Command(BaseCommand):
             if created:
                 self.stdout.write(f'Created source: {source.name}')
 
-            # Get article title and check if it already exists
+            # Find the article by the story's stable identity and skip it if unchanged
             title = story.get('title', '')
-            if Article.objects.filter(title=title).exists():
-                self.stdout.write(f'Article already exists: {title}')
+            identity = story_identity(story.get('link', ''), source_name, title)
+            digest = story_hash(story)
+            article = Article.objects.filter(external_id=identity).first()
+            if article is not None and article.content_hash == digest:
+                self.stdout.write(f'Article unchanged: {title}')
                 continue
 
             # Select an image if available
-            selected_image = None
-            image_url = '/placeholder.svg?height=400&width=600'  # Default fallback
+            selected_image = self.select_image(i, story, available_images, image_files)
 
-            # Try to match the image from the article data
-            specified_image = story.get('image', '')
-            
-            # If we have matching image, use it
-            if specified_image and specified_image in available_images:
-                selected_image = available_images[specified_image]
-            else:
-                # Otherwise, use any available image based on index
-                image_files = list(available_images.values())
-                if i < len(image_files):
-                    selected_image = image_files[i]
-            
-            # Set a positivity score based on the index (just for demonstration)
-            positivity_scores = [0.92, 0.87, 0.89, 0.85, 0.83, 0.81, 0.90, 0.79]
-            positivity_score = positivity_scores[i % len(positivity_scores)]
-            
-            # Choose a region (rotate through available regions)
-            region = regions[i % len(regions)]
-
-            # Create article with basic data
-            article = Article(
-                title=title,
-                summary=story.get('content', ''),
-                source=source,
-                published_date=timezone.now(),
-                positivity_score=positivity_score,
-                region=region,
-                image_url=image_url,
-                url=story.get('link', '')
-            )
+            created = article is None
+            if created:
+                # Choose a region (rotate through available regions)
+                article = Article(
+                    published_date=timezone.now(),
+                    region=regions[i % len(regions)],
+                    external_id=identity,
+                )
+
+            # Create or update the article with the story's data
+            article.title = title
+            article.summary = story.get('content', '')
+            article.source = source
+            if selected_image is not None or created:
+                article.image_url, article.renditions = self.image_fields(selected_image)
+            article.url = story.get('link', '')
+            article.content_hash = digest
+            article.positivity_score = self.scorer.score(article_text(title, article.summary))
             article.save()
+            self.track_written([article.pk])
+
+            # Group the article with an earlier copy of the same story
+            canonical_id = link_near_duplicates([article.pk], [f'{title} {article.summary}'], [created]).get(article.pk)
+            if canonical_id:
+                self.stdout.write(f'Near-duplicate of article {canonical_id}: {title}')
             
-            # Process image if available
             if selected_image:
-                image_filename = os.path.basename(selected_image)
-                # Just update the image URL since we already copied the files
-                article.image_url = f'/media/article_pictures/{image_filename}'
-                article.save()
-                self.stdout.write(f'Associated image: {image_filename} with article: {title}')
-
-            # Extract potential topics from content
-            content = story.get('content', '')
-            
-            # Create some topics based on content analysis
-            keywords = {
-                'teater': 'Kultur',
-                'idrott': 'Sport', 
-                'sport': 'Sport',
-                'medicin': 'Hälsa',
-                'forskning': 'Forskning', 
-                'ekonomi': 'Ekonomi',
-                'hälsa': 'Hälsa',
-                'kärlek': 'Relationer',
-                'djur': 'Djur',
-                'miljö': 'Miljö',
-                'utbildning': 'Utbildning',
-                'arbetsmarknad': 'Arbetsmarknad',
-                'skola': 'Utbildning'
-            }
-            
-            topics_added = []
-            for keyword, category in keywords.items():
-                if keyword.lower() in content.lower() and category not in topics_added:
-                    topic, created = Topic.objects.get_or_create(name=category)
-                    article.topics.add(topic)
-                    topics_added.append(category)
-                    if created:
-                        self.stdout.write(f'Created topic: {topic.name}')
-            
-            # Add the default topic if none were found
-            if not topics_added:
-                default_topic, created = Topic.objects.get_or_create(name='Positiva nyheter')
-                article.topics.add(default_topic)
-                if created:
-                    self.stdout.write(f'Created default topic: {default_topic.name}')
+                self.stdout.write(f'Associated image: {selected_image["name"]} with article: {title}')
+
+            # Extract potential topics from content, or use the default topic if none were found
+            topic_names = self.classifier.classify(story.get('content', '')) or [self.classifier.default_topic]
+            article_topics = []
+            for category in topic_names:
+                topic, topic_created = Topic.objects.get_or_create(name=category)
+                article_topics.append(topic)
+                if topic_created:
+                    self.stdout.write(f'Created topic: {topic.name}')
+            article.topics.set(article_topics)
             
-            # Update the article count for the region
-            region.articles_count = region.articles_count + 1
-            region.save()
+            # The region's count and mean positivity, and the article's ranks,
+            # follow from the post_save and topics m2m_changed signals
             
-            self.stdout.write(self.style.SUCCESS(f'Created article: {article.title}'))
+            self.stdout.write(self.style.SUCCESS(f'{"Created" if created else "Updated"} article: {article.title}'))
 
         self.stdout.write(self.style.SUCCESS('Successfully imported articles!'))
+
+    def import_articles_bulk(self, stories, available_images, chunk_size):
+        """
+        Import stories in chunks, each chunk written in a single transaction.
+
+        Sources and topics are preloaded into dicts and only missing names are
+        inserted. Articles, the topic through-table and the region counters are
+        written with bulk_create/bulk_update, so a chunk costs a fixed number
+        of statements whatever its size.
+
+        Stories are matched to articles by their stable identity. Unchanged
+        stories are skipped after one indexed lookup per chunk; new and changed
+        ones are written by a single upsert, so re-importing a feed is
+        idempotent and costs little when few stories changed. Memory stays
+        bounded by the chunk size: a story repeated in a later chunk is
+        matched against the database like any other.
+        """
+        self.stdout.write(f'Importing articles in bulk (chunks of {chunk_size})...')
+
+        regions = self.get_regions()
+        image_files = list(available_images.values())
+        sources = {source.name: source for source in Source.objects.all()}
+        topics = {topic.name: topic for topic in Topic.objects.all()}
+        totals = Counter()
+
+        chunk = []
+        for i, story in enumerate(stories):
+            chunk.append((i, story))
+            if len(chunk) >= chunk_size:
+                self._write_chunk(chunk, regions, sources, topics,
+                                  available_images, image_files, totals)
+                chunk = []
+        if chunk:
+            self._write_chunk(chunk, regions, sources, topics,
+                              available_images, image_files, totals)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully imported {totals["created"]} new and {totals["updated"]} changed articles '
+            f'({totals["unchanged"]} unchanged, {totals["duplicate"]} repeated in the feed, '
+            f'{totals["near_duplicate"]} near-duplicates of earlier stories)!'
+        ))
+
+    def _ensure_named(self, model, cache, names, label):
+        """Insert the names missing from cache and add the new rows to it."""
+        missing = [name for name in dict.fromkeys(names) if name not in cache]
+        if not missing:
+            return
+        model.objects.bulk_create([model(name=name) for name in missing])
+        # Re-read by name so primary keys are known on every backend
+        for obj in model.objects.filter(name__in=missing):
+            cache.setdefault(obj.name, obj)
+        self.stdout.write(f'Created {len(missing)} {label}: {", ".join(missing)}')
+
+    def _write_chunk(self, chunk, regions, sources, topics,
+                     available_images, image_files, totals):
+        # One upsert cannot write the same article twice
+        seen = set()
+        keyed = []
+        for i, story in chunk:
+            identity = story_identity(story.get('link', ''), story.get('source', 'Unknown'), story.get('title', ''))
+            if identity in seen:
+                totals['duplicate'] += 1
+                continue
+            seen.add(identity)
+            keyed.append((i, story, identity, story_hash(story)))
+
+        # Compare content hashes for the whole chunk with one indexed lookup
+        known = {
+            external_id: (content_hash, region_id, score)
+            for external_id, content_hash, region_id, score in Article.objects
+            .filter(external_id__in=[identity for _, _, identity, _ in keyed])
+            .values_list('external_id', 'content_hash', 'region_id', 'positivity_score')
+        }
+        changed = []
+        for i, story, identity, digest in keyed:
+            if identity in known and known[identity][0] == digest:
+                totals['unchanged'] += 1
+                continue
+            changed.append((i, story, identity, digest))
+
+        default = [self.classifier.default_topic]
+        matches = self.classifier.classify_many([story.get('content', '') for _, story, _, _ in changed])
+        scores = self.scorer.score_many(
+            article_text(story.get('title', ''), story.get('content', '')) for _, story, _, _ in changed
+        )
+        pending = [(i, story, identity, digest, score, names or default)
+                   for (i, story, identity, digest), score, names in zip(changed, scores, matches)]
+
+        if not pending:
+            return
+
+        with transaction.atomic():
+            self._ensure_named(Source, sources, (story.get('source', 'Unknown') for _, story, *_ in pending), 'sources')
+            self._ensure_named(Topic, topics, (name for *_, names in pending for name in names), 'topics')
+
+            articles = []
+            with_image = []
+            region_counts = Counter()
+            region_scores = Counter()
+            now = timezone.now()
+            for i, story, identity, digest, positivity_score, _ in pending:
+                selected_image = self.select_image(i, story, available_images, image_files)
+                image_url, renditions = self.image_fields(selected_image)
+                with_image.append(selected_image is not None)
+                region = regions[i % len(regions)]
+                if identity in known:
+                    # The upsert keeps the article's region; move its mean by the score change
+                    _, region_id, old_score = known[identity]
+                    region_scores[region_id] += positivity_score - old_score
+                else:
+                    region_counts[region.pk] += 1
+                    region_scores[region.pk] += positivity_score
+                articles.append(Article(
+                    title=story.get('title', ''),
+                    summary=story.get('content', ''),
+                    source=sources[story.get('source', 'Unknown')],
+                    published_date=now,
+                    positivity_score=positivity_score,
+                    region=region,
+                    image_url=image_url,
+                    renditions=renditions,
+                    url=story.get('link', ''),
+                    external_id=identity,
+                    content_hash=digest,
+                ))
+            # New stories are inserted and changed ones updated in place by the
+            # same statement; the FTS triggers follow both. Changed stories
+            # without an image keep their current one
+            for has_image in (True, False):
+                group = [article for article, found in zip(articles, with_image) if found is has_image]
+                if group:
+                    Article.objects.bulk_create(
+                        group, batch_size=500, update_conflicts=True, unique_fields=['external_id'],
+                        update_fields=UPSERT_FIELDS + IMAGE_FIELDS if has_image else UPSERT_FIELDS,
+                    )
+
+            # Upserts do not return primary keys, so look them up by identity
+            ids = dict(Article.objects.filter(external_id__in=[a.external_id for a in articles]).values_list('external_id', 'id'))
+            for article in articles:
+                article.pk = ids[article.external_id]
+
+            # Fingerprint the articles and group new ones with earlier copies of the same story
+            links = link_near_duplicates(
+                [article.pk for article in articles],
+                [f'{article.title} {article.summary}' for article in articles],
+                [article.external_id not in known for article in articles],
+            )
+
+            # Changed stories are classified again
+            through = Article.topics.through
+            updated = [article.pk for article in articles if article.external_id in known]
+            if updated:
+                through.objects.filter(article_id__in=updated).delete()
+            through.objects.bulk_create([
+                through(article_id=article.pk, topic_id=topics[name].pk)
+                for article, (*_, names) in zip(articles, pending)
+                for name in names
+            ], batch_size=500)
+            refresh_article_ranks([article.pk for article in articles])
+
+            # One atomic F() update per region touched by the chunk
+            for region_id in region_counts.keys() | region_scores.keys():
+                adjust_region_stats(region_id, region_counts[region_id], region_scores[region_id])
+
+        # Bulk writes bypass model signals, so invalidate cached responses here
+        bump_versions(Article, Region, Source, Topic)
+        self.track_written(article.pk for article in articles)
+        totals['updated'] += len(updated)
+        totals['created'] += len(articles) - len(updated)
+        totals['near_duplicate'] += len(links)
+        self.stdout.write(f'Imported {totals["created"]} new and {totals["updated"]} changed articles so far')
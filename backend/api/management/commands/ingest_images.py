@@ -0,0 +1,34 @@
+# backend/api/management/commands/ingest_images.py
+import os
+from django.core.management.base import BaseCommand, CommandError
+from api.images import ingest_images, write_manifest
+
+
+class Command(BaseCommand):
+    help = 'Hash, validate and deduplicate a directory of images into MEDIA_ROOT and write an import manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('images_dir', type=str, help='Directory containing article images')
+        parser.add_argument('manifest', type=str, help='Where to write the manifest used by import_gladstart_articles --manifest')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (defaults to the CPU count)')
+        parser.add_argument('--copy', action='store_true', help='Copy images instead of hard-linking them')
+        parser.add_argument('--no_renditions', action='store_true', help='Skip building the resized renditions')
+
+    def handle(self, *args, **options):
+        images_dir = options['images_dir']
+        if not os.path.isdir(images_dir):
+            raise CommandError(f'Images directory does not exist: {images_dir}')
+
+        manifest = ingest_images(
+            images_dir,
+            workers=options['workers'],
+            link=not options['copy'],
+            renditions=not options['no_renditions'],
+            log=self.stdout.write,
+        )
+        for filename, error in manifest['invalid'].items():
+            self.stdout.write(self.style.WARNING(f'Skipped unreadable image {filename}: {error}'))
+        write_manifest(manifest, options['manifest'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully wrote manifest for {len(manifest["files"])} images to {options["manifest"]}!'
+        ))
@@ -2,6 +2,8 @@ import json
 import datetime
 from django.core.management.base import BaseCommand
 from api.models import Region, Source, Topic, Article, UserPost
+from api.sentiment import article_text, get_scorer
+from api.stats import reconcile_region_stats
 
 class Command(BaseCommand):
     help = 'Load initial data for the GladStart app'
@@ -12,29 +14,27 @@ class Command(BaseCommand):
         # Create Regions
         self.stdout.write('Creating regions...')
         regions_data = [
-            {'name': 'Uppland', 'positivity': 0.91, 'articles_count': 98},
-            {'name': 'Skåne', 'positivity': 0.79, 'articles_count': 156},
-            {'name': 'Småland', 'positivity': 0.81, 'articles_count': 68},
-            {'name': 'Halland', 'positivity': 0.84, 'articles_count': 65},
-            {'name': 'Närke', 'positivity': 0.77, 'articles_count': 62},
-            {'name': 'Dalarna', 'positivity': 0.75, 'articles_count': 58},
-            {'name': 'Blekinge', 'positivity': 0.8, 'articles_count': 45},
-            {'name': 'Stockholm', 'positivity': 0.82, 'articles_count': 120},
-            {'name': 'Västra Götaland', 'positivity': 0.85, 'articles_count': 110},
-            {'name': 'Kronoberg', 'positivity': 0.78, 'articles_count': 55},
-            {'name': 'Norrbotten', 'positivity': 0.87, 'articles_count': 70},
-            {'name': 'National', 'positivity': 0.83, 'articles_count': 200},
-            {'name': 'Uppsala', 'positivity': 0.89, 'articles_count': 85},
+            {'name': 'Uppland'},
+            {'name': 'Skåne'},
+            {'name': 'Småland'},
+            {'name': 'Halland'},
+            {'name': 'Närke'},
+            {'name': 'Dalarna'},
+            {'name': 'Blekinge'},
+            {'name': 'Stockholm'},
+            {'name': 'Västra Götaland'},
+            {'name': 'Kronoberg'},
+            {'name': 'Norrbotten'},
+            {'name': 'National'},
+            {'name': 'Uppsala'},
         ]
         
         regions = {}
         for region_data in regions_data:
+            # The stats start empty and are counted from the articles below
             region, created = Region.objects.get_or_create(
                 name=region_data['name'],
-                defaults={
-                    'positivity': region_data['positivity'],
-                    'articles_count': region_data['articles_count']
-                }
+                defaults={'positivity': 0.0, 'articles_count': 0}
             )
             regions[region.name] = region
             if created:
@@ -94,7 +94,6 @@ class Command(BaseCommand):
                 'summary': 'Forskare vid Uppsala universitet har utvecklat en ny metod för att lagra solenergi med 40% högre effektivitet än tidigare teknik. Detta kan revolutionera hur vi använder solenergi i framtiden och göra förnybara energikällor mer tillgängliga för alla.',
                 'source': 'SVT Nyheter',
                 'published_date': '2025-03-11T16:24:00Z',
-                'positivity_score': 0.92,
                 'topics': ['Miljö', 'Forskning', 'Innovation'],
                 'region': 'Uppsala',
                 'image_url': '/placeholder.svg?height=400&width=600',
@@ -105,7 +104,6 @@ class Command(BaseCommand):
                 'summary': 'En innovativ arbetsmodell vid Sahlgrenska Universitetssjukhuset har kraftigt reducerat väntetiden för patienter samtidigt som vårdpersonalens arbetsmiljö förbättrats. Modellen kommer nu att implementeras på fler sjukhus runt om i landet.',
                 'source': 'Göteborgs-Posten',
                 'published_date': '2025-03-12T09:15:00Z',
-                'positivity_score': 0.87,
                 'topics': ['Hälsa', 'Innovation'],
                 'region': 'Västra Götaland',
                 'image_url': '/placeholder.svg?height=400&width=600',
@@ -116,7 +114,6 @@ class Command(BaseCommand):
                 'summary': 'Stockholmsbaserade Re:Textile har utvecklat en teknik för 100% återvinning av textilier. Nu investerar internationella aktörer över en miljard kronor i företaget. Detta kan leda till en revolution inom modeindustrin och drastiskt minska dess miljöpåverkan.',
                 'source': 'Breakit',
                 'published_date': '2025-03-12T07:30:00Z',
-                'positivity_score': 0.89,
                 'topics': ['Miljö', 'Ekonomi', 'Mode'],
                 'region': 'Stockholm',
                 'image_url': '/placeholder.svg?height=400&width=600',
@@ -127,7 +124,6 @@ class Command(BaseCommand):
                 'summary': 'Växjö kommun har nått sitt mål om helt fossilfri kollektivtrafik fem år före tidsplanen. Kommunen använder nu en kombination av eldrivna bussar och biogas. Projektet har väckt internationell uppmärksamhet och flera delegationer från andra länder har besökt Växjö för att lära sig mer.',
                 'source': 'SVT Nyheter',
                 'published_date': '2025-03-11T14:12:00Z',
-                'positivity_score': 0.85,
                 'topics': ['Miljö', 'Transport'],
                 'region': 'Kronoberg',
                 'image_url': '/placeholder.svg?height=400&width=600',
@@ -138,7 +134,6 @@ class Command(BaseCommand):
                 'summary': 'De senaste PISA-resultaten visar att svenska elever presterar allt bättre i matematik och naturvetenskap, med kraftig förbättring sedan förra mätningen. Sverige klättrar nu flera placeringar i den internationella rankingen och närmar sig topp 10.',
                 'source': 'Dagens Nyheter',
                 'published_date': '2025-03-10T18:45:00Z',
-                'positivity_score': 0.83,
                 'topics': ['Utbildning'],
                 'region': 'National',
                 'image_url': '/placeholder.svg?height=400&width=600',
@@ -149,7 +144,6 @@ class Command(BaseCommand):
                 'summary': 'Nya siffror från Arbetsförmedlingen visar att arbetslösheten i Sverige nu är nere på 4,2 procent, den lägsta nivån sedan 2010. Särskilt positiv är utvecklingen bland unga och utrikesfödda, där arbetslösheten minskat markant under det senaste året.',
                 'source': 'Svenska Dagbladet',
                 'published_date': '2025-03-12T10:30:00Z',
-                'positivity_score': 0.81,
                 'topics': ['Ekonomi', 'Arbetsmarknad'],
                 'region': 'National',
                 'image_url': '/placeholder.svg?height=400&width=600',
@@ -160,7 +154,6 @@ class Command(BaseCommand):
                 'summary': 'Med H2 Green Steel, LKAB:s fossilfria järnsvamp och nu batterifabriker är Norrbotten på väg att bli ett internationellt centrum för grön industri. Regionen förväntas skapa tusentals nya jobb och locka internationell expertis under de kommande åren.',
                 'source': 'Sveriges Radio',
                 'published_date': '2025-03-11T11:20:00Z',
-                'positivity_score': 0.9,
                 'topics': ['Miljö', 'Ekonomi', 'Industri'],
                 'region': 'Norrbotten',
                 'image_url': '/placeholder.svg?height=400&width=600',
@@ -171,7 +164,6 @@ class Command(BaseCommand):
                 'summary': 'Ett projekt i Malmö som kombinerar språkutbildning med arbetsplatsförlagd praktik har gett remarkabla resultat och studeras nu internationellt. Över 80% av deltagarna har fått jobb inom sex månader efter avslutat program, vilket är långt över genomsnittet för liknande insatser.',
                 'source': 'Sydsvenskan',
                 'published_date': '2025-03-10T15:40:00Z',
-                'positivity_score': 0.79,
                 'topics': ['Integration', 'Arbetsmarknad'],
                 'region': 'Skåne',
                 'image_url': '/placeholder.svg?height=400&width=600',
@@ -179,7 +171,8 @@ class Command(BaseCommand):
             }
         ]
         
-        for article_data in articles_data:
+        scores = get_scorer().score_many(article_text(a['title'], a['summary']) for a in articles_data)
+        for article_data, positivity_score in zip(articles_data, scores):
             # Check if article already exists (based on title and source)
             source = sources[article_data['source']]
             region = regions[article_data['region']]
@@ -190,7 +183,7 @@ class Command(BaseCommand):
                 defaults={
                     'summary': article_data['summary'],
                     'published_date': article_data['published_date'],
-                    'positivity_score': article_data['positivity_score'],
+                    'positivity_score': positivity_score,
                     'region': region,
                     'image_url': article_data['image_url'],
                     'url': article_data['url']
@@ -250,4 +243,6 @@ class Command(BaseCommand):
             if created:
                 self.stdout.write(f'Created user post: {post.title}')
         
+        reconcile_region_stats()
+        
         self.stdout.write(self.style.SUCCESS('Successfully loaded initial data!'))
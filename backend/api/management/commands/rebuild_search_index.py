@@ -0,0 +1,28 @@
+# backend/api/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from api.search import FTS_TABLE, fts_available
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the article full-text search index from the api_article table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--optimize', action='store_true',
+                            help='Merge the index b-trees after rebuilding for faster queries')
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError('The full-text search index is only available on SQLite')
+
+        with connection.cursor() as cursor:
+            self.stdout.write('Rebuilding search index...')
+            # 'rebuild' re-reads every row of the external content table in one pass
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            if options['optimize']:
+                self.stdout.write('Optimizing search index...')
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+            cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+            count = cursor.fetchone()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully indexed {count} articles!'))
@@ -0,0 +1,15 @@
+# backend/api/management/commands/reconcile_region_stats.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.stats import reconcile_region_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute region article counts and mean positivity from the articles table'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = reconcile_region_stats()
+        for region in changed:
+            self.stdout.write(f'Updated {region.name}: {region.articles_count} articles, positivity {region.positivity:.3f}')
+        self.stdout.write(self.style.SUCCESS(f'Successfully reconciled region statistics ({len(changed)} changed)!'))
@@ -0,0 +1,66 @@
+# backend/api/management/commands/rescore_articles.py
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.cache import bump_versions
+from api.models import Article
+from api.ranking import refresh_article_ranks
+from api.sentiment import article_text, get_scorer
+from api.stats import reconcile_region_stats
+
+
+class Command(BaseCommand):
+    help = 'Re-score the positivity of every article with the sentiment lexicon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lexicon', type=str, default='',
+                            help='JSON file mapping words to sentiment valences (defaults to the built-in lexicon)')
+        parser.add_argument('--chunk_size', type=int, default=5000,
+                            help='Number of articles scored and written per transaction')
+
+    def handle(self, *args, **options):
+        scorer = get_scorer(options['lexicon'])
+        chunk_size = max(1, options['chunk_size'])
+
+        self.stdout.write('Re-scoring articles...')
+        start = time.perf_counter()
+        last_id = 0
+        scored = 0
+        changed = 0
+        while True:
+            # Walk the table by primary key so each chunk is an indexed range scan
+            rows = list(
+                Article.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'title', 'summary', 'positivity_score')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            scores = scorer.score_many(article_text(title, summary) for _, title, summary, _ in rows)
+
+            # Only rows whose score moved are written
+            updates = [
+                Article(pk=pk, positivity_score=score)
+                for (pk, _, _, old), score in zip(rows, scores)
+                if old != score
+            ]
+            if updates:
+                with transaction.atomic():
+                    Article.objects.bulk_update(updates, ['positivity_score'], batch_size=500)
+                    refresh_article_ranks([article.pk for article in updates])
+
+            scored += len(rows)
+            changed += len(updates)
+            self.stdout.write(f'Scored {scored} articles ({changed} changed)')
+
+        # bulk_update bypasses the signals that keep region means in step
+        if changed:
+            reconcile_region_stats()
+            bump_versions(Article)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully re-scored {scored} articles in {elapsed:.1f}s '
+            f'({scored / max(elapsed, 1e-9):.0f}/s, {changed} changed)!'
+        ))
@@ -0,0 +1,71 @@
+# backend/api/management/commands/retag_articles.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.cache import bump_versions
+from api.classifier import get_classifier
+from api.models import Topic, Article
+from api.ranking import refresh_article_ranks
+
+
+class Command(BaseCommand):
+    help = 'Re-run topic classification over existing articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taxonomy', type=str, default='',
+                            help='JSON file mapping keywords to topic names (defaults to the built-in table)')
+        parser.add_argument('--chunk_size', type=int, default=1000,
+                            help='Number of articles classified and written per transaction')
+        parser.add_argument('--replace', action='store_true',
+                            help='Replace existing topics instead of adding the matched ones')
+
+    def handle(self, *args, **options):
+        classifier = get_classifier(options['taxonomy'])
+        chunk_size = max(1, options['chunk_size'])
+        replace = options['replace']
+        through = Article.topics.through
+
+        topics = {topic.name: topic for topic in Topic.objects.all()}
+        missing = [name for name in classifier.topics + [classifier.default_topic] if name not in topics]
+        if missing:
+            Topic.objects.bulk_create([Topic(name=name) for name in missing])
+            topics = {topic.name: topic for topic in Topic.objects.all()}
+            self.stdout.write(f'Created {len(missing)} topics: {", ".join(missing)}')
+
+        self.stdout.write('Re-tagging articles...')
+        last_id = 0
+        retagged = 0
+        while True:
+            # Walk the table by primary key so each chunk is an indexed range scan
+            rows = list(
+                Article.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'summary')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            ids = [row[0] for row in rows]
+            matches = classifier.classify_many([summary for _, summary in rows])
+
+            with transaction.atomic():
+                if replace:
+                    through.objects.filter(article_id__in=ids).delete()
+                    tagged = set()
+                else:
+                    tagged = set(through.objects.filter(article_id__in=ids).values_list('article_id', flat=True))
+
+                links = []
+                for article_id, names in zip(ids, matches):
+                    if not names and article_id not in tagged:
+                        names = [classifier.default_topic]
+                    links.extend(through(article_id=article_id, topic_id=topics[name].pk) for name in names)
+                through.objects.bulk_create(links, batch_size=500, ignore_conflicts=True)
+                # Articles are ranked within each of their topics
+                refresh_article_ranks(ids)
+
+            bump_versions(Article, Topic)
+
+            retagged += len(rows)
+            self.stdout.write(f'Re-tagged {retagged} articles')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully re-tagged {retagged} articles!'))
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# External-content FTS5 index over api_article(title, summary). The unicode61
+# tokenizer with remove_diacritics 2 folds å/ä/ö to a/a/o on both the indexed
+# text and the query, and the triggers keep the index in step with every write,
+# including bulk_create/bulk_update which bypass model signals.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS api_article_fts USING fts5(
+        title, summary,
+        content='api_article', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_article_fts_ai AFTER INSERT ON api_article BEGIN
+        INSERT INTO api_article_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_article_fts_ad AFTER DELETE ON api_article BEGIN
+        INSERT INTO api_article_fts(api_article_fts, rowid, title, summary)
+        VALUES ('delete', old.id, old.title, old.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_article_fts_au AFTER UPDATE OF title, summary ON api_article BEGIN
+        INSERT INTO api_article_fts(api_article_fts, rowid, title, summary)
+        VALUES ('delete', old.id, old.title, old.summary);
+        INSERT INTO api_article_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+    END
+    """,
+    "INSERT INTO api_article_fts(api_article_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS api_article_fts_au',
+    'DROP TRIGGER IF EXISTS api_article_fts_ad',
+    'DROP TRIGGER IF EXISTS api_article_fts_ai',
+    'DROP TABLE IF EXISTS api_article_fts',
+]
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_article_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:19
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Fold rows sharing a name into the oldest one so the unique constraints can be added."""
+    Article = apps.get_model('api', 'Article')
+    Through = Article.topics.through
+
+    for model_name, fk in (('Region', 'region'), ('Source', 'source'), ('Topic', None)):
+        model = apps.get_model('api', model_name)
+        duplicates = (
+            model.objects.values('name')
+            .annotate(keep=Min('id'), n=Count('id'))
+            .filter(n__gt=1)
+        )
+        for row in duplicates:
+            others = list(model.objects.filter(name=row['name']).exclude(id=row['keep']).values_list('id', flat=True))
+            if fk:
+                Article.objects.filter(**{f'{fk}_id__in': others}).update(**{f'{fk}_id': row['keep']})
+            else:
+                links = Through.objects.filter(topic_id__in=others)
+                Through.objects.bulk_create(
+                    [Through(article_id=article_id, topic_id=row['keep'])
+                     for article_id in links.values_list('article_id', flat=True)],
+                    ignore_conflicts=True,
+                )
+                links.delete()
+            if model_name == 'Region':
+                keeper = model.objects.get(id=row['keep'])
+                keeper.articles_count = sum(model.objects.filter(name=row['name']).values_list('articles_count', flat=True))
+                keeper.save(update_fields=['articles_count'])
+            model.objects.filter(id__in=others).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_article_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='region',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='source',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='topic',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['published_date', 'id'], name='article_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['region', 'published_date', 'id'], name='article_region_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['source', 'published_date', 'id'], name='article_source_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userpost',
+            index=models.Index(fields=['date', 'id'], name='userpost_date_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_lookup_names_and_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='renditions',
+            field=models.JSONField(blank=True, help_text='Resized image renditions: {format: {width: file name}}', null=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:54
+
+import importlib
+from django.db import migrations, models
+
+# Adding (and removing) a unique column makes SQLite rebuild api_article,
+# which drops the triggers that keep the full-text index in step, so they
+# are recreated after the rebuild in either direction
+fts = importlib.import_module('api.migrations.0003_article_fts')
+
+
+def backfill_identity(apps, schema_editor):
+    from api.ingest import story_identity
+    Article = apps.get_model('api', 'Article')
+    seen = set()
+    batch = []
+    rows = Article.objects.order_by('id').values_list('id', 'url', 'source__name', 'title')
+    for pk, url, source, title in rows.iterator(chunk_size=2000):
+        identity = story_identity(url, source, title)
+        # Earlier imports may hold the same story twice; the oldest keeps the identity
+        if identity in seen:
+            continue
+        seen.add(identity)
+        batch.append(Article(pk=pk, external_id=identity))
+        if len(batch) >= 2000:
+            Article.objects.bulk_update(batch, ['external_id'])
+            batch = []
+    if batch:
+        Article.objects.bulk_update(batch, ['external_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_article_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, fts.create_fts),
+        migrations.AddField(
+            model_name='article',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='external_id',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(fts.create_fts, migrations.RunPython.noop),
+        migrations.RunPython(backfill_identity, migrations.RunPython.noop),
+    ]
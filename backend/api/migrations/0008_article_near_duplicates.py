@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_related_article'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='api.article')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='canonical',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='api.article'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('canonical__isnull', True)), fields=['published_date', 'id'], name='article_canonical_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('canonical__isnull', False)), fields=['canonical'], name='article_duplicates_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_article_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.FloatField()),
+                ('published_date', models.DateTimeField(db_index=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranks', to='api.article')),
+                ('region', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.region')),
+                ('topic', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.topic')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['region', 'topic', 'rank', 'article'], name='articlerank_scope_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def enable_wal(apps, schema_editor):
+    # Persistent in the database file: readers no longer block the writer and
+    # the writer no longer blocks readers. Set once here instead of on every
+    # new connection
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode = WAL')
+
+
+def disable_wal(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode = DELETE')
+
+
+class Migration(migrations.Migration):
+
+    # The journal mode cannot be changed inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('api', '0009_article_rank'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, disable_wal),
+    ]
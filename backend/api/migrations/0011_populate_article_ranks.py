@@ -0,0 +1,73 @@
+import datetime
+import math
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+# Copied from api.ranking as it stood for this migration, so later changes to
+# the ranking code cannot change what the migration writes
+
+
+def horizon():
+    days = getattr(settings, 'API_RANKING_HORIZON_DAYS', 30)
+    return timezone.now() - datetime.timedelta(days=days) if days else None
+
+
+def rank_key(positivity, published_date):
+    half_life = getattr(settings, 'API_RANKING_HALF_LIFE_HOURS', 48) * 3600
+    return math.log(max(positivity, 1e-6)) + math.log(2) * published_date.timestamp() / half_life
+
+
+def populate_ranks(apps, schema_editor):
+    # Rank the articles that existed before the ranking table did, the way
+    # api.ranking.rebuild_ranks does, so ?ordering=best is not empty until
+    # refresh_rankings first runs. Ranks already written for articles saved
+    # since 0009 are rebuilt with the rest
+    Article = apps.get_model('api', 'Article')
+    ArticleRank = apps.get_model('api', 'ArticleRank')
+    db = schema_editor.connection.alias
+    ArticleRank.objects.using(db).all().delete()
+    articles = Article.objects.using(db).order_by('id')
+    since = horizon()
+    if since is not None:
+        articles = articles.filter(published_date__gte=since)
+    last_id = 0
+    while True:
+        rows = list(
+            articles.filter(id__gt=last_id).values_list('id', 'region_id', 'positivity_score', 'published_date')[:5000]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        topics = {}
+        for article_id, topic_id in (
+            Article.topics.through.objects.using(db)
+            .filter(article_id__in=[row[0] for row in rows])
+            .values_list('article_id', 'topic_id')
+        ):
+            topics.setdefault(article_id, []).append(topic_id)
+        ranks = []
+        for article_id, region_id, positivity, published_date in rows:
+            key = rank_key(positivity, published_date)
+            scopes = [(None, None), (region_id, None)] + [(None, topic_id) for topic_id in topics.get(article_id, ())]
+            ranks.extend(
+                ArticleRank(article_id=article_id, region_id=scope_region, topic_id=scope_topic,
+                            rank=key, published_date=published_date)
+                for scope_region, scope_topic in scopes
+            )
+        ArticleRank.objects.using(db).bulk_create(ranks, batch_size=500)
+
+
+def remove_ranks(apps, schema_editor):
+    apps.get_model('api', 'ArticleRank').objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_sqlite_wal'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_ranks, remove_ranks),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Avg, Count
+
+
+def reconcile_region_stats(apps, schema_editor):
+    # Replace the counts and scores the seed data used to write with the ones
+    # computed from the stored articles, the way api.stats.reconcile_region_stats
+    # does, so the running means kept by later saves start from real values
+    Article = apps.get_model('api', 'Article')
+    Region = apps.get_model('api', 'Region')
+    db = schema_editor.connection.alias
+    stats = {
+        row['region_id']: (row['n'], row['mean'])
+        for row in Article.objects.using(db).order_by().values('region_id').annotate(
+            n=Count('id'), mean=Avg('positivity_score'),
+        )
+    }
+    regions = list(Region.objects.using(db).all())
+    for region in regions:
+        region.articles_count, region.positivity = stats.get(region.pk, (0, 0.0))
+    Region.objects.using(db).bulk_update(regions, ['articles_count', 'positivity'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_populate_article_ranks'),
+    ]
+
+    operations = [
+        migrations.RunPython(reconcile_region_stats, migrations.RunPython.noop),
+    ]
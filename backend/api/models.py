@@ -2,7 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 
 class Region(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)
     positivity = models.FloatField(help_text="Positivity score 0.0-1.0")
     articles_count = models.IntegerField(default=0)
     
@@ -10,13 +10,13 @@ class Region(models.Model):
         return self.name
 
 class Source(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)
     
     def __str__(self):
         return self.name
 
 class Topic(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)
     
     def __str__(self):
         return self.name
@@ -31,12 +31,81 @@ class Article(models.Model):
     region = models.ForeignKey(Region, on_delete=models.CASCADE)
     image = models.ImageField(upload_to='article_pictures/', blank=True, null=True)
     image_url = models.URLField(blank=True, null=True)
+    renditions = models.JSONField(blank=True, null=True, help_text="Resized image renditions: {format: {width: file name}}")
     url = models.URLField()
+    # Stable identity of the imported story (api.ingest.story_identity) and a
+    # digest of its imported fields, so re-imports update rather than duplicate
+    external_id = models.CharField(max_length=64, unique=True, blank=True, null=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, null=True, editable=False)
+    # MinHash signature of the text (api.dedup) and the first-seen article of
+    # the same story when this one is a near-duplicate of it
+    minhash = models.BinaryField(blank=True, null=True, editable=False)
+    canonical = models.ForeignKey('self', on_delete=models.SET_NULL, blank=True, null=True,
+                                  related_name='duplicates', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        # Match the feed's ORDER BY published_date DESC, id DESC, alone and
+        # after the equality filters the feed supports, so pages come straight
+        # off an index without a sort step. ?min_score= has no
+        # (positivity_score, published_date) index on purpose: the score is a
+        # range, so such an index cannot return pages in date order, and
+        # SQLite then picks it over article_published_idx and sorts every
+        # match (a first page went from ~6 ms to ~200 ms on 114k articles).
+        # Walking the date index and skipping low scores stops after one page
+        # unless almost nothing passes the filter
+        indexes = [
+            models.Index(fields=['published_date', 'id'], name='article_published_idx'),
+            models.Index(fields=['region', 'published_date', 'id'], name='article_region_published_idx'),
+            models.Index(fields=['source', 'published_date', 'id'], name='article_source_published_idx'),
+            # The collapsed feed (canonical stories only)
+            models.Index(fields=['published_date', 'id'], condition=models.Q(canonical__isnull=True),
+                         name='article_canonical_pub_idx'),
+            # Finds a story's duplicates; partial, so the planner never picks
+            # it for the collapsed feed's canonical_id IS NULL
+            models.Index(fields=['canonical'], condition=models.Q(canonical__isnull=False),
+                         name='article_duplicates_idx'),
+        ]
+    
     def __str__(self):
         return self.title
 
+class RelatedArticle(models.Model):
+    """A precomputed "more like this" neighbour of an article (api.related), best first by rank."""
+    # Indexed by the (article, rank) constraint
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_links', db_index=False)
+    related = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_from')
+    rank = models.PositiveSmallIntegerField()
+    similarity = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'rank'], name='relatedarticle_article_rank_uniq'),
+        ]
+
+class ArticleBand(models.Model):
+    """One LSH band key of an article's MinHash signature, for near-duplicate lookups (api.dedup)."""
+    key = models.BigIntegerField(db_index=True)
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='bands')
+
+class ArticleRank(models.Model):
+    """
+    An article's materialized "best of" rank (api.ranking) in one scope: the whole
+    feed (no region or topic), its region or one of its topics.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='ranks')
+    # Indexed by the scope index, which also serves the feed's ORDER BY
+    region = models.ForeignKey(Region, on_delete=models.CASCADE, null=True, blank=True, related_name='+', db_index=False)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE, null=True, blank=True, related_name='+', db_index=False)
+    rank = models.FloatField()
+    # Copied from the article, so expired ranks can be pruned without a join
+    published_date = models.DateTimeField(db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['region', 'topic', 'rank', 'article'], name='articlerank_scope_idx'),
+        ]
+
 class UserPost(models.Model):
     username = models.CharField(max_length=100)
     avatar = models.URLField(blank=True, null=True)
@@ -50,5 +119,10 @@ class UserPost(models.Model):
     shares = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='userpost_date_idx'),
+        ]
+    
     def __str__(self):
         return self.title
@@ -0,0 +1,205 @@
+# backend/api/pagination.py
+import base64
+import binascii
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Page
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+RANK_FIELD = 'search_rank'
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a composite ordering such as
+    ``('-published_date', '-id')``.
+
+    The cursor is an opaque token holding the ordering values of the row at
+    the page boundary, and each page is fetched with a ``WHERE (a, b) < (x, y)``
+    style condition plus LIMIT, so deep pages cost the same as the first one
+    and no COUNT query is run. The ordering comes from the view's ``ordering``
+    attribute; the last field must be unique so positions are unambiguous.
+    When the queryset carries a full-text ``search_rank`` it leads the ordering.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Invalid cursor'
+    # Links point at the current URL unless set, e.g. for a page embedded in /api/bootstrap/
+    base_url = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views, reading the page with the async ORM."""
+        return self.set_page([row async for row in self.get_page_queryset(queryset, request, view)])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the queryset slice holding the requested page plus one row to detect more."""
+        self.request = request
+        if self.base_url is None:
+            self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+        self.model = queryset.model
+        self.annotations = queryset.query.annotations
+
+        position, reverse = self.decode_cursor(request)
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.flip(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = self.filter_after(queryset, ordering, position)
+
+        self.reverse = reverse
+        self.has_position = position is not None
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = self.has_position, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_position
+
+        self.page = rows
+        return rows
+
+    def get_ordering(self, queryset, view):
+        ordering = tuple(getattr(view, 'ordering', None) or self.ordering)
+        if RANK_FIELD in queryset.query.annotations:
+            ordering = (RANK_FIELD,) + ordering
+        return ordering
+
+    def flip(self, field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def filter_after(self, queryset, ordering, position):
+        """Restrict queryset to rows strictly after position in the given ordering."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        # A redundant bound on the leading column lets the database range-scan
+        # its index instead of evaluating the OR for every row
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return queryset.filter(**{f'{first.lstrip("-")}__{bound}': position[0]}).filter(condition)
+
+    def get_position(self, obj):
+        # Pages may hold model instances or values() rows
+        if isinstance(obj, dict):
+            return [obj[field.lstrip('-')] for field in self.ordering]
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, position, reverse=False):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            values = payload['p']
+            if len(values) != len(self.ordering):
+                raise ValueError(token)
+            position = [self.to_python(field, value) for field, value in zip(self.ordering, values)]
+            return position, bool(payload.get('r'))
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, field, value):
+        name = field.lstrip('-')
+        if name == RANK_FIELD:
+            return float(value)
+        if name in self.annotations:
+            # An annotated ordering column, e.g. the ranked feed's best_rank
+            model_field = self.annotations[name].output_field
+        else:
+            try:
+                model_field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return value
+        result = model_field.to_python(value)
+        if result is None:
+            raise ValueError(value)
+        return result
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    PageNumberPagination for async views. The count and the page rows are
+    read with the async ORM; links and the response body are unchanged.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Filled in up front so the paginator never runs its own (sync) COUNT
+        paginator.count = await queryset.acount()
+
+        page_number = self.get_page_number(request, paginator)
+        if page_number in self.last_page_strings:
+            page_number = paginator.num_pages
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        bottom = (number - 1) * page_size
+        rows = [row async for row in queryset[bottom:bottom + page_size]]
+        self.page = Page(rows, number, paginator)
+        return rows
+
+    def get_paginated_data(self, data):
+        return self.get_paginated_response(data).data
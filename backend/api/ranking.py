@@ -0,0 +1,143 @@
+# backend/api/ranking.py
+import datetime
+import math
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Article, ArticleRank
+
+LN2 = math.log(2)
+MIN_POSITIVITY = 1e-6  # Keeps the logarithm finite for a 0.0 score
+
+# Keyset ordering of the ranked feed; best_rank is annotated by ranked_feed()
+BEST_ORDERING = ('-best_rank', '-id')
+
+
+def half_life_seconds():
+    return getattr(settings, 'API_RANKING_HALF_LIFE_HOURS', 48) * 3600
+
+
+def horizon():
+    """Oldest publication date kept in the ranking table, or None to keep every article."""
+    days = getattr(settings, 'API_RANKING_HORIZON_DAYS', 30)
+    return timezone.now() - datetime.timedelta(days=days) if days else None
+
+
+def rank_key(positivity, published_date):
+    """
+    Materialized rank of an article: log(positivity * 2 ** (-age / half life))
+    plus a term that is the same for every article at any given moment.
+
+    Sorting by the key therefore sorts by the decayed score at every point
+    in time, so stored keys never go stale as articles age and keyset
+    cursors over them stay valid.
+    """
+    return math.log(max(positivity, MIN_POSITIVITY)) + LN2 * published_date.timestamp() / half_life_seconds()
+
+
+def decayed_score(key, now=None):
+    """The positivity * decay score a rank key stands for at time now."""
+    now = now or timezone.now()
+    return math.exp(key - LN2 * now.timestamp() / half_life_seconds())
+
+
+def ranked_feed(queryset, region=None, topic=None):
+    """
+    Restrict an Article queryset to the ranking of one scope (a region name,
+    else a topic name, else the whole feed) and annotate each row's
+    ``best_rank``, so it can be paginated by BEST_ORDERING straight off the
+    scope's (region, topic, rank) index.
+    """
+    if region:
+        scope = {'ranks__region__name': region, 'ranks__topic__isnull': True}
+    elif topic:
+        scope = {'ranks__region__isnull': True, 'ranks__topic__name': topic}
+    else:
+        scope = {'ranks__region__isnull': True, 'ranks__topic__isnull': True}
+    # rank is never NULL; saying so turns the LEFT JOIN that isnull lookups
+    # across a reverse relation get into an INNER JOIN the index can drive
+    return queryset.filter(**scope, ranks__rank__isnull=False).annotate(best_rank=F('ranks__rank'))
+
+
+def _delete_ranks(article_ids=None, older_than=None):
+    # Plain DELETEs: the catch-all cache signal receivers would otherwise make
+    # Django fetch every row before deleting it
+    table = ArticleRank._meta.db_table
+    with connection.cursor() as cursor:
+        if article_ids is None:
+            cursor.execute(f'DELETE FROM {table}')
+            return
+        article_ids = list(article_ids)
+        for start in range(0, len(article_ids), 500):
+            chunk = article_ids[start:start + 500]
+            cursor.execute(f'DELETE FROM {table} WHERE article_id IN ({", ".join(["%s"] * len(chunk))})', chunk)
+        if older_than is not None:
+            cursor.execute(f'DELETE FROM {table} WHERE published_date < %s', [older_than])
+
+
+def _insert_ranks(rows):
+    """Insert the ranks of (id, region_id, positivity, published_date) rows in the feed, their region and topics."""
+    if not rows:
+        return 0
+    topics = {}
+    through = Article.topics.through.objects.filter(article_id__in=[row[0] for row in rows])
+    for article_id, topic_id in through.values_list('article_id', 'topic_id'):
+        topics.setdefault(article_id, []).append(topic_id)
+
+    values = []
+    for article_id, region_id, positivity, published_date in rows:
+        key = rank_key(positivity, published_date)
+        values.append((article_id, None, None, key, published_date))
+        values.append((article_id, region_id, None, key, published_date))
+        values.extend((article_id, None, topic_id, key, published_date) for topic_id in topics.get(article_id, ()))
+    # A prepared statement run once per row; several rows per article make
+    # bulk_create's model instances the bulk of the cost
+    adapt = connection.ops.adapt_datetimefield_value
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {ArticleRank._meta.db_table} (article_id, region_id, topic_id, rank, published_date) '
+            f'VALUES (%s, %s, %s, %s, %s)',
+            [(article_id, region_id, topic_id, key, adapt(published_date))
+             for article_id, region_id, topic_id, key, published_date in values],
+        )
+    return len(values)
+
+
+def refresh_article_ranks(article_ids):
+    """Re-rank the given articles after they were created or changed, and drop expired ranks."""
+    article_ids = list(article_ids)
+    since = horizon()
+    with transaction.atomic():
+        _delete_ranks(article_ids, older_than=since)
+        for start in range(0, len(article_ids), 5000):
+            queryset = Article.objects.filter(id__in=article_ids[start:start + 5000])
+            if since is not None:
+                queryset = queryset.filter(published_date__gte=since)
+            _insert_ranks(list(queryset.values_list('id', 'region_id', 'positivity_score', 'published_date')))
+
+
+def rebuild_ranks(chunk_size=5000):
+    """
+    Rebuild the whole ranking table from the articles inside the horizon in
+    one transaction, so readers see the old ranking until it commits.
+    Returns (articles ranked, rows written).
+    """
+    since = horizon()
+    ranked = written = 0
+    with transaction.atomic():
+        _delete_ranks()
+        last_id = 0
+        while True:
+            queryset = Article.objects.filter(id__gt=last_id)
+            if since is not None:
+                queryset = queryset.filter(published_date__gte=since)
+            rows = list(
+                queryset.order_by('id').values_list('id', 'region_id', 'positivity_score', 'published_date')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            ranked += len(rows)
+            written += _insert_ranks(rows)
+    return ranked, written
@@ -0,0 +1,351 @@
+# backend/api/related.py
+import os
+import re
+import tempfile
+import zlib
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import connection, transaction
+from .cache import bump_versions
+from .models import Article, RelatedArticle
+
+FEATURES = 1 << 20  # Size of the hashed feature space
+TOP_TERMS = 16  # Highest-weighted terms kept in each article's vector
+MAX_DF = 0.02  # Terms in a larger share of the articles are treated as stop words
+MIN_DF_LIMIT = 100  # ... but never on a small corpus
+MIN_SIMILARITY = 0.05
+# Extra neighbours searched for each article, to make up for near-duplicates
+# of its own story that are left out
+DUPLICATE_SLACK = 5
+
+TOKEN_RE = re.compile(r'\w{3,}')
+
+
+def related_count():
+    return getattr(settings, 'API_RELATED_COUNT', 10)
+
+
+def index_path():
+    return getattr(settings, 'API_RELATED_INDEX_PATH', os.path.join(settings.BASE_DIR, 'related', 'index.npz'))
+
+
+def article_text(title, summary):
+    return f'{title} {summary}'
+
+
+def top_per_row(matrix, k, threshold=0.0):
+    """
+    Return (rows, columns, values) of the k largest entries above threshold
+    in every row of a CSR matrix, each row's entries in descending order.
+    """
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    candidates = np.flatnonzero(matrix.data > threshold)
+    rows, values = rows[candidates], matrix.data[candidates]
+    # One sort by row, then by descending value: values are scaled into
+    # [0, 1) below the row number (entries are sorted by row already). The
+    # sort is stable so ties keep column order and equal texts get equal vectors
+    scale = max(float(values.max()), 1.0) * 1.000001 if len(values) else 1.0
+    order = np.argsort(rows - values / scale, kind='stable')
+    starts = np.searchsorted(rows, rows[order])
+    keep = order[np.arange(len(order)) - starts < k]
+    return rows[keep], matrix.indices[candidates[keep]], values[keep]
+
+
+class RelatedIndex:
+    """
+    TF-IDF index of article titles and summaries over hashed features.
+
+    Terms are hashed into FEATURES columns, so there is no vocabulary to
+    keep in step with the corpus. Each article keeps its TOP_TERMS
+    highest-weighted terms, L2-normalized, which bounds the index at
+    TOP_TERMS entries per article and makes neighbour search a sparse
+    product of a batch of vectors with the transposed index (an inverted
+    index from term to articles). Terms in more than MAX_DF of the articles
+    get no weight, which keeps the inverted lists short.
+
+    New articles are weighted with the document frequencies known when they
+    arrive; rebuilding recomputes every weight from the whole corpus.
+    """
+
+    def __init__(self, ids=None, matrix=None, df=None, docs=0):
+        self.ids = np.zeros(0, dtype=np.int64) if ids is None else ids
+        self.matrix = sparse.csr_matrix((0, FEATURES), dtype=np.float32) if matrix is None else matrix
+        self.df = np.zeros(FEATURES, dtype=np.int32) if df is None else df
+        self.docs = docs
+        self.features = {}
+        self._inverted = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def feature(self, token):
+        feature = self.features[token] = zlib.crc32(token.encode('utf-8')) & (FEATURES - 1)
+        return feature
+
+    def count(self, texts):
+        """Hashed term counts of the texts, one CSR row per text."""
+        features, feature = self.features, self.feature
+        columns = []
+        lengths = []
+        for text in texts:
+            tokens = TOKEN_RE.findall(text.lower())
+            columns.extend([features[token] if token in features else feature(token) for token in tokens])
+            lengths.append(len(tokens))
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        counts = sparse.csr_matrix(
+            (np.ones(len(columns), dtype=np.float32), (rows, np.array(columns, dtype=np.int32))),
+            shape=(len(lengths), FEATURES),
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def add_frequencies(self, counts):
+        # After sum_duplicates every stored entry is one distinct term of one text
+        self.df += np.bincount(counts.indices, minlength=FEATURES).astype(np.int32)
+        self.docs += counts.shape[0]
+
+    def weigh(self, counts):
+        """Turn term counts into pruned, L2-normalized TF-IDF vectors."""
+        idf = (np.log((1.0 + self.docs) / (1.0 + self.df)) + 1.0).astype(np.float32)
+        idf[self.df > max(MAX_DF * self.docs, MIN_DF_LIMIT)] = 0.0
+        weights = counts.copy()
+        weights.data = (1.0 + np.log(weights.data)) * idf[weights.indices]
+
+        rows, columns, values = top_per_row(weights, TOP_TERMS)
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=weights.shape[0]))
+        values = (values / norms[rows]).astype(np.float32)
+        return sparse.csr_matrix((values, (rows, columns)), shape=weights.shape)
+
+    @property
+    def inverted(self):
+        if self._inverted is None:
+            self._inverted = self.matrix.T.tocsr()
+        return self._inverted
+
+    def append(self, ids, vectors):
+        """Add vectors to the index, replacing those already stored for the same ids."""
+        ids = np.asarray(ids, dtype=np.int64)
+        keep = ~np.isin(self.ids, ids)
+        self.ids = np.concatenate([self.ids[keep], ids])
+        self.matrix = sparse.vstack([self.matrix[keep], vectors], format='csr')
+        self._inverted = None
+
+    def neighbours(self, ids, vectors, k):
+        """
+        Yield (article id, [(related id, similarity), ...]) for each vector,
+        best first and without the article itself.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        similarities = (vectors @ self.inverted).tocsr()
+        # One extra so the article itself can be dropped
+        rows, columns, values = top_per_row(similarities, k + 1, MIN_SIMILARITY)
+        related = self.ids[columns]
+        mask = related != ids[rows]
+        rows, related, values = rows[mask], related[mask], values[mask]
+        bounds = np.searchsorted(rows, np.arange(len(ids) + 1))
+        for row, article_id in enumerate(ids.tolist()):
+            start, end = bounds[row], min(bounds[row + 1], bounds[row] + k)
+            yield article_id, list(zip(related[start:end].tolist(), values[start:end].tolist()))
+
+    @classmethod
+    def build(cls, rows, chunk_size=10000):
+        """Build an index from (id, title, summary) rows, counting term frequencies over all of them first."""
+        index = cls()
+        ids = []
+        chunks = []
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                ids.extend(pk for pk, _, _ in chunk)
+                chunks.append(index.count(article_text(title, summary) for _, title, summary in chunk))
+                chunk = []
+        if chunk:
+            ids.extend(pk for pk, _, _ in chunk)
+            chunks.append(index.count(article_text(title, summary) for _, title, summary in chunk))
+        for counts in chunks:
+            index.add_frequencies(counts)
+        vectors = [index.weigh(counts) for counts in chunks]
+        chunks.clear()
+        index.features = {}
+        index.append(ids, sparse.vstack(vectors, format='csr') if vectors else index.matrix)
+        return index
+
+    def save(self, path):
+        """Write the index atomically, so a concurrent reader never sees half of it."""
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as f:
+            np.savez(
+                f, ids=self.ids, indptr=self.matrix.indptr, indices=self.matrix.indices,
+                data=self.matrix.data, df=self.df, docs=np.array(self.docs),
+            )
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a saved index, or return None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as saved:
+            matrix = sparse.csr_matrix(
+                (saved['data'], saved['indices'], saved['indptr']), shape=(len(saved['ids']), FEATURES),
+            )
+            return cls(saved['ids'], matrix, saved['df'], int(saved['docs']))
+
+
+def iter_article_rows(article_ids=None, chunk_size=5000):
+    """Yield (id, title, summary) of all articles, or the given ones, in primary key order."""
+    if article_ids is not None:
+        article_ids = sorted(article_ids)
+        for start in range(0, len(article_ids), chunk_size):
+            chunk = article_ids[start:start + chunk_size]
+            yield from Article.objects.filter(id__in=chunk).order_by('id').values_list('id', 'title', 'summary')
+        return
+    last_id = 0
+    while True:
+        rows = list(
+            Article.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'title', 'summary')[:chunk_size]
+        )
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+
+def delete_neighbours(article_ids=None):
+    """
+    Delete the stored related articles of the given articles, or all of them.
+
+    Plain DELETEs: the catch-all cache signal receivers would otherwise make
+    Django fetch every row before deleting it.
+    """
+    table = RelatedArticle._meta.db_table
+    with connection.cursor() as cursor:
+        if article_ids is None:
+            cursor.execute(f'DELETE FROM {table}')
+            return
+        article_ids = list(article_ids)
+        for start in range(0, len(article_ids), 500):
+            chunk = article_ids[start:start + 500]
+            cursor.execute(f'DELETE FROM {table} WHERE article_id IN ({", ".join(["%s"] * len(chunk))})', chunk)
+
+
+def story_ids(article_ids, chunk_size=5000):
+    """{article id: id of its story}, the canonical article of a near-duplicate (api.dedup) or else its own."""
+    article_ids = list(article_ids)
+    stories = {}
+    for start in range(0, len(article_ids), chunk_size):
+        rows = Article.objects.filter(id__in=article_ids[start:start + chunk_size]).values_list('id', 'canonical_id')
+        stories.update((pk, canonical_id or pk) for pk, canonical_id in rows)
+    return stories
+
+
+def drop_same_story(lists, k):
+    """
+    Leave the near-duplicates of each article out of its neighbours, and the
+    articles deleted since the stored index was built, and keep the best k.
+    """
+    stories = story_ids(set(lists) | {related_id for neighbours in lists.values() for related_id, _ in neighbours})
+    return {
+        article_id: [
+            (related_id, similarity) for related_id, similarity in neighbours
+            if related_id in stories and stories[related_id] != stories.get(article_id, article_id)
+        ][:k]
+        for article_id, neighbours in lists.items()
+    }
+
+
+def neighbour_rows(lists):
+    return [
+        RelatedArticle(article_id=article_id, related_id=related_id, rank=rank, similarity=similarity)
+        for article_id, neighbours in lists.items()
+        for rank, (related_id, similarity) in enumerate(neighbours)
+    ]
+
+
+def write_neighbours(lists):
+    """Replace the stored related articles of every article in lists ({id: [(related id, similarity)]})."""
+    if not lists:
+        return
+    with transaction.atomic():
+        delete_neighbours(lists)
+        RelatedArticle.objects.bulk_create(neighbour_rows(lists), batch_size=1000)
+
+
+def rebuild_related_index(batch_size=1000, log=None):
+    """Build the index from every article, store it and replace all stored related articles."""
+    log = log or (lambda message: None)
+    index = RelatedIndex.build(iter_article_rows())
+    log(f'Indexed {len(index)} articles')
+    k = related_count()
+
+    delete_neighbours()
+    for start in range(0, len(index), batch_size):
+        stop = start + batch_size
+        lists = drop_same_story(
+            dict(index.neighbours(index.ids[start:stop], index.matrix[start:stop], k + DUPLICATE_SLACK)), k,
+        )
+        with transaction.atomic():
+            RelatedArticle.objects.bulk_create(neighbour_rows(lists), batch_size=1000)
+        log(f'Stored related articles of {min(stop, len(index))} articles')
+
+    index.save(index_path())
+    bump_versions(Article)
+    return index
+
+
+def update_related_index(article_ids, batch_size=1000, log=None):
+    """
+    Add new or changed articles to the stored index and update the related
+    articles of both the added articles and the existing ones they now rank
+    among the nearest of. Builds the whole index when none exists yet.
+    """
+    index = RelatedIndex.load(index_path())
+    if index is None:
+        return rebuild_related_index(batch_size, log)
+    rows = list(iter_article_rows(article_ids))
+    if not rows:
+        return index
+
+    ids = [pk for pk, _, _ in rows]
+    counts = index.count(article_text(title, summary) for _, title, summary in rows)
+    new = ~np.isin(np.asarray(ids, dtype=np.int64), index.ids)
+    index.add_frequencies(counts[new])
+    vectors = index.weigh(counts)
+    index.append(ids, vectors)
+
+    k = related_count()
+    lists = {}
+    for start in range(0, len(ids), batch_size):
+        stop = start + batch_size
+        lists.update(index.neighbours(ids[start:stop], vectors[start:stop], k + DUPLICATE_SLACK))
+    lists = drop_same_story(lists, k)
+
+    # Offer every added article to the existing articles it is similar to
+    offers = {}
+    for article_id, neighbours in lists.items():
+        for related_id, similarity in neighbours:
+            if related_id not in lists:
+                offers.setdefault(related_id, []).append((article_id, similarity))
+    if offers:
+        current = {}
+        stored = RelatedArticle.objects.filter(article_id__in=list(offers)).order_by('article_id', 'rank')
+        for article_id, related_id, similarity in stored.values_list('article_id', 'related_id', 'similarity').iterator():
+            current.setdefault(article_id, []).append((related_id, similarity))
+        for article_id, offered in offers.items():
+            existing = current.get(article_id, [])
+            offered_ids = {related_id for related_id, _ in offered}
+            merged = sorted(
+                [item for item in existing if item[0] not in offered_ids] + offered,
+                key=lambda item: -item[1],
+            )[:k]
+            if merged != existing:
+                lists[article_id] = merged
+
+    write_neighbours(lists)
+    index.save(index_path())
+    bump_versions(Article)
+    return index
@@ -0,0 +1,178 @@
+# backend/api/sentiment.py
+import json
+import re
+import numpy as np
+from django.conf import settings
+
+# Swedish valence lexicon, roughly -3 (very negative) to +3 (very positive).
+# Entries ending in '*' are stems and match every word that starts with them
+# ('lyck*' covers lycka, lyckades, lyckligt); the others match whole words only.
+DEFAULT_LEXICON = {
+    'glädje*': 2.5, 'glad': 2.0, 'glada': 2.0, 'lyck*': 2.5, 'fantastisk*': 3.0, 'underbar*': 3.0,
+    'härlig*': 2.5, 'bra': 1.5, 'bättre': 1.5, 'bäst': 2.0, 'fin': 1.0, 'fina': 1.0, 'vacker*': 2.0,
+    'framgång*': 2.5, 'genombrott*': 2.5, 'seger': 2.5, 'segern': 2.5, 'vinn*': 2.0, 'vann': 2.0,
+    'rekord*': 1.5, 'hopp': 2.0, 'hoppfull*': 2.5, 'inspir*': 2.0, 'hjälp*': 1.5, 'hjält*': 2.5,
+    'stolt*': 2.0, 'kärlek*': 2.5, 'älsk*': 2.5, 'vänskap*': 2.0, 'gemenskap*': 2.0, 'tack*': 1.5,
+    'förbättr*': 2.0, 'utveckl*': 1.0, 'innovat*': 1.5, 'lösning*': 1.5, 'räddad*': 2.5, 'rädda*': 2.0,
+    'trygg*': 1.5, 'frisk*': 1.5, 'hälsosam*': 1.5, 'leende*': 2.0, 'skratt*': 2.0, 'fira*': 2.0,
+    'firar': 2.0, 'prisad*': 2.0, 'belön*': 2.0, 'möjlighet*': 1.5,
+    'positiv*': 2.0, 'magisk*': 2.5, 'succé*': 2.5, 'uppskatt*': 2.0, 'engager*': 1.5, 'dröm*': 1.5,
+    'hållbar*': 1.0, 'effektiv*': 1.0, 'revolution*': 1.5, 'stark': 1.0, 'starka': 1.0, 'uppgång*': 1.5,
+    'förebild*': 2.0, 'remarkab*': 2.0, 'enastående': 2.5, 'fossilfri*': 1.0, 'tillgänglig*': 1.0,
+    'sjukdom*': -2.0, 'cancer*': -2.0, 'död*': -3.0, 'dör': -3.0, 'dog': -3.0, 'olyck*': -2.5,
+    'kris': -2.5, 'krisen': -2.5, 'kriser': -2.5, 'krig*': -3.0, 'brott*': -2.5, 'brand*': -2.0, 'förlust*': -2.0, 'förlor*': -2.0,
+    'problem*': -1.5, 'svår*': -1.5, 'dålig*': -2.0, 'sämre': -1.5, 'sämst': -2.0, 'rädd': -1.5,
+    'oro': -2.0, 'oroa*': -2.0, 'orolig*': -2.0, 'hot': -2.0, 'hotet': -2.0, 'hotar': -2.0, 'hotad*': -2.0, 'våld*': -3.0, 'skada*': -2.0, 'skadad*': -2.0,
+    'ensam*': -1.5, 'sorg*': -2.5, 'ledsen*': -2.0, 'arg': -2.0, 'arga': -2.0, 'fattig*': -1.5, 'skulder': -1.5,
+    'stress*': -1.5, 'misslyck*': -2.5, 'konflikt*': -2.0, 'katastrof*': -3.0, 'smärt*': -2.0,
+    '💖': 2.0, '💕': 2.0, '❤️': 2.0, '🎉': 2.0, '😊': 2.0, '🌈': 1.5, '🏆': 2.0, '👏': 1.5, '😢': -2.0,
+}
+
+# Words that flip the valence of the sentiment words shortly after them
+NEGATIONS = ('inte', 'ej', 'icke', 'aldrig', 'ingen', 'inget', 'inga', 'utan')
+# Words that strengthen the next sentiment word
+BOOSTERS = ('mycket', 'väldigt', 'extremt', 'otroligt', 'riktigt', 'verkligen', 'enormt', 'helt')
+
+NEGATION_SCOPE = 3  # Tokens after a negation that it still applies to
+BOOSTER_SCOPE = 2
+NEGATION_FACTOR = -0.75  # A negated positive word reads as mildly negative, and vice versa
+BOOSTER_FACTOR = 1.3
+# Normalization constant: a summed valence s maps to s / sqrt(s^2 + alpha)
+ALPHA = 15.0
+MIN_STEM = 3
+
+WORD, NEGATION, BOOSTER, BOUNDARY = range(4)
+
+# Words, sentence ends and the emoji in the lexicon
+TOKEN_RE = re.compile(r'\w+|[.!?]|[☀-➿\U0001f300-\U0001faff]️?')
+
+
+class SentimentScorer:
+    """
+    Lexicon-based positivity scorer for batches of Swedish texts.
+
+    Texts are tokenized and every distinct token is resolved against the
+    lexicon once, into an id in a growing vocabulary. A batch is then scored
+    with NumPy over the concatenated token ids: valences are gathered from
+    the vocabulary array, negation and booster scopes are found with running
+    maxima of their positions (reset at sentence ends) and per-text sums come
+    from a single bincount. Scores map the summed valence to 0.0-1.0, with
+    0.5 for neutral text.
+    """
+
+    def __init__(self, lexicon):
+        self.exact = {}
+        self.stems = {}
+        for word, valence in lexicon.items():
+            word = word.lower()
+            if word.endswith('*'):
+                self.stems[word[:-1]] = float(valence)
+            else:
+                self.exact[word] = float(valence)
+        self.max_stem = max((len(stem) for stem in self.stems), default=0)
+
+        self.index = {}
+        self.valences = []
+        self.kinds = []
+        self._arrays = (np.zeros(0), np.zeros(0, dtype=np.int8))
+        self.boundary = self.token_id('.')
+
+    @classmethod
+    def from_file(cls, path):
+        """Build a scorer from a JSON object mapping words (or 'stem*') to valences."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def lookup(self, token):
+        """Valence of one token: an exact entry, else the longest matching stem."""
+        if token in self.exact:
+            return self.exact[token]
+        for length in range(min(len(token), self.max_stem), MIN_STEM - 1, -1):
+            valence = self.stems.get(token[:length])
+            if valence is not None:
+                return valence
+        return 0.0
+
+    def token_id(self, token):
+        token_id = self.index.get(token)
+        if token_id is None:
+            token_id = self.index[token] = len(self.valences)
+            if token in '.!?':
+                kind, valence = BOUNDARY, 0.0
+            elif token in NEGATIONS:
+                kind, valence = NEGATION, 0.0
+            elif token in BOOSTERS:
+                kind, valence = BOOSTER, 0.0
+            else:
+                kind, valence = WORD, self.lookup(token)
+            self.valences.append(valence)
+            self.kinds.append(kind)
+        return token_id
+
+    def arrays(self):
+        # Rebuilt only when the vocabulary has grown since the last batch
+        if len(self._arrays[0]) != len(self.valences):
+            self._arrays = (np.array(self.valences), np.array(self.kinds, dtype=np.int8))
+        return self._arrays
+
+    def score_many(self, texts):
+        """Return one positivity score (0.0-1.0, two decimals) per text."""
+        texts = list(texts)
+        if not texts:
+            return []
+        index, token_id, boundary = self.index, self.token_id, self.boundary
+        ids = []
+        lengths = []
+        for text in texts:
+            tokens = TOKEN_RE.findall(text.lower())
+            ids.extend([index[token] if token in index else token_id(token) for token in tokens])
+            # Each text ends a sentence, so no scope reaches into the next one
+            ids.append(boundary)
+            lengths.append(len(tokens) + 1)
+
+        valences, kinds = self.arrays()
+        ids = np.array(ids, dtype=np.int64)
+        token_valence = valences[ids]
+        token_kind = kinds[ids]
+        positions = np.arange(len(ids))
+
+        def last(kind):
+            return np.maximum.accumulate(np.where(token_kind == kind, positions, -1))
+
+        sentence_start = last(BOUNDARY)
+        negation = last(NEGATION)
+        booster = last(BOOSTER)
+        negated = (negation > sentence_start) & (positions - negation <= NEGATION_SCOPE)
+        boosted = (booster > sentence_start) & (positions - booster <= BOOSTER_SCOPE)
+        token_valence = token_valence * np.where(negated, NEGATION_FACTOR, 1.0) * np.where(boosted, BOOSTER_FACTOR, 1.0)
+
+        documents = np.repeat(np.arange(len(texts)), lengths)
+        sums = np.bincount(documents, weights=token_valence, minlength=len(texts))
+        scores = 0.5 + 0.5 * sums / np.sqrt(sums * sums + ALPHA)
+        return [round(float(score), 2) for score in scores]
+
+    def score(self, text):
+        return self.score_many([text])[0]
+
+
+_default_scorer = None
+
+
+def get_scorer(lexicon=None):
+    """
+    Return a scorer for the given lexicon file, or the shared default one.
+
+    The default lexicon comes from ``settings.SENTIMENT_LEXICON`` when it is
+    set and falls back to DEFAULT_LEXICON otherwise.
+    """
+    global _default_scorer
+    if lexicon:
+        return SentimentScorer.from_file(lexicon)
+    if _default_scorer is None:
+        _default_scorer = SentimentScorer(getattr(settings, 'SENTIMENT_LEXICON', DEFAULT_LEXICON))
+    return _default_scorer
+
+
+def article_text(title, summary):
+    """The text an article is scored on."""
+    return f'{title}. {summary}'
@@ -18,6 +18,7 @@ class TopicSerializer(serializers.ModelSerializer):
 
 # backend/api/serializers.py
 from rest_framework import serializers
+from .images import build_srcset
 from .models import Region, Source, Topic, Article, UserPost
 
 class RegionSerializer(serializers.ModelSerializer):
@@ -40,13 +41,14 @@ class ArticleSerializer(serializers.ModelSerializer):
     topics = TopicSerializer(many=True, read_only=True)
     region = RegionSerializer(read_only=True)
     image = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Article
         fields = [
             'id', 'title', 'summary', 'source', 'published_date', 
             'positivity_score', 'topics', 'region', 'image', 'image_url', 
-            'url', 'created_at'
+            'srcset', 'url', 'created_at'
         ]
     
     def get_image(self, obj):
@@ -57,6 +59,95 @@ class ArticleSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_srcset(self, obj):
+        """Map each rendition format to a srcset string for <picture>/<img srcset>."""
+        return build_srcset(obj.renditions, self.context.get('request'))
+
+class FlatArticleSerializer:
+    """
+    Fast list representation of articles, identical in shape to ArticleSerializer.
+
+    Rows are read with values() (source and region come from the same joined
+    query) and the topics of the whole page are fetched in one query into a
+    lookup map, so no serializer or field objects are created per row.
+    api.tests.SerializerParityTests checks that the output still matches.
+    """
+    values_fields = (
+        'id', 'title', 'summary', 'source_id', 'source__name', 'published_date',
+        'positivity_score', 'region_id', 'region__name', 'region__positivity',
+        'region__articles_count', 'image', 'image_url', 'renditions', 'url', 'created_at',
+    )
+
+    def __init__(self, context=None):
+        self.request = (context or {}).get('request')
+        self.datetime_field = serializers.DateTimeField()
+        self.image_storage = Article._meta.get_field('image').storage
+
+    def get_values(self, queryset):
+        """Turn an Article queryset into a values() queryset with everything to_representation needs."""
+        annotations = tuple(queryset.query.annotations)
+        return queryset.select_related(None).prefetch_related(None).values(*self.values_fields, *annotations)
+
+    def topics_queryset(self, article_ids):
+        return (
+            Article.topics.through.objects
+            .filter(article_id__in=article_ids)
+            .order_by('topic_id')
+            .values_list('article_id', 'topic_id', 'topic__name')
+        )
+
+    def group_topics(self, rows):
+        topics = {}
+        for article_id, topic_id, name in rows:
+            topics.setdefault(article_id, []).append({'id': topic_id, 'name': name})
+        return topics
+
+    def get_topics(self, article_ids):
+        return self.group_topics(self.topics_queryset(article_ids))
+
+    async def aget_topics(self, article_ids):
+        return self.group_topics([row async for row in self.topics_queryset(article_ids)])
+
+    def get_image(self, name):
+        if not name:
+            return None
+        url = self.image_storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, rows, topics=None):
+        datetime_repr = self.datetime_field.to_representation
+        if topics is None:
+            topics = self.get_topics([row['id'] for row in rows])
+        return [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'summary': row['summary'],
+                'source': {'id': row['source_id'], 'name': row['source__name']},
+                'published_date': datetime_repr(row['published_date']),
+                'positivity_score': float(row['positivity_score']),
+                'topics': topics.get(row['id'], []),
+                'region': {
+                    'id': row['region_id'],
+                    'name': row['region__name'],
+                    'positivity': float(row['region__positivity']),
+                    'articles_count': row['region__articles_count'],
+                },
+                'image': self.get_image(row['image']),
+                'image_url': row['image_url'],
+                'srcset': build_srcset(row['renditions'], self.request, self.image_storage),
+                'url': row['url'],
+                'created_at': datetime_repr(row['created_at']),
+            }
+            for row in rows
+        ]
+
+    async def ato_representation(self, rows):
+        """to_representation for async views; the topics are read with the async ORM."""
+        return self.to_representation(rows, await self.aget_topics([row['id'] for row in rows]))
+
 class UserPostSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserPost
@@ -65,3 +156,14 @@ class UserPostSerializer(serializers.ModelSerializer):
             'content', 'image', 'video', 'likes', 'comments', 
             'shares', 'created_at'
         ]
+
+class EngagementSerializer(serializers.Serializer):
+    """Increments recorded by POST /api/posts/{id}/engagement/: one like, comment and/or share per request."""
+    likes = serializers.IntegerField(min_value=0, max_value=1, default=0)
+    comments = serializers.IntegerField(min_value=0, max_value=1, default=0)
+    shares = serializers.IntegerField(min_value=0, max_value=1, default=0)
+
+    def validate(self, data):
+        if not any(data.values()):
+            raise serializers.ValidationError('Give at least one of likes, comments or shares.')
+        return data
@@ -0,0 +1,71 @@
+# backend/api/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .cache import bump_versions
+from .models import Region, Source, Topic, Article, ArticleRank, UserPost
+from .ranking import refresh_article_ranks
+from .stats import adjust_region_stats
+
+CACHED_MODELS = (Region, Source, Topic, Article, UserPost)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_on_write(sender, **kwargs):
+    if sender in CACHED_MODELS:
+        bump_versions(sender)
+
+
+@receiver(m2m_changed, sender=Article.topics.through)
+def bump_on_topics_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_versions(Article)
+
+
+@receiver(pre_save, sender=Article)
+def remember_region_stats(sender, instance, raw=False, **kwargs):
+    # Keep the stored region and score so post_save can move the article's
+    # contribution when either of them changes
+    instance._stats_before = None
+    if instance.pk and not raw:
+        instance._stats_before = (
+            Article.objects.filter(pk=instance.pk).values_list('region_id', 'positivity_score').first()
+        )
+
+
+@receiver(post_save, sender=Article)
+def update_region_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_stats_before', None)
+    after = (instance.region_id, instance.positivity_score)
+    if before == after:
+        return
+    if before is not None:
+        adjust_region_stats(before[0], -1, -before[1])
+    adjust_region_stats(after[0], 1, after[1])
+
+
+@receiver(post_delete, sender=Article)
+def remove_region_stats(sender, instance, **kwargs):
+    adjust_region_stats(instance.region_id, -1, -instance.positivity_score)
+
+
+@receiver(post_save, sender=Article)
+def rerank_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_article_ranks([instance.pk])
+
+
+@receiver(m2m_changed, sender=Article.topics.through)
+def rerank_on_topics_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # Articles are ranked within each of their topics
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_article_ranks([instance.pk])
+    elif pk_set:
+        refresh_article_ranks(pk_set)
+    else:
+        # A topic cleared of all its articles: re-rank those ranked in it
+        refresh_article_ranks(ArticleRank.objects.filter(topic=instance).values_list('article_id', flat=True))
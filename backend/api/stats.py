@@ -0,0 +1,51 @@
+# backend/api/stats.py
+from django.db.models import Avg, Case, Count, ExpressionWrapper, F, FloatField, Value, When
+from .cache import bump_versions
+from .models import Region, Article
+
+
+def adjust_region_stats(region_id, count, score_total):
+    """
+    Atomically add count articles with the given summed positivity to a region.
+
+    The running mean is updated in the same UPDATE statement from the current
+    column values, so concurrent imports cannot lose increments. Negative
+    values remove articles; a region left without articles gets positivity 0.
+    A zero count with a non-zero score_total re-weighs the existing articles.
+    """
+    if not count and not score_total:
+        return
+    mean = ExpressionWrapper(
+        (F('positivity') * F('articles_count') + score_total) / (F('articles_count') + count),
+        output_field=FloatField(),
+    )
+    # positivity is listed first so it also reads the old count on databases
+    # that apply SET clauses left to right
+    Region.objects.filter(pk=region_id).update(
+        positivity=Case(When(articles_count__gt=-count, then=mean), default=Value(0.0)),
+        articles_count=F('articles_count') + count,
+    )
+    bump_versions(Region)
+
+
+def reconcile_region_stats():
+    """Recompute every region's count and mean positivity with one grouped aggregate query."""
+    stats = {
+        row['region_id']: row
+        for row in Article.objects.order_by().values('region_id').annotate(
+            n=Count('id'), mean=Avg('positivity_score'),
+        )
+    }
+    regions = list(Region.objects.all())
+    changed = []
+    for region in regions:
+        row = stats.get(region.pk)
+        count, mean = (row['n'], row['mean']) if row else (0, 0.0)
+        if region.articles_count != count or abs(region.positivity - mean) > 1e-9:
+            region.articles_count = count
+            region.positivity = mean
+            changed.append(region)
+    if changed:
+        Region.objects.bulk_update(changed, ['articles_count', 'positivity'])
+        bump_versions(Region)
+    return changed
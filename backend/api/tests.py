@@ -0,0 +1,1085 @@
+# backend/api/tests.py
+import base64
+import csv
+import datetime
+import hashlib
+import io
+import json
+import math
+import os
+import tempfile
+from unittest import mock
+from urllib.parse import parse_qs, urlencode, urlsplit
+from django.core.management import call_command
+from django.db import IntegrityError, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from api.cache import response_cache
+from api.classifier import DEFAULT_TOPIC, DEFAULT_TOPIC_KEYWORDS, TopicClassifier
+from api.engagement import EngagementBuffer
+from api.export import CSV_HEADER, FIRST_CHUNK_SIZE, iter_article_chunks
+from api.images import ingest_images, load_manifest
+from api.models import Region, Source, Topic, Article, ArticleRank, RelatedArticle, UserPost
+from api.sentiment import (
+    ALPHA, BOOSTER_FACTOR, DEFAULT_LEXICON, NEGATION_FACTOR, SentimentScorer, article_text, get_scorer,
+)
+from api.search import build_fts_query
+from api.serializers import ArticleSerializer, FlatArticleSerializer
+from api.stats import adjust_region_stats, reconcile_region_stats
+from api.views import ArticleViewSet
+
+# Keep data versions and rendered responses out of the development caches
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'api-tests'},
+    'versions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'api-tests-versions'},
+}
+
+
+def create_feed(articles=25, posts=15):
+    """A small feed: regions, sources, topics, articles tagged with one or two topics, and user posts."""
+    regions = [Region.objects.create(name=name, positivity=0.5) for name in ('Skåne', 'Norrbotten', 'National')]
+    sources = [Source.objects.create(name=name) for name in ('svt.se', 'dn.se')]
+    topics = [Topic.objects.create(name=name) for name in ('Miljö', 'Sport', 'Forskning')]
+    now = timezone.now()
+    created = []
+    for i in range(articles):
+        article = Article.objects.create(
+            title=f'Solpark {i} ger grön el', summary=f'En ny solpark nummer {i} invigdes i veckan.',
+            source=sources[i % len(sources)], region=regions[i % len(regions)],
+            published_date=now - datetime.timedelta(hours=i), positivity_score=(i % 10) / 10,
+            url=f'https://example.se/{i}', image_url=None if i % 4 else f'https://example.se/{i}.jpg',
+        )
+        article.topics.set(topics[i % 3:i % 3 + 1 + i % 2])
+        created.append(article)
+    for rank, related in enumerate(created[1:4]):
+        RelatedArticle.objects.create(article=created[0], related=related, rank=rank, similarity=0.5)
+    for i in range(posts):
+        UserPost.objects.create(username=f'user{i}', date=now - datetime.timedelta(hours=i),
+                                title=f'Inlägg {i}', content='Hej!')
+    return created
+
+
+# The replica is a second connection to the test database file and cannot see
+# the rows a TestCase writes inside its open transaction, so the TestCases that
+# read through the API use the primary (ConcurrentAccessTests covers the replica)
+@override_settings(CACHES=TEST_CACHES, API_READ_DATABASE='default')
+class QueryBudgetTests(TestCase):
+    """
+    Every endpoint runs a fixed number of queries however many rows it
+    returns, so N+1 regressions fail here rather than in production.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = create_feed()
+
+    def get(self, url, queries):
+        # Measure the uncached path
+        response_cache().clear()
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+    def test_lists(self):
+        # A page-number list page is COUNT + page query, a keyset page skips the COUNT
+        for prefix in ('regions', 'sources', 'topics'):
+            self.get(f'/api/{prefix}/', 2)
+        self.get('/api/posts/', 1)
+        # Article page + the topics of the whole page
+        response = self.get('/api/articles/', 2)
+        # Deep pages cost the same as the first one
+        self.get(response.json()['next'], 2)
+
+    def test_details(self):
+        for prefix, model in (('regions', Region), ('sources', Source), ('topics', Topic), ('posts', UserPost)):
+            self.get(f'/api/{prefix}/{model.objects.order_by("pk").first().pk}/', 1)
+        self.get(f'/api/articles/{self.articles[0].pk}/', 2)
+
+    def test_article_filters(self):
+        # Filtering must not change the number of queries
+        filters = [
+            {'region__name': 'Skåne'},
+            {'topics__name': 'Miljö'},
+            {'source__name': 'svt.se'},
+            {'min_score': 0.8},
+            {'search': 'solpark'},
+            {'collapse': 'true'},
+            {'ordering': 'best'},
+            {'ordering': 'best', 'region__name': 'Skåne'},
+            {'ordering': 'best', 'topics__name': 'Miljö', 'collapse': 'true'},
+            {'region__name': 'Skåne', 'topics__name': 'Miljö', 'source__name': 'svt.se', 'min_score': 0.5},
+        ]
+        for params in filters:
+            response = self.get(f'/api/articles/?{urlencode(params)}', 2)
+            self.assertTrue(response.json()['results'], params)
+
+    def test_async_ordering(self):
+        # The async list orders like the sync one and rejects the same values
+        for params in ({'ordering': 'best'}, {'ordering': 'best', 'topics__name': 'Sport'}):
+            query = urlencode(params)
+            expected = [row['id'] for row in self.get(f'/api/articles/?{query}', 2).json()['results']]
+            response = self.client.get(f'/api/async/articles/?{query}')
+            self.assertEqual([row['id'] for row in response.json()['results']], expected)
+        for prefix in ('/api/', '/api/async/'):
+            self.assertEqual(self.client.get(f'{prefix}articles/?ordering=oldest').status_code, 400)
+
+    def test_async_cached(self):
+        # Hits and 304s are answered from the caches alone
+        response_cache().clear()
+        first = self.client.get('/api/async/articles/')
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/async/articles/')
+            not_modified = self.client.get('/api/async/articles/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_related_leaves_out_near_duplicates(self):
+        # Linked as a near-duplicate after the related articles were stored
+        Article.objects.filter(pk=self.articles[2].pk).update(canonical=self.articles[0])
+        response = self.get(f'/api/articles/{self.articles[0].pk}/related/', 2)
+        self.assertEqual([row['id'] for row in response.json()], [self.articles[1].pk, self.articles[3].pk])
+
+    def test_bootstrap(self):
+        # Article page + its topics, one UNION for regions/topics/sources, posts page
+        self.get('/api/bootstrap/?region__name=Skåne', 4)
+
+    def test_facets(self):
+        # One grouped aggregate per facet
+        for params in ({}, {'region__name': 'Skåne', 'min_score': 0.5}, {'search': 'solpark'}):
+            self.get(f'/api/articles/facets/?{urlencode(params)}', 4)
+
+    def test_related(self):
+        # Neighbours joined to their articles + their topics
+        response = self.get(f'/api/articles/{self.articles[0].pk}/related/', 2)
+        self.assertEqual(len(response.json()), 3)
+
+
+@override_settings(CACHES=TEST_CACHES, API_READ_DATABASE='default')
+class SerializerParityTests(TestCase):
+    """FlatArticleSerializer must render articles exactly like the nested ArticleSerializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Skåne', positivity=0.5)
+        source = Source.objects.create(name='svt.se')
+        topics = [Topic.objects.create(name=name) for name in ('Miljö', 'Sport')]
+        now = timezone.now()
+        fields = {'summary': 'Text', 'source': source, 'region': region, 'positivity_score': 0.5,
+                  'url': 'https://example.se/'}
+        # No image at all, and no topics
+        Article.objects.create(title='Bare', published_date=now, **fields)
+        # An uploaded image with renditions, and topics
+        article = Article.objects.create(
+            title='Image', published_date=now - datetime.timedelta(hours=1), image='article_pictures/sol.jpg',
+            renditions={'webp': {'320': 'renditions/sol-320.webp', '640': 'renditions/sol-640.webp'}}, **fields,
+        )
+        article.topics.set(topics)
+        # An external image URL only
+        article = Article.objects.create(title='Link', published_date=now - datetime.timedelta(hours=2),
+                                         image_url='https://example.se/sol.jpg', **fields)
+        article.topics.set(topics[:1])
+
+    def render(self):
+        view = ArticleViewSet()
+        view.request = Request(APIRequestFactory().get('/api/articles/'))
+        view.format_kwarg = None
+        view.action = 'list'
+        context = view.get_serializer_context()
+        queryset = view.get_queryset()
+        flat = FlatArticleSerializer(context=context)
+        # Compare the rendered JSON, which is what clients see
+        return (
+            json.loads(JSONRenderer().render(ArticleSerializer(queryset, many=True, context=context).data)),
+            json.loads(JSONRenderer().render(flat.to_representation(list(flat.get_values(queryset))))),
+        )
+
+    def test_parity(self):
+        expected, actual = self.render()
+        self.assertEqual(len(expected), 3)
+        self.assertEqual(actual, expected)
+
+    def test_missing_image_and_topics(self):
+        bare = next(article for article in self.render()[1] if article['title'] == 'Bare')
+        self.assertIsNone(bare['image'])
+        self.assertIsNone(bare['image_url'])
+        self.assertEqual(bare['topics'], [])
+
+    def test_region_is_required(self):
+        # Neither serializer handles a missing region, because an article cannot have one
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Article.objects.create(title='Nowhere', summary='Text', source=Source.objects.get(),
+                                   published_date=timezone.now(), positivity_score=0.5, url='https://example.se/')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConcurrentAccessTests(TransactionTestCase):
+    """API reads go through the replica alias while the primary is writing."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.articles = create_feed(articles=5, posts=0)
+
+    def add_article(self):
+        article = self.articles[0]
+        return Article.objects.create(title='Ny solpark', summary='Text', source=article.source,
+                                      region=article.region, published_date=timezone.now(),
+                                      positivity_score=0.5, url='https://example.se/ny')
+
+    def test_wal(self):
+        with connections['default'].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+
+    def test_read_during_write(self):
+        with transaction.atomic():
+            article = self.add_article()
+            response = self.client.get('/api/articles/')
+            self.assertEqual(response.status_code, 200)
+            # The replica does not see the uncommitted row
+            self.assertNotIn(article.pk, [row['id'] for row in response.json()['results']])
+        # The versions are bumped on commit, so the page cached above is not served
+        response = self.client.get('/api/articles/')
+        self.assertIn(article.pk, [row['id'] for row in response.json()['results']])
+
+    def test_write_during_read(self):
+        replica = Article.objects.using('replica')
+        with transaction.atomic(using='replica'):
+            self.assertEqual(replica.count(), 5)
+            # Commits without waiting for the open read, which keeps its snapshot
+            self.add_article()
+            self.assertEqual(replica.count(), 5)
+        self.assertEqual(replica.count(), 6)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ImportTests(TestCase):
+    """import_gladstart_articles, in both its per-story and --bulk modes."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+        settings = override_settings(API_RELATED_INDEX_PATH=os.path.join(self.path, 'related', 'index.npz'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write(self, name, data):
+        path = os.path.join(self.path, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return path
+
+    def run_import(self, stories, **options):
+        stdout = io.StringIO()
+        call_command('import_gladstart_articles', self.write('feed.json', {'stories': stories}),
+                     stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def stories(self, count):
+        return [{'title': f'Solpark {i}', 'content': f'En ny solpark nummer {i} invigdes.', 'source': 'svt.se',
+                 'link': f'https://example.se/{i}'} for i in range(count)]
+
+    def check_reimport_keeps_image(self, **options):
+        story = {'title': 'Solpark invigd', 'content': 'En ny solpark invigdes i veckan.',
+                 'source': 'svt.se', 'link': 'https://example.se/solpark', 'image': 'sol.jpg'}
+        renditions = {'webp': {'320': 'renditions/sol-320.webp'}}
+        manifest = self.write('manifest.json', {
+            'files': {'sol.jpg': {'name': 'article_pictures/sol.jpg', 'sha256': '0' * 64, 'width': 640,
+                                  'height': 400, 'renditions': renditions}},
+            'invalid': {},
+        })
+        self.run_import([story], manifest=manifest, **options)
+        # The story is edited and imported again without its images
+        self.run_import([{**story, 'content': 'En ny solpark invigdes i veckan i Skåne.'}], **options)
+        article = Article.objects.get()
+        self.assertEqual(article.summary, 'En ny solpark invigdes i veckan i Skåne.')
+        self.assertEqual(article.image_url, '/media/article_pictures/sol.jpg')
+        self.assertEqual(article.renditions, renditions)
+
+    def test_reimport_keeps_image(self):
+        self.check_reimport_keeps_image()
+
+    def test_bulk_reimport_keeps_image(self):
+        self.check_reimport_keeps_image(bulk=True)
+
+    def test_repeated_across_chunks(self):
+        stories = self.stories(2)
+        self.run_import(stories + stories[:1], bulk=True, chunk_size=1)
+        self.assertEqual(Article.objects.count(), 2)
+
+    def test_related_index(self):
+        self.assertIn('Updated the related-articles index', self.run_import(self.stories(2), bulk=True))
+        # Too many articles to keep the ids of: the index is rebuilt instead
+        with mock.patch('api.management.commands.import_gladstart_articles.RELATED_UPDATE_LIMIT', 2):
+            output = self.run_import(self.stories(5), bulk=True, chunk_size=2)
+        self.assertIn('Rebuilt the related-articles index (5 articles)', output)
+        self.assertEqual(RelatedArticle.objects.values('article').distinct().count(), 5)
+
+    def test_related_leaves_out_near_duplicates(self):
+        stories = self.stories(3)
+        # The same story from another source, close enough to be linked to the first
+        stories.append({**stories[0], 'source': 'dn.se', 'link': 'https://example.se/dn/0'})
+        self.run_import(stories, bulk=True)
+        first, copy = Article.objects.filter(title='Solpark 0').order_by('id')
+        self.assertEqual(copy.canonical_id, first.pk)
+        related = RelatedArticle.objects.filter(article__in=[first, copy])
+        self.assertTrue(related.exists())
+        self.assertFalse(related.filter(related__in=[first, copy]).exists())
+
+    def test_import_after_delete(self):
+        # The stored index still holds the deleted article until it is rebuilt
+        self.run_import(self.stories(3), bulk=True)
+        deleted = Article.objects.get(title='Solpark 1')
+        deleted.delete()
+        self.run_import(self.stories(4)[3:], bulk=True)
+        self.assertTrue(RelatedArticle.objects.filter(article__title='Solpark 3').exists())
+        self.assertFalse(RelatedArticle.objects.filter(related_id=deleted.pk).exists())
+        connections['default'].check_constraints()
+
+    def test_new_article_without_image(self):
+        self.run_import([{'title': 'Solpark invigd', 'content': 'Text', 'source': 'svt.se',
+                          'link': 'https://example.se/solpark'}], bulk=True)
+        self.assertEqual(Article.objects.get().image_url, '/placeholder.svg?height=400&width=600')
+
+
+@override_settings(CACHES=TEST_CACHES, API_READ_DATABASE='default', API_ENGAGEMENT_RATE='3/minute')
+class EngagementTests(TestCase):
+    """Engagement increments through the buffer, as /api/posts/ and .../engagement/ show them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = UserPost.objects.create(username='anna', date=timezone.now(), title='Inlägg', content='Hej!')
+
+    def setUp(self):
+        # The throttle's history is kept in the default cache
+        response_cache().clear()
+        # A buffer of its own, flushed only by the tests. Stopping it writes
+        # what is left into the test's transaction, not at exit, when the
+        # connection points at the development database again
+        self.buffer = EngagementBuffer(interval=3600)
+        self.addCleanup(self.buffer.stop)
+        patcher = mock.patch('api.engagement.buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = f'/api/posts/{self.post.pk}/engagement/'
+
+    def add(self, **increments):
+        return self.client.post(self.url, increments, content_type='application/json')
+
+    def test_one_at_a_time(self):
+        self.assertEqual(self.add(likes=2).status_code, 400)
+        self.assertEqual(self.add(likes=0).status_code, 400)
+        response = self.add(likes=1, shares=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'id': self.post.pk, 'likes': 1, 'comments': 0, 'shares': 1})
+
+    def test_throttled(self):
+        for _ in range(3):
+            self.assertEqual(self.add(likes=1).status_code, 200)
+        self.assertEqual(self.add(likes=1).status_code, 429)
+        # Reading the counts is not limited
+        self.assertEqual(self.client.get(self.url).json()['likes'], 3)
+
+    def test_flush_updates_posts(self):
+        self.assertEqual(self.client.get('/api/posts/').json()['results'][0]['likes'], 0)
+        self.add(likes=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.buffer.flush(), 1)
+        # The flush invalidated the cached page
+        self.assertEqual(self.client.get('/api/posts/').json()['results'][0]['likes'], 1)
+
+
+class MetricsTests(TestCase):
+    def test_disabled_by_default(self):
+        with override_settings(API_METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(API_METRICS_TOKEN='s3cret')
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        # A proxied request from the same host no longer gets in by its address
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+
+class RegionStatsTests(TestCase):
+    """The running count and mean positivity kept on each region by the article signals."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.skane = Region.objects.create(name='Skåne', positivity=0.0)
+        cls.norrbotten = Region.objects.create(name='Norrbotten', positivity=0.0)
+        cls.source = Source.objects.create(name='svt.se')
+
+    def add(self, score, region=None):
+        return Article.objects.create(
+            title=f'Solpark {score}', summary='En ny solpark invigdes.', source=self.source,
+            region=region or self.skane, published_date=timezone.now(), positivity_score=score,
+            url=f'https://example.se/{score}',
+        )
+
+    def assertStats(self, region, count, positivity):
+        region.refresh_from_db()
+        self.assertEqual(region.articles_count, count)
+        self.assertAlmostEqual(region.positivity, positivity)
+
+    def test_create(self):
+        self.add(0.2)
+        self.assertStats(self.skane, 1, 0.2)
+        self.add(0.6)
+        self.assertStats(self.skane, 2, 0.4)
+        self.assertStats(self.norrbotten, 0, 0.0)
+
+    def test_score_update(self):
+        article = self.add(0.2)
+        self.add(0.6)
+        article.positivity_score = 0.8
+        article.save()
+        self.assertStats(self.skane, 2, 0.7)
+
+    def test_move_to_other_region(self):
+        article = self.add(0.2)
+        self.add(0.6)
+        article.region = self.norrbotten
+        article.positivity_score = 0.4
+        article.save()
+        self.assertStats(self.skane, 1, 0.6)
+        self.assertStats(self.norrbotten, 1, 0.4)
+
+    def test_delete(self):
+        first = self.add(0.2)
+        second = self.add(0.6)
+        first.delete()
+        self.assertStats(self.skane, 1, 0.6)
+        # The last article leaves the region at 0, not at a division by zero
+        second.delete()
+        self.assertStats(self.skane, 0, 0.0)
+
+    def test_adjust(self):
+        self.add(0.2)
+        adjust_region_stats(self.skane.pk, 2, 1.6)
+        self.assertStats(self.skane, 3, 0.6)
+        # A zero count re-weighs the articles already counted
+        adjust_region_stats(self.skane.pk, 0, 0.3)
+        self.assertStats(self.skane, 3, 0.7)
+
+    def test_reconcile_repairs_drift(self):
+        self.add(0.2)
+        self.add(0.6, region=self.norrbotten)
+        Region.objects.filter(pk=self.skane.pk).update(articles_count=98, positivity=0.91)
+        self.assertEqual(reconcile_region_stats(), [self.skane])
+        self.assertStats(self.skane, 1, 0.2)
+        self.assertStats(self.norrbotten, 1, 0.6)
+        self.assertEqual(reconcile_region_stats(), [])
+
+    def test_seed_counts_its_articles(self):
+        call_command('load_initial_data', stdout=io.StringIO())
+        for region in Region.objects.all():
+            articles = Article.objects.filter(region=region)
+            self.assertEqual(region.articles_count, articles.count(), region.name)
+            if region.articles_count:
+                mean = sum(articles.values_list('positivity_score', flat=True)) / region.articles_count
+                self.assertAlmostEqual(region.positivity, mean)
+
+
+@override_settings(CACHES=TEST_CACHES, API_READ_DATABASE='default')
+class ExportTests(TestCase):
+    """The streamed /api/articles/export/ action and its NDJSON and CSV encodings."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # More articles than the first, smaller chunk of the stream
+        cls.articles = create_feed(articles=FIRST_CHUNK_SIZE + 10, posts=0)
+        Article.objects.filter(pk=cls.articles[0].pk).update(
+            title='Sol, vind och "grön" el', summary='Rad ett\nrad två, med åäö',
+        )
+
+    def export(self, **params):
+        response = self.client.get('/api/articles/export/?' + urlencode(params))
+        self.assertEqual(response.status_code, 200)
+        return response, list(response.streaming_content)
+
+    def ndjson(self, **params):
+        response, chunks = self.export(**params)
+        return [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+
+    def test_ndjson(self):
+        response, chunks = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="articles.ndjson"')
+        # One chunk of FIRST_CHUNK_SIZE rows, then the rest
+        self.assertEqual(len(chunks), 2)
+        lines = b''.join(chunks).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), len(self.articles))
+        self.assertIn('Rad ett\\nrad två, med åäö', lines[0])
+        articles = [json.loads(line) for line in lines]
+        self.assertEqual([article['id'] for article in articles], [article.pk for article in self.articles])
+        self.assertEqual(articles[0]['title'], 'Sol, vind och "grön" el')
+        self.assertEqual(articles[0]['summary'], 'Rad ett\nrad två, med åäö')
+        topics = self.articles[1].topics.order_by('id')
+        self.assertEqual(articles[1]['topics'], [{'id': topic.pk, 'name': topic.name} for topic in topics])
+
+    def test_csv(self):
+        response, chunks = self.export(format='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="articles.csv"')
+        # The header, then one chunk per batch of rows
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        self.assertEqual(tuple(rows[0]), CSV_HEADER)
+        self.assertEqual(len(rows), len(self.articles) + 1)
+        first = dict(zip(CSV_HEADER, rows[1]))
+        self.assertEqual(first['title'], 'Sol, vind och "grön" el')
+        self.assertEqual(first['summary'], 'Rad ett\nrad två, med åäö')
+        self.assertEqual(first['region'], 'Skåne')
+        self.assertEqual(first['image_url'], 'https://example.se/0.jpg')
+        second = dict(zip(CSV_HEADER, rows[2]))
+        self.assertEqual(second['topics'], 'Sport; Forskning')
+        self.assertEqual(second['image_url'], '')
+
+    def test_csv_by_accept_header(self):
+        response = self.client.get('/api/articles/export/', HTTP_ACCEPT='text/csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+
+    def test_filters(self):
+        articles = self.ndjson(region__name='Norrbotten')
+        self.assertEqual(len(articles), len(self.articles[1::3]))
+        self.assertEqual({article['region']['name'] for article in articles}, {'Norrbotten'})
+        articles = self.ndjson(min_score='0.8')
+        self.assertEqual(len(articles), len([a for a in self.articles if a.positivity_score >= 0.8]))
+        self.assertTrue(all(article['positivity_score'] >= 0.8 for article in articles))
+        # published_before is exclusive, so adjacent ranges never overlap
+        newer = self.ndjson(published_after=self.articles[9].published_date.isoformat())
+        older = self.ndjson(
+            published_after=self.articles[19].published_date.isoformat(),
+            published_before=self.articles[9].published_date.isoformat(),
+        )
+        self.assertEqual([article['id'] for article in newer], [article.pk for article in self.articles[:10]])
+        self.assertEqual([article['id'] for article in older], [article.pk for article in self.articles[10:20]])
+
+    def test_invalid_date(self):
+        response = self.client.get('/api/articles/export/?published_after=igår')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('published_after', json.loads(response.content))
+
+    def test_chunks(self):
+        chunks = list(iter_article_chunks(Article.objects.order_by('id'), chunk_size=20))
+        self.assertEqual([len(chunk) for chunk in chunks], [20, 20, 20])
+        self.assertEqual([a['id'] for chunk in chunks for a in chunk], sorted(a.pk for a in self.articles))
+
+
+class ClassifierTests(TestCase):
+    """TopicClassifier's keyword automaton and the retag_articles command built on it."""
+
+    def test_overlapping_keywords(self):
+        # 'bc' ends inside 'abcd' and 'cde' starts inside it, so both are only
+        # found by following failure links out of the 'abcd' branch
+        classifier = TopicClassifier({'abcd': 'A', 'bc': 'B', 'cde': 'C'})
+        self.assertEqual(classifier.classify('abcde'), ['A', 'B', 'C'])
+        self.assertEqual(classifier.classify('abce'), ['B'])
+        self.assertEqual(classifier.classify('xxcdex'), ['C'])
+        self.assertEqual(classifier.classify('abdc'), [])
+
+    def test_nested_keywords(self):
+        classifier = TopicClassifier({'he': 'He', 'she': 'She', 'hers': 'Hers', 'his': 'His'})
+        self.assertEqual(classifier.classify('ushers'), ['He', 'She', 'Hers'])
+        self.assertEqual(classifier.classify('this'), ['His'])
+
+    def test_word_boundaries(self):
+        classifier = TopicClassifier(DEFAULT_TOPIC_KEYWORDS)
+        # Keywords at the ends of the text and next to punctuation
+        self.assertEqual(classifier.classify('Teater'), ['Kultur'])
+        self.assertEqual(classifier.classify('Om miljö.'), ['Miljö'])
+        self.assertEqual(classifier.classify('(idrott),skola!'), ['Sport', 'Utbildning'])
+        # Stems also match inside inflected and compound words
+        self.assertEqual(classifier.classify('Ny cancerforskningen ger hopp'), ['Forskning'])
+        self.assertEqual(classifier.classify('Skolans elever'), ['Utbildning'])
+        # A keyword split by a space or a hyphen is not a match
+        self.assertEqual(classifier.classify('tea ter och mil-jö'), [])
+
+    def test_topics_in_table_order(self):
+        classifier = TopicClassifier(DEFAULT_TOPIC_KEYWORDS)
+        self.assertEqual(classifier.classify('Hälsa, medicin och teater'), ['Kultur', 'Hälsa'])
+
+    def test_classify_many(self):
+        classifier = TopicClassifier(DEFAULT_TOPIC_KEYWORDS)
+        texts = ['Ny forskning om djur', '', 'Inget här', 'Skolidrott och ekonomi', 'MILJÖ']
+        self.assertEqual(classifier.classify_many(texts), [classifier.classify(text) for text in texts])
+        self.assertEqual(classifier.classify_many([]), [])
+
+    def test_default_topic(self):
+        classifier = TopicClassifier({'sol': 'Energi'}, default_topic='Övrigt')
+        self.assertEqual(classifier.classify('Regn hela veckan'), [])
+        self.assertEqual(classifier.default_topic, 'Övrigt')
+        self.assertEqual(TopicClassifier({}).classify('sol'), [])
+
+    def test_from_file(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'taxonomy.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'Sol': 'Energi', 'vind': 'Energi'}, f)
+        classifier = TopicClassifier.from_file(path)
+        self.assertEqual(classifier.topics, ['Energi'])
+        self.assertEqual(classifier.classify('SOLPARK'), ['Energi'])
+
+    def test_retag_articles(self):
+        region = Region.objects.create(name='Skåne', positivity=0.0)
+        source = Source.objects.create(name='svt.se')
+        sport = Topic.objects.create(name='Sport')
+        summaries = ['Ny forskning om miljö', 'Idrott i skolan', 'Regn hela veckan', 'Regn igen']
+        articles = [
+            Article.objects.create(
+                title=f'Nyhet {i}', summary=summary, source=source, region=region,
+                published_date=timezone.now(), positivity_score=0.5, url=f'https://example.se/{i}',
+            )
+            for i, summary in enumerate(summaries)
+        ]
+        articles[3].topics.add(sport)
+
+        def topics():
+            return [sorted(article.topics.values_list('name', flat=True)) for article in articles]
+
+        stdout = io.StringIO()
+        call_command('retag_articles', chunk_size=3, stdout=stdout)
+        self.assertIn('Successfully re-tagged 4 articles!', stdout.getvalue())
+        # Untagged articles without a match get the default topic; tagged ones keep theirs
+        self.assertEqual(topics(), [['Forskning', 'Miljö'], ['Sport', 'Utbildning'], [DEFAULT_TOPIC], ['Sport']])
+        self.assertTrue(Topic.objects.filter(name='Kultur').exists())
+        self.assertEqual(
+            set(ArticleRank.objects.filter(topic__name='Sport').values_list('article_id', flat=True)),
+            {articles[1].pk, articles[3].pk},
+        )
+
+        call_command('retag_articles', replace=True, stdout=io.StringIO())
+        self.assertEqual(topics()[3], [DEFAULT_TOPIC])
+        self.assertFalse(ArticleRank.objects.filter(article=articles[3], topic=sport).exists())
+
+
+def sentiment(valence):
+    """The score SentimentScorer gives a text whose valences sum to valence."""
+    return round(0.5 + 0.5 * valence / math.sqrt(valence * valence + ALPHA), 2)
+
+
+SENTIMENT_LEXICON = {'bra': 2.0, 'dålig': -2.0, 'lyck*': 2.5, 'hopp*': 1.0, 'hoppfull*': 3.0}
+
+
+class SentimentTests(TestCase):
+    """The lexicon scorer's scopes, stems and batching, and rescore_articles."""
+
+    def setUp(self):
+        self.scorer = SentimentScorer(SENTIMENT_LEXICON)
+
+    def assertScore(self, text, valence):
+        self.assertEqual(self.scorer.score(text), sentiment(valence), text)
+
+    def test_neutral(self):
+        self.assertEqual(self.scorer.score(''), 0.5)
+        self.assertEqual(self.scorer.score('Regn hela veckan'), 0.5)
+        self.assertEqual(self.scorer.score('bra'), 0.73)
+
+    def test_negation_scope(self):
+        self.assertScore('inte bra', 2.0 * NEGATION_FACTOR)
+        self.assertScore('aldrig dålig', -2.0 * NEGATION_FACTOR)
+        self.assertScore('inte alls så bra', 2.0 * NEGATION_FACTOR)
+        # Out of scope four tokens later
+        self.assertScore('inte alls så särskilt bra', 2.0)
+        # A negation applies to every sentiment word in its scope
+        self.assertScore('ingen bra eller dålig', (2.0 - 2.0) * NEGATION_FACTOR)
+
+    def test_booster_scope(self):
+        self.assertScore('mycket bra', 2.0 * BOOSTER_FACTOR)
+        self.assertScore('mycket så bra', 2.0 * BOOSTER_FACTOR)
+        self.assertScore('mycket så himla bra', 2.0)
+        self.assertScore('inte mycket bra', 2.0 * NEGATION_FACTOR * BOOSTER_FACTOR)
+
+    def test_scopes_end_with_sentence(self):
+        self.assertScore('inte. bra', 2.0)
+        self.assertScore('Mycket! Bra', 2.0)
+        self.assertScore('Inte? Bra dålig', 0.0)
+        # Nor do they reach from one text of a batch into the next
+        self.assertEqual(self.scorer.score_many(['Inte', 'bra']), [0.5, sentiment(2.0)])
+
+    def test_stems_and_exact_words(self):
+        # Exact entries match whole words only
+        self.assertScore('bra', 2.0)
+        self.assertScore('bravo', 0.0)
+        # Stems match every word starting with them, the longest stem winning
+        self.assertScore('lyckades', 2.5)
+        self.assertScore('Lycka', 2.5)
+        self.assertScore('hoppas', 1.0)
+        self.assertScore('hoppfullt', 3.0)
+        self.assertScore('olycka', 0.0)
+
+    def test_exact_word_before_stem(self):
+        scorer = SentimentScorer({'brand*': -2.0, 'brandman': 1.0})
+        self.assertEqual(scorer.score('brandman'), sentiment(1.0))
+        self.assertEqual(scorer.score('brandmannen'), sentiment(-2.0))
+
+    def test_batch_matches_single(self):
+        texts = [
+            'Inte bra.', '', 'Mycket lyckad dag! Inte dålig', 'hoppfulla och bra', 'Regn',
+            'Otroligt fantastisk seger 🎉', 'Ingen kris och inga problem', 'Glad. Inte glad.',
+        ]
+        for lexicon in (SENTIMENT_LEXICON, DEFAULT_LEXICON):
+            scorer = SentimentScorer(lexicon)
+            batch = scorer.score_many(texts)
+            self.assertEqual(batch, [scorer.score(text) for text in texts])
+            # A fresh scorer builds its vocabulary in another order
+            single = SentimentScorer(lexicon)
+            self.assertEqual(batch, [single.score(text) for text in reversed(texts)][::-1])
+        self.assertEqual(self.scorer.score_many([]), [])
+
+    def test_bounds(self):
+        scorer = SentimentScorer(DEFAULT_LEXICON)
+        texts = [
+            ' '.join(['fantastisk'] * 200), ' '.join(['krig'] * 200),
+            ' '.join(['inte fantastisk'] * 200), 'mycket ' * 50 + 'underbar',
+        ]
+        for score in scorer.score_many(texts):
+            self.assertGreaterEqual(score, 0.0)
+            self.assertLessEqual(score, 1.0)
+        self.assertGreater(scorer.score('Ett fantastiskt genombrott'), 0.5)
+        self.assertLess(scorer.score('En katastrof'), 0.5)
+
+    def test_rescore_articles(self):
+        region = Region.objects.create(name='Skåne', positivity=0.0)
+        source = Source.objects.create(name='svt.se')
+        articles = [
+            Article.objects.create(
+                title=title, summary=summary, source=source, region=region,
+                published_date=timezone.now(), positivity_score=0.5, url=f'https://example.se/{i}',
+            )
+            for i, (title, summary) in enumerate([
+                ('Bra nyheter', 'Ett lyckat genombrott.'), ('Regn', 'Inte bra alls.'), ('Vädret', 'Moln i dag'),
+            ])
+        ]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'lexicon.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'bra': 2.0, 'lyck*': 2.5}, f)
+
+        stdout = io.StringIO()
+        call_command('rescore_articles', lexicon=path, chunk_size=2, stdout=stdout)
+        self.assertIn('Successfully re-scored 3 articles', stdout.getvalue())
+        self.assertIn('2 changed)!', stdout.getvalue())
+        scores = [Article.objects.get(pk=article.pk).positivity_score for article in articles]
+        self.assertEqual(scores, [sentiment(4.5), sentiment(2.0 * NEGATION_FACTOR), 0.5])
+        # bulk_update skips the signals, so the region was reconciled instead
+        region.refresh_from_db()
+        self.assertAlmostEqual(region.positivity, sum(scores) / 3)
+
+        # The default lexicon scores the same as the title and summary scored directly
+        call_command('rescore_articles', stdout=io.StringIO())
+        scorer = get_scorer()
+        for article in Article.objects.order_by('id'):
+            self.assertEqual(article.positivity_score, scorer.score(article_text(article.title, article.summary)))
+
+
+class ImageIngestTests(TestCase):
+    """ingest_images placing a directory of images into a temporary MEDIA_ROOT."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.images = os.path.join(directory.name, 'images')
+        self.media = os.path.join(directory.name, 'media')
+        os.makedirs(self.images)
+        settings = override_settings(
+            MEDIA_ROOT=self.media, API_RELATED_INDEX_PATH=os.path.join(directory.name, 'related', 'index.npz'),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def save(self, filename, color, size=(80, 60)):
+        path = os.path.join(self.images, filename)
+        Image.new('RGB', size, color).save(path, 'PNG')
+        return path
+
+    def ingest(self, **options):
+        messages = []
+        manifest = ingest_images(self.images, workers=1, log=messages.append, **options)
+        return manifest, messages
+
+    def test_content_hash_names(self):
+        path = self.save('sol.png', 'yellow')
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        manifest, _ = self.ingest()
+        entry = manifest['files']['sol.png']
+        self.assertEqual(entry['name'], f'article_pictures/{digest[:20]}.png')
+        self.assertEqual((entry['sha256'], entry['width'], entry['height']), (digest, 80, 60))
+        with open(os.path.join(self.media, entry['name']), 'rb') as f:
+            self.assertEqual(f.read(), data)
+        # Renditions are named by the same hash and never upscaled
+        self.assertEqual(entry['renditions']['webp'], {
+            '64': f'article_pictures/renditions/{digest[:2]}/{digest[:20]}-64.webp',
+            '80': f'article_pictures/renditions/{digest[:2]}/{digest[:20]}-80.webp',
+        })
+        for names in entry['renditions'].values():
+            for name in names.values():
+                self.assertTrue(os.path.exists(os.path.join(self.media, name)), name)
+
+    def test_identical_files_stored_once(self):
+        self.save('sol.png', 'yellow')
+        self.save('kopia.png', 'yellow')
+        self.save('hav.png', 'blue')
+        manifest, messages = self.ingest(renditions=False)
+        files = manifest['files']
+        self.assertEqual(files['sol.png']['name'], files['kopia.png']['name'])
+        self.assertNotEqual(files['sol.png']['name'], files['hav.png']['name'])
+        self.assertIsNone(files['sol.png']['renditions'])
+        self.assertEqual(len(os.listdir(os.path.join(self.media, 'article_pictures'))), 2)
+        self.assertIn('Found 3 valid images (2 unique, 0 invalid)', messages[0])
+        self.assertTrue(messages[1].startswith('Placed 2 new images'))
+        # Ingesting the same directory again places nothing new
+        again, messages = self.ingest(renditions=False)
+        self.assertEqual(again, manifest)
+        self.assertTrue(messages[1].startswith('Placed 0 new images'))
+
+    def test_invalid_files(self):
+        path = self.save('sol.png', 'yellow')
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(os.path.join(self.images, 'halv.png'), 'wb') as f:
+            f.write(data[:40])
+        with open(os.path.join(self.images, 'text.jpg'), 'w', encoding='utf-8') as f:
+            f.write('inte en bild')
+        with open(os.path.join(self.images, 'notes.txt'), 'wb') as f:
+            f.write(data)
+        manifest, _ = self.ingest()
+        self.assertEqual(list(manifest['files']), ['sol.png'])
+        self.assertEqual(sorted(manifest['invalid']), ['halv.png', 'text.jpg'])
+        # Only the valid image was placed
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.media, 'article_pictures'))),
+            [os.path.basename(manifest['files']['sol.png']['name']), 'renditions'],
+        )
+
+    def test_import_resolves_image_url(self):
+        self.save('sol.png', 'yellow')
+        self.save('hav.png', 'blue')
+        directory = os.path.dirname(self.images)
+        manifest_path = os.path.join(directory, 'manifest.json')
+        call_command('ingest_images', self.images, manifest_path, workers=1, stdout=io.StringIO())
+        manifest = load_manifest(manifest_path)
+        feed = os.path.join(directory, 'feed.json')
+        with open(feed, 'w', encoding='utf-8') as f:
+            json.dump({'stories': [
+                {'title': 'Solpark invigd', 'content': 'En ny solpark invigdes.', 'source': 'svt.se',
+                 'link': 'https://example.se/sol', 'image': 'sol.png'},
+            ]}, f)
+        call_command('import_gladstart_articles', feed, manifest=manifest_path, stdout=io.StringIO())
+        article = Article.objects.get()
+        entry = manifest['files']['sol.png']
+        self.assertEqual(article.image_url, '/media/' + entry['name'])
+        self.assertEqual(article.renditions, entry['renditions'])
+
+
+@override_settings(CACHES=TEST_CACHES, API_READ_DATABASE='default')
+class PaginationTests(TestCase):
+    """KeysetPagination's cursors, walked both ways in the latest and best orderings."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = create_feed()
+        # Ties on the leading ordering column straddling the first page boundary,
+        # in both the publication date and the rank (same date and positivity)
+        for i in (10, 11, 19):
+            article = cls.articles[i]
+            article.published_date = cls.articles[9].published_date
+            article.save()
+
+    def walk(self, url):
+        """Follow next links from url, then previous links back; return both lists of pages."""
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            pages.append([article['id'] for article in body['results']])
+            url, previous = body['next'], body['previous']
+        back = [pages[-1]]
+        while previous:
+            body = self.client.get(previous).json()
+            back.insert(0, [article['id'] for article in body['results']])
+            previous = body['previous']
+        return pages, back
+
+    def cursor(self, url):
+        token = parse_qs(urlsplit(url).query)['cursor'][0]
+        return json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+
+    def test_latest(self):
+        expected = list(Article.objects.order_by('-published_date', '-id').values_list('id', flat=True))
+        pages, back = self.walk('/api/articles/')
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(back, pages)
+
+    def test_best(self):
+        expected = list(
+            ArticleRank.objects.filter(region=None, topic=None).order_by('-rank', '-article_id')
+            .values_list('article_id', flat=True)
+        )
+        ranks = ArticleRank.objects.filter(region=None, topic=None)
+        self.assertEqual(ranks.get(article=self.articles[9]).rank, ranks.get(article=self.articles[19]).rank)
+        pages, back = self.walk('/api/articles/?ordering=best')
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(back, pages)
+        region = Region.objects.get(name='Norrbotten')
+        expected = list(
+            ArticleRank.objects.filter(region=region, topic=None).order_by('-rank', '-article_id')
+            .values_list('article_id', flat=True)
+        )
+        pages, back = self.walk('/api/articles/?ordering=best&region__name=Norrbotten')
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(back, pages)
+
+    def test_reversed_cursor(self):
+        first = self.client.get('/api/articles/?ordering=best').json()
+        second = self.client.get(first['next']).json()
+        # The previous link of the second page is a reversed cursor at its first row
+        payload = self.cursor(second['previous'])
+        self.assertEqual(payload['r'], 1)
+        self.assertEqual(payload['p'][1], second['results'][0]['id'])
+        self.assertEqual(self.client.get(second['previous']).json(), first)
+        # The first page has nothing before it
+        self.assertIsNone(first['previous'])
+
+    def test_invalid_cursor(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+        date = self.articles[0].published_date.isoformat()
+        for cursor in (
+            'inte-en-cursor!', encode('text'), encode({'r': 0}), encode({'p': [date], 'r': 0}),
+            encode({'p': ['igår', 5], 'r': 0}), encode({'p': [date, None], 'r': 0}),
+            encode({'p': [date, 'fem'], 'r': 0}),
+        ):
+            response = self.client.get('/api/articles/?' + urlencode({'cursor': cursor}))
+            self.assertEqual(response.status_code, 404, cursor)
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+        # The rank column of the best ordering must be a number
+        cursor = encode({'p': ['bäst', 5], 'r': 0})
+        response = self.client.get('/api/articles/?' + urlencode({'ordering': 'best', 'cursor': cursor}))
+        self.assertEqual(response.status_code, 404)
+
+
+
+@override_settings(CACHES=TEST_CACHES, API_READ_DATABASE='default')
+class SearchTests(TestCase):
+    """?search= served from the FTS5 index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.articles = create_feed(articles=6, posts=0)
+        cls.health = cls.articles[1]
+        cls.health.title = 'Bättre hälsa i Norrbotten'
+        cls.health.summary = 'Fler motionerar och miljön i skolan har blivit bättre.'
+        cls.health.save()
+
+    def search(self, terms, **params):
+        response = self.client.get('/api/articles/?' + urlencode({'search': terms, **params}))
+        self.assertEqual(response.status_code, 200, terms)
+        return [article['id'] for article in response.json()['results']]
+
+    def test_diacritics_folded(self):
+        self.assertEqual(self.search('halsa'), [self.health.pk])
+        self.assertEqual(self.search('HÄLSA'), [self.health.pk])
+        self.assertEqual(self.search('miljo'), [self.health.pk])
+        self.assertEqual(self.search('battre'), [self.health.pk])
+
+    def test_prefix(self):
+        self.assertEqual(self.search('motion'), [self.health.pk])
+        self.assertEqual(self.search('hals'), [self.health.pk])
+        self.assertEqual(len(self.search('sol')), 5)
+        # Prefixes only match from the start of a word
+        self.assertEqual(self.search('alsa'), [])
+
+    def test_words_are_anded(self):
+        self.assertEqual(self.search('hälsa norrbotten'), [self.health.pk])
+        self.assertEqual(self.search('hälsa solpark'), [])
+
+    def test_title_changes_reindexed(self):
+        Article.objects.filter(pk=self.articles[2].pk).update(title='Nya cykelvägar i Skåne')
+        self.assertEqual(self.search('cykel'), [self.articles[2].pk])
+        self.assertNotIn(self.articles[2].pk, self.search('grön'))
+
+    def test_operators_and_punctuation(self):
+        # Input is quoted word by word, so FTS5 syntax is matched as plain words
+        self.assertEqual(build_fts_query(['sol NOT "el*', '(park)']), '"sol"* "NOT"* "el"* "park"*')
+        self.assertEqual(self.search('hälsa OR solpark'), [])
+        self.assertEqual(self.search('hälsa AND'), [])
+        for terms in ('"', '*', '()', '- : ^', '"""', 'NEAR(', '.'):
+            self.assertEqual(self.search(terms), [], terms)
+
+    def test_empty_search(self):
+        self.assertEqual(len(self.search('')), 6)
+        self.assertEqual(len(self.search('   ')), 6)
+
+    def test_facets_with_search(self):
+        facets = self.client.get('/api/articles/facets/?' + urlencode({'search': 'halsa'})).json()
+        self.assertEqual(facets['count'], 1)
+        self.assertEqual(facets['regions'], [{'id': self.health.region_id, 'name': 'Norrbotten', 'count': 1}])
+        response = self.client.get('/api/articles/facets/?' + urlencode({'search': '"*'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 0)
+
+
+@override_settings(CACHES=TEST_CACHES, API_READ_DATABASE='default')
+class FacetTests(TestCase):
+    """The counts of /api/articles/facets/ for the create_feed() articles."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_feed()
+        cls.ids = {model: dict(model.objects.values_list('name', 'id')) for model in (Region, Topic, Source)}
+
+    def facets(self, **params):
+        response = self.client.get('/api/articles/facets/?' + urlencode(params))
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def options(self, model, *counts):
+        return [{'id': self.ids[model][name], 'name': name, 'count': count} for name, count in counts]
+
+    def test_unfiltered(self):
+        facets = self.facets()
+        self.assertEqual(facets['count'], 25)
+        self.assertEqual(facets['regions'], self.options(Region, ('Skåne', 9), ('National', 8), ('Norrbotten', 8)))
+        self.assertEqual(facets['topics'], self.options(Topic, ('Forskning', 12), ('Sport', 12), ('Miljö', 9)))
+        self.assertEqual(facets['sources'], self.options(Source, ('svt.se', 13), ('dn.se', 12)))
+        self.assertEqual(facets['positivity'], [
+            {'min': 0.9, 'max': None, 'count': 2}, {'min': 0.8, 'max': 0.9, 'count': 2},
+            {'min': 0.7, 'max': 0.8, 'count': 2}, {'min': None, 'max': 0.7, 'count': 19},
+        ])
+
+    def test_filtered(self):
+        # Each facet applies every filter but its own
+        facets = self.facets(region__name='Skåne', min_score=0.5)
+        self.assertEqual(facets['count'], 4)
+        self.assertEqual(facets['regions'], self.options(Region, ('Skåne', 4), ('National', 3), ('Norrbotten', 3)))
+        self.assertEqual(facets['topics'], self.options(Topic, ('Miljö', 4), ('Sport', 2)))
+        self.assertEqual(facets['sources'], self.options(Source, ('dn.se', 2), ('svt.se', 2)))
+        self.assertEqual(facets['positivity'], [
+            {'min': 0.9, 'max': None, 'count': 1}, {'min': 0.8, 'max': 0.9, 'count': 1},
+            {'min': 0.7, 'max': 0.8, 'count': 0}, {'min': None, 'max': 0.7, 'count': 7},
+        ])
+
+    def test_topic_filter(self):
+        facets = self.facets(topics__name='Miljö')
+        self.assertEqual(facets['count'], 9)
+        self.assertEqual(facets['regions'], self.options(Region, ('Skåne', 9)))
+        # The topic facet leaves out its own filter, so choosing another topic still shows its count
+        self.assertEqual(facets['topics'], self.options(Topic, ('Forskning', 12), ('Sport', 12), ('Miljö', 9)))
+        self.assertEqual(facets['sources'], self.options(Source, ('svt.se', 5), ('dn.se', 4)))
@@ -1,8 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     RegionViewSet, SourceViewSet, TopicViewSet, 
-    ArticleViewSet, UserPostViewSet
+    ArticleViewSet, UserPostViewSet, BootstrapViewSet
 )
 
 router = DefaultRouter()
@@ -11,7 +12,18 @@ router.register(r'sources', SourceViewSet)
 router.register(r'topics', TopicViewSet)
 router.register(r'articles', ArticleViewSet)
 router.register(r'posts', UserPostViewSet)
+router.register(r'bootstrap', BootstrapViewSet, basename='bootstrap')
+
+# Native async variants of the hot read endpoints, for ASGI deployments
+async_urlpatterns = [
+    path('articles/', async_views.ArticleListView.as_view(), name='async-article-list'),
+    path('articles/<int:pk>/', async_views.ArticleDetailView.as_view(), name='async-article-detail'),
+    path('regions/', async_views.RegionListView.as_view(), name='async-region-list'),
+    path('topics/', async_views.TopicListView.as_view(), name='async-topic-list'),
+    path('posts/', async_views.UserPostListView.as_view(), name='async-userpost-list'),
+]
 
 urlpatterns = [
+    path('async/', include(async_urlpatterns)),
     path('', include(router.urls)),
 ]
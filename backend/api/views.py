@@ -1,43 +1,64 @@
 # backend/api/views.py
-from rest_framework import viewsets, filters
+import copy
+from django.conf import settings
+from django.db.models import CharField, F, FloatField, IntegerField, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+from django.urls import reverse
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.throttling import UserRateThrottle
 from django_filters.rest_framework import DjangoFilterBackend
+from .cache import VersionedCacheMixin
+from .db import ReadReplicaMixin
+from .engagement import engagement_counts, record_engagement
+from .export import CSVRenderer, NDJSONRenderer, export_response
+from .facets import article_facets
+from .filters import ArticleFilter, filter_min_score, order_feed, parse_min_score
 from .models import Region, Source, Topic, Article, UserPost
+from .pagination import KeysetPagination
+from .search import FullTextSearchFilter
 from .serializers import (
     RegionSerializer, SourceSerializer, TopicSerializer, 
-    ArticleSerializer, UserPostSerializer
+    ArticleSerializer, FlatArticleSerializer, UserPostSerializer, EngagementSerializer
 )
 
-class RegionViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Region.objects.all()
+class RegionViewSet(ReadReplicaMixin, VersionedCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Region.objects.order_by('id')
     serializer_class = RegionSerializer
 
-class SourceViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Source.objects.all()
+class SourceViewSet(ReadReplicaMixin, VersionedCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Source.objects.order_by('id')
     serializer_class = SourceSerializer
 
-class TopicViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Topic.objects.all()
+class TopicViewSet(ReadReplicaMixin, VersionedCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Topic.objects.order_by('id')
     serializer_class = TopicSerializer
 
-class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Article.objects.all().order_by('-published_date')
+class ArticleViewSet(ReadReplicaMixin, VersionedCacheMixin, viewsets.ReadOnlyModelViewSet):
+    # Load the nested source/region in the same query and all topics of a page
+    # in one more, so serializing a page costs a fixed number of queries
+    queryset = (
+        Article.objects.all()
+        .select_related('source', 'region')
+        .prefetch_related(Prefetch('topics', queryset=Topic.objects.order_by('id')))
+        .order_by('-published_date', '-id')
+    )
     serializer_class = ArticleSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['region__name', 'topics__name', 'source__name']
+    cache_models = (Article, Source, Region, Topic)
+    pagination_class = KeysetPagination
+    ordering = ('-published_date', '-id')
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+    filterset_class = ArticleFilter
     search_fields = ['title', 'summary']
     
     def get_queryset(self):
         queryset = super().get_queryset()
-        min_score = self.request.query_params.get('min_score', None)
-        
-        if min_score is not None:
-            try:
-                min_score = float(min_score)
-                queryset = queryset.filter(positivity_score__gte=min_score)
-            except ValueError:
-                pass
-                
-        return queryset
+        return filter_min_score(queryset, self.request.query_params.get('min_score', None))
     
     def get_serializer_context(self):
         """Add request to serializer context for building absolute URLs."""
@@ -45,6 +66,203 @@ class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
         context['request'] = self.request
         return context
 
-class UserPostViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = UserPost.objects.all().order_by('-date')
-    serializer_class = UserPostSerializer
\ No newline at end of file
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, self.list_flat, *args, **kwargs)
+
+    def list_flat(self, request, *args, **kwargs):
+        """List articles through FlatArticleSerializer instead of the nested ModelSerializer."""
+        queryset = self.order_feed(self.filter_queryset(self.get_queryset()))
+        serializer = FlatArticleSerializer(context=self.get_serializer_context())
+        rows = serializer.get_values(queryset)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(list(rows)))
+
+    def order_feed(self, queryset):
+        """Apply ?ordering= (api.filters.order_feed) and paginate by it."""
+        queryset, ordering = order_feed(queryset, self.request.query_params)
+        if ordering:
+            self.ordering = ordering
+        return queryset
+
+    @action(detail=False, renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every article matching the list filters, unpaginated, as NDJSON
+        (default) or CSV (?format=csv or Accept: text/csv).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, request.accepted_renderer.format, self.get_serializer_context())
+
+    @action(detail=False)
+    def facets(self, request, *args, **kwargs):
+        """
+        Article counts per region, topic, source and positivity bucket for the
+        list filters in the query string, cached against the article data.
+        """
+        return self.cached_response(request, self.facets_response, *args, **kwargs)
+
+    def facets_response(self, request, *args, **kwargs):
+        # Facets filter through subqueries, where the ranked FTS join cannot be used
+        self.search_ranking = False
+        min_score = parse_min_score(request.query_params.get('min_score'))
+        return Response(article_facets(self.filter_queryset_without, min_score))
+
+    @action(detail=True)
+    def related(self, request, *args, **kwargs):
+        """
+        The articles most similar to this one, best first, read from the
+        precomputed related-articles index (see build_related_index).
+        """
+        return self.cached_response(request, self.related_response, *args, **kwargs)
+
+    def related_response(self, request, pk=None, *args, **kwargs):
+        # Near-duplicates linked after the index was built are left out here
+        story = Article.objects.filter(pk=pk).values(story=Coalesce('canonical_id', 'id'))
+        queryset = (
+            Article.objects.filter(related_from__article_id=pk)
+            .exclude(Exact(Coalesce('canonical_id', 'id'), Subquery(story)))
+            .annotate(similarity=F('related_from__similarity'))
+            .order_by('related_from__rank')
+        )
+        serializer = FlatArticleSerializer(context=self.get_serializer_context())
+        rows = list(serializer.get_values(queryset))
+        # Only an empty result needs telling apart from an unknown article
+        if not rows and not Article.objects.filter(pk=pk).exists():
+            raise NotFound()
+        return Response([
+            {**article, 'similarity': round(row['similarity'], 4)}
+            for article, row in zip(serializer.to_representation(rows), rows)
+        ])
+
+    def filter_queryset_without(self, param):
+        """Apply the list filters with one query parameter left out."""
+        query = self.request.query_params.copy()
+        query.pop(param, None)
+        django_request = copy.copy(self.request._request)
+        django_request.GET = query
+        request = Request(django_request)
+
+        queryset = filter_min_score(super().get_queryset(), query.get('min_score'))
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(request, queryset, self)
+        return queryset
+
+class EngagementRateThrottle(UserRateThrottle):
+    """Limit the increments each client (user, or IP address) may POST to API_ENGAGEMENT_RATE."""
+    scope = 'engagement'
+
+    def get_rate(self):
+        return getattr(settings, 'API_ENGAGEMENT_RATE', '60/minute')
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        return super().allow_request(request, view)
+
+class UserPostViewSet(ReadReplicaMixin, VersionedCacheMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = UserPost.objects.all().order_by('-date', '-id')
+    serializer_class = UserPostSerializer
+    pagination_class = KeysetPagination
+    ordering = ('-date', '-id')
+
+    @action(detail=True, methods=['get', 'post'], throttle_classes=[EngagementRateThrottle])
+    def engagement(self, request, pk=None):
+        """
+        The post's live likes, comments and shares. POST {"likes": 1} (and/or
+        comments, shares) to add one to them; increments are buffered and
+        written in batches (api.engagement), and both methods include the
+        unwritten ones.
+        """
+        try:
+            post_id = int(pk)
+        except ValueError:
+            raise NotFound()
+        increments = None
+        if request.method == 'POST':
+            serializer = EngagementSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            increments = serializer.validated_data
+        # Also refuses increments for unknown posts, rather than dropping them at flush time
+        counts = engagement_counts([post_id]).get(post_id)
+        if counts is None:
+            raise NotFound()
+        if increments:
+            record_engagement(post_id, **increments)
+            counts = {field: value + increments[field] for field, value in counts.items()}
+        return Response({'id': post_id, **counts})
+
+    @action(detail=False, url_path='engagement')
+    def engagement_list(self, request):
+        """Live counts of several posts, e.g. a feed page: ?ids=1,2,3 (at most one page of them)."""
+        ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip().isdigit()]
+        if not ids or len(ids) > self.paginator.page_size:
+            raise ValidationError({'ids': f'Give 1 to {self.paginator.page_size} comma-separated post ids.'})
+        counts = engagement_counts(ids)
+        return Response([{'id': post_id, **counts[post_id]} for post_id in ids if post_id in counts])
+
+
+def lookup_rows():
+    """
+    Read all regions, topics and sources with a single UNION ALL query.
+
+    Every column is an annotation so the three selects line up; topics and
+    sources pad the region-only columns with NULLs.
+    """
+    def select(model, kind, positivity, articles_count):
+        return model.objects.order_by().annotate(
+            l_kind=Value(kind, CharField()), l_id=F('id'), l_name=F('name'),
+            l_positivity=positivity, l_count=articles_count,
+        ).values_list('l_kind', 'l_id', 'l_name', 'l_positivity', 'l_count')
+
+    empty_float, empty_int = Value(None, FloatField()), Value(None, IntegerField())
+    rows = select(Region, 'regions', F('positivity'), F('articles_count')).union(
+        select(Topic, 'topics', empty_float, empty_int),
+        select(Source, 'sources', empty_float, empty_int),
+        all=True,
+    )
+    lookups = {'regions': [], 'topics': [], 'sources': []}
+    for kind, pk, name, positivity, articles_count in sorted(rows, key=lambda row: row[1]):
+        item = {'id': pk, 'name': name}
+        if kind == 'regions':
+            item.update(positivity=positivity, articles_count=articles_count)
+        lookups[kind].append(item)
+    return lookups
+
+class BootstrapViewSet(ReadReplicaMixin, VersionedCacheMixin, viewsets.ViewSet):
+    """
+    Everything the feed needs on first load, in one response: the first
+    article page for the /api/articles/ filters given in the query string,
+    all regions, topics and sources, and the first page of user posts.
+    Built with four queries and cached as a unit.
+    """
+    cache_models = (Article, Source, Region, Topic, UserPost)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, self.bootstrap, *args, **kwargs)
+
+    def endpoint_url(self, request, name, query=None):
+        url = request.build_absolute_uri(reverse(name))
+        if query:
+            url = f'{url}?{query.urlencode()}'
+        return url
+
+    def bootstrap(self, request, *args, **kwargs):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            raise ValidationError({'cursor': 'The bootstrap holds first pages only; follow the next links instead.'})
+
+        # The article page goes through ArticleViewSet so filters, search and
+        # serialization stay identical; its links point back at /api/articles/
+        articles = ArticleViewSet(request=request, format_kwarg=None, action='list', args=(), kwargs={})
+        articles.paginator.base_url = self.endpoint_url(request, 'article-list', request.query_params)
+        article_page = articles.list_flat(request).data
+
+        posts_paginator = KeysetPagination()
+        posts_paginator.base_url = self.endpoint_url(request, 'userpost-list')
+        posts = posts_paginator.paginate_queryset(UserPost.objects.all(), request, view=UserPostViewSet)
+        post_page = posts_paginator.get_paginated_data(UserPostSerializer(posts, many=True, context={'request': request}).data)
+
+        return Response({'articles': article_page, **lookup_rows(), 'posts': post_page})
+
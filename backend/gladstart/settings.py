@@ -29,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the chain
+    'api.instrumentation.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -61,12 +63,83 @@ TEMPLATES = [
 WSGI_APPLICATION = 'gladstart.wsgi.application'
 
 # Database
+# 'default' is the primary that importers write through; the read-only API
+# viewsets read from 'replica' (api.db.PrimaryReplicaRouter). With SQLite the
+# replica is a query_only connection to the same file, which WAL mode (set by
+# migration api.0010) lets read while an import is writing. Point it at a real
+# replica on other databases. Connections are kept open between requests.
+# Tests use a database file rather than SQLite's in-memory one, whose
+# connections lock whole tables instead of reading a snapshot.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        # Seconds a writer waits for the write lock before "database is locked"
+        'OPTIONS': {'timeout': 20},
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+DATABASE_ROUTERS = ['api.db.PrimaryReplicaRouter']
+API_READ_DATABASE = 'replica'
+
+# Applied to every SQLite connection when it is opened (api.db.configure_sqlite)
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',  # Durable with WAL, without an fsync per commit
+    'cache_size': -32000,  # 32 MB page cache per connection
+    'temp_store': 'MEMORY',
+    'mmap_size': 268435456,  # 256 MB
+}
+
+# Caches
+# Rendered API responses live in a size-bounded per-process LRU cache. The data
+# versions they are keyed on are shared through the file system so that bumps
+# made by management commands (imports) reach every web worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'gladstart-api',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'versions'),
+    },
+}
+API_RESPONSE_CACHE = 'default'
+API_VERSION_CACHE = 'versions'
+API_CACHE_TIMEOUT = 60 * 60
+
+# Request instrumentation (api.instrumentation)
+API_SERVER_TIMING = True  # Server-Timing header with db/serialize/app/total durations
+API_SLOW_REQUEST_MS = 500  # Log requests slower than this; None disables
+API_DUPLICATE_QUERY_THRESHOLD = 5  # Log SQL statements repeated this often in one request; 0 disables
+# Bearer token Prometheus sends to scrape /metrics (its bearer_token setting);
+# /metrics is disabled while it is unset
+API_METRICS_TOKEN = os.environ.get('API_METRICS_TOKEN')
+
+# Related-articles index (api.related)
+API_RELATED_INDEX_PATH = os.path.join(BASE_DIR, 'related', 'index.npz')
+API_RELATED_COUNT = 10  # Neighbours stored per article
+
+# Near-duplicate detection (api.dedup): estimated word-shingle Jaccard
+# similarity at which an imported article joins an earlier story's cluster
+API_DUPLICATE_SIMILARITY = 0.5
+
+# "Best of" feed (api.ranking, ?ordering=best): positivity halved every
+# half-life of age; articles older than the horizon drop out of it
+API_RANKING_HALF_LIFE_HOURS = 48
+API_RANKING_HORIZON_DAYS = 30  # None ranks every article
+
+# Post engagement counters (api.engagement): increments are buffered in each
+# process and written in batches, each of which invalidates cached
+# /api/posts/ pages. Up to API_ENGAGEMENT_FLUSH_SECONDS of increments are
+# lost if a worker is killed (SIGKILL, OOM) instead of shut down.
+API_ENGAGEMENT_FLUSH_SECONDS = 5
+# Increments one client may POST to /api/posts/{id}/engagement/; None disables
+API_ENGAGEMENT_RATE = '60/minute'
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
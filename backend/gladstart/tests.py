@@ -0,0 +1,41 @@
+# backend/gladstart/tests.py
+import os
+import tempfile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from gladstart.views import ReactAppView
+
+
+class ReactAppTests(SimpleTestCase):
+    """ReactAppView serves build files, and index.html for client-side routes only."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        os.makedirs(os.path.join(directory.name, 'static', 'js'))
+        for name, content in (('index.html', '<div id="root"></div>'),
+                              ('static/js/main.3f2a1b4c.js', 'console.log("hej");')):
+            with open(os.path.join(directory.name, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        settings = override_settings(REACT_APP_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get(self, path):
+        return ReactAppView.as_view()(RequestFactory().get(f'/{path}'), path=path)
+
+    def test_asset(self):
+        response = self.get('static/js/main.3f2a1b4c.js')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'console.log("hej");')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_missing_asset(self):
+        # Left over from a previous build: not index.html served as a script
+        for path in ('static/js/main.0badc0de.js', 'static/css/main.css', 'favicon.ico'):
+            self.assertEqual(self.get(path).status_code, 404, path)
+
+    def test_client_side_route(self):
+        for path in ('', 'regions/skane', 'articles/12/'):
+            response = self.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertEqual(response.content, b'<div id="root"></div>')
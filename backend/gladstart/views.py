@@ -0,0 +1,173 @@
+# backend/gladstart/views.py
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotFound, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.generic import View
+
+try:
+    import brotli
+except ImportError:  # In requirements.txt, but optional: gzip is always available
+    brotli = None
+
+# Files above this size are streamed from disk instead of being kept in memory
+MAX_CACHED_SIZE = 5 * 1024 * 1024
+# How often a cached file's mtime is checked, in seconds
+RELOAD_INTERVAL = 1.0
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/manifest+json')
+# Create React App fingerprints everything under static/ (main.3f2a1b4c.js)
+HASHED_ASSET_RE = re.compile(r'^static/.+\.[0-9a-f]{8,}\.')
+# Paths of build files rather than client-side routes: anything under static/
+# and anything with a file extension (favicon.ico, manifest.json)
+ASSET_PATH_RE = re.compile(r'^static/|\.[A-Za-z0-9]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+FALLBACK_HTML = """
+                <!DOCTYPE html>
+                <html>
+                    <head>
+                        <meta charset="utf-8">
+                        <title>GLADSTART</title>
+                    </head>
+                    <body>
+                        <h1>Backend server is running!</h1>
+                        <p>But the React app is not built or not found.</p>
+                        <p>Please make sure to run <code>npm run build</code> in the frontend directory.</p>
+                    </body>
+                </html>
+                """
+
+
+class BuildFile:
+    """A build file held in memory with its compressed variants prepared once."""
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.checked = time.monotonic()
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/'):
+            self.content_type += '; charset=utf-8'
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha1(content).hexdigest()[:20]
+        self.variants = {'identity': (content, f'"{digest}"')}
+        if self.content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) < len(content):
+                self.variants['gzip'] = (compressed, f'"{digest}-gz"')
+            if brotli is not None:
+                compressed = brotli.compress(content)
+                if len(compressed) < len(content):
+                    self.variants['br'] = (compressed, f'"{digest}-br"')
+
+    def choose_encoding(self, accept_encoding):
+        """Pick the best prepared variant the client accepts."""
+        accepted = {}
+        for part in accept_encoding.split(','):
+            name, _, params = part.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip().lower()] = quality
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding
+        return 'identity'
+
+    def response(self, request, cache_control):
+        encoding = self.choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        content, etag = self.variants[encoding]
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=self.content_type)
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+            response['Content-Length'] = str(len(content))
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(self.mtime)
+        response['Cache-Control'] = cache_control
+        if len(self.variants) > 1:
+            response['Vary'] = 'Accept-Encoding'
+        return response
+
+
+class BuildFileCache:
+    """Process-wide cache of React build files, reloaded when their mtime changes."""
+
+    def __init__(self):
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        cached = self.files.get(path)
+        if cached is not None and time.monotonic() - cached.checked < RELOAD_INTERVAL:
+            return cached
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.files.pop(path, None)
+            return None
+        if not os.path.isfile(path):
+            return None
+        if stat.st_size > MAX_CACHED_SIZE:
+            return path
+
+        with self.lock:
+            cached = self.files.get(path)
+            if cached is not None and cached.mtime == stat.st_mtime and cached.size == stat.st_size:
+                cached.checked = time.monotonic()
+                return cached
+            cached = self.files[path] = BuildFile(path, stat)
+            return cached
+
+
+build_files = BuildFileCache()
+
+
+# View to serve the React app
+class ReactAppView(View):
+    """
+    Serve the React build: real files under REACT_APP_DIR (hashed assets with
+    long-lived immutable caching) and index.html for every other path, so
+    client-side routes work. A missing asset is a 404 rather than index.html,
+    which a browser would otherwise run as a stale script or stylesheet.
+    Files are kept in memory with gzip/brotli variants prepared once and are
+    only re-read when they change on disk.
+    """
+
+    def get(self, request, path='', *args, **kwargs):
+        if path and not path.endswith('/'):
+            try:
+                full_path = safe_join(settings.REACT_APP_DIR, path)
+            except ValueError:
+                full_path = None
+            asset = build_files.get(full_path) if full_path else None
+            if isinstance(asset, str):
+                return FileResponse(open(asset, 'rb'))
+            if asset is not None:
+                cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_ASSET_RE.match(path) else REVALIDATE_CACHE_CONTROL
+                return asset.response(request, cache_control)
+            if ASSET_PATH_RE.search(path):
+                return HttpResponseNotFound()
+
+        index = build_files.get(os.path.join(settings.REACT_APP_DIR, 'index.html'))
+        if isinstance(index, BuildFile):
+            return index.response(request, REVALIDATE_CACHE_CONTROL)
+        return HttpResponse(FALLBACK_HTML, status=200, content_type='text/html')
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import Header from './components/layout/Header';
 import Navigation from './components/layout/Navigation';
 import Footer from './components/layout/Footer';
@@ -6,6 +6,7 @@ import NewsFeed from './components/features/NewsFeed';
 import UserFeed from './components/features/UserFeed';
 import RegionalExplorer from './components/features/RegionalExplorer';
 import ApiService from './services/api';
+import { buildArticleParams, getCursor } from './utils';
 import './styles/index.css';
 
 function App() {
@@ -16,7 +17,7 @@ function App() {
   const [topics, setTopics] = useState([]);
   const [sources, setSources] = useState([]);
   const [userPosts, setUserPosts] = useState([]);
-  const [page, setPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
   const [hasMore, setHasMore] = useState(true);
   const [filters, setFilters] = useState({
@@ -27,82 +28,42 @@ function App() {
   });
   const [selectedRegion, setSelectedRegion] = useState(null);
 
-  // Fetch initial data
-  useEffect(() => {
-    const fetchInitialData = async () => {
-      setLoading(true);
-      
-      try {
-        // Fetch regions
-        const regionsData = await ApiService.getRegions();
-        setRegions(regionsData.results || []);
-        
-        // Fetch topics
-        const topicsData = await ApiService.getTopics();
-        setTopics(topicsData.results || []);
-        
-        // Fetch sources
-        const sourcesData = await ApiService.getSources();
-        setSources(sourcesData.results || []);
-        
-        // Fetch user posts
-        const postsData = await ApiService.getUserPosts();
-        setUserPosts(postsData.results || []);
-        
-        // Fetch articles (initial page)
-        const articlesData = await ApiService.getArticles({ page: 1 });
-        setArticles(articlesData.results || []);
-        setDisplayedArticles(articlesData.results || []);
-        setHasMore(!!articlesData.next);
-      } catch (error) {
-        console.error('Error fetching initial data:', error);
-      } finally {
-        setLoading(false);
-      }
-    };
-    
-    fetchInitialData();
-  }, []);
-  
-  // Fetch articles when filters change
+  const initialLoad = useRef(true);
+
+  // Fetch articles when filters change; the first load also brings regions,
+  // topics, sources and user posts in the same bootstrap request
   useEffect(() => {
-    const fetchFilteredArticles = async () => {
+    const fetchArticles = async () => {
       setLoading(true);
       
       try {
-        // Build filter parameters
-        const params = { page: 1 };
+        const params = buildArticleParams(filters);
+        let articlesData;
         
-        if (filters.region !== 'all') {
-          params.region__name = filters.region;
-        }
-        
-        if (filters.topics.length > 0) {
-          params.topics__name = filters.topics.join(',');
-        }
-        
-        if (filters.sources.length > 0) {
-          params.source__name = filters.sources.join(',');
-        }
-        
-        if (filters.minScore) {
-          params.min_score = filters.minScore;
+        if (initialLoad.current) {
+          initialLoad.current = false;
+          const data = await ApiService.getBootstrap(params);
+          setRegions(data.regions || []);
+          setTopics(data.topics || []);
+          setSources(data.sources || []);
+          setUserPosts((data.posts && data.posts.results) || []);
+          articlesData = data.articles || {};
+        } else {
+          articlesData = await ApiService.getArticles(params);
         }
         
-        // Fetch filtered articles
-        const articlesData = await ApiService.getArticles(params);
         setArticles(articlesData.results || []);
         setDisplayedArticles(articlesData.results || []);
-        setPage(1);
+        setNextCursor(getCursor(articlesData.next));
         setHasMore(!!articlesData.next);
       } catch (error) {
-        console.error('Error fetching filtered articles:', error);
+        console.error('Error fetching articles:', error);
       } finally {
         setLoading(false);
       }
     };
     
-    fetchFilteredArticles();
+    fetchArticles();
   }, [filters]);
   
   // Load more articles
@@ -113,28 +74,12 @@ function App() {
     
     try {
       // Build filter parameters
-      const params = { page: page + 1 };
-      
-      if (filters.region !== 'all') {
-        params.region__name = filters.region;
-      }
-      
-      if (filters.topics.length > 0) {
-        params.topics__name = filters.topics.join(',');
-      }
-      
-      if (filters.sources.length > 0) {
-        params.source__name = filters.sources.join(',');
-      }
-      
-      if (filters.minScore) {
-        params.min_score = filters.minScore;
-      }
+      const params = { ...buildArticleParams(filters), cursor: nextCursor };
       
       // Fetch next page of articles
       const articlesData = await ApiService.getArticles(params);
       setDisplayedArticles(prevArticles => [...prevArticles, ...(articlesData.results || [])]);
-      setPage(prevPage => prevPage + 1);
+      setNextCursor(getCursor(articlesData.next));
       setHasMore(!!articlesData.next);
     } catch (error) {
       console.error('Error loading more articles:', error);
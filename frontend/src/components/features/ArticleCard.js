@@ -2,6 +2,9 @@
 import React from 'react';
 import { formatDate, getScoreColorClass } from '../../utils';
 
+// Cards span the viewport on phones and a grid column elsewhere
+const IMAGE_SIZES = '(max-width: 640px) 100vw, 640px';
+
 const ArticleCard = ({ article }) => {
   // Function to determine the correct image URL
   const getImageUrl = (article) => {
@@ -35,16 +38,25 @@ const ArticleCard = ({ article }) => {
       className="article-card"
     >
       <div className="article-card-image-container" style={{ height: '16rem', overflow: 'hidden' }}>
-        <img
-          src={getImageUrl(article)}
-          alt={article.title}
-          className="article-card-image"
-          style={{ width: '100%', height: '100%', objectFit: 'cover' }}
-          onError={(e) => {
-            console.log("Image load error:", e.target.src);
-            e.target.src = '/placeholder.svg?height=400&width=600';
-          }}
-        />
+        <picture>
+          {/* Resized renditions let the browser fetch the smallest image that fits the card */}
+          {article.srcset && article.srcset.webp && (
+            <source type="image/webp" srcSet={article.srcset.webp} sizes={IMAGE_SIZES} />
+          )}
+          <img
+            src={getImageUrl(article)}
+            srcSet={article.srcset ? article.srcset.jpeg : undefined}
+            sizes={IMAGE_SIZES}
+            alt={article.title}
+            className="article-card-image"
+            style={{ width: '100%', height: '100%', objectFit: 'cover' }}
+            onError={(e) => {
+              console.log("Image load error:", e.target.src);
+              e.target.removeAttribute('srcset');
+              e.target.src = '/placeholder.svg?height=400&width=600';
+            }}
+          />
+        </picture>
       </div>
 
       <div className="article-card-content">
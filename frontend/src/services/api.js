@@ -13,6 +13,24 @@ const api = axios.create({
 
 // Define API service functions
 const ApiService = {
+  // First article page (for the given filters), all regions, topics and
+  // sources and the first posts page in a single request
+  getBootstrap: async (params = {}) => {
+    try {
+      const response = await api.get('/bootstrap/', { params });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching bootstrap data:', error);
+      return {
+        articles: { results: [] },
+        regions: [],
+        topics: [],
+        sources: [],
+        posts: { results: [] },
+      };
+    }
+  },
+  
   // Articles
   getArticles: async (params = {}) => {
     try {
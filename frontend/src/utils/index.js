@@ -40,6 +40,35 @@ export const getAssetPath = (path) => {
   return `${process.env.PUBLIC_URL}${assetPath}`;
 };
 
+// Extract the opaque pagination cursor from a "next" link
+export const getCursor = (url) => {
+  if (!url) return null;
+  return new URL(url).searchParams.get('cursor');
+};
+
+// Build the /api/articles/ query parameters for the active filters
+export const buildArticleParams = (filters) => {
+  const params = {};
+  
+  if (filters.region !== 'all') {
+    params.region__name = filters.region;
+  }
+  
+  if (filters.topics.length > 0) {
+    params.topics__name = filters.topics.join(',');
+  }
+  
+  if (filters.sources.length > 0) {
+    params.source__name = filters.sources.join(',');
+  }
+  
+  if (filters.minScore) {
+    params.min_score = filters.minScore;
+  }
+  
+  return params;
+};
+
 // Debounce function for handling input changes
 export const debounce = (func, wait) => {
   let timeout;